@@ -0,0 +1,108 @@
+"""
+Measure how the time to compose a job grows with the number of nodes.
+
+Run with `python -m benchmarks.compose_scaling`. For every graph size the
+benchmark reports the time spent indexing the graph definition with
+`create_graph_from_def`, wiring the nodes with `evaluate_graph` and building the
+whole job with `compose_job`. The last column divides the indexing and wiring
+time by the number of nodes, which stays flat when both grow linearly.
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, Dict, List
+
+import dagster
+
+from dagster_composable_graphs.compose import (
+    DAGSTER_FRAMES_PER_NODE,
+    compose_job,
+    create_graph_from_def,
+    evaluate_graph,
+)
+from dagster_composable_graphs.index import graph_depth
+from dagster_composable_graphs.models import GraphDefinition
+from dagster_composable_graphs.util import recursion_limit
+
+SIZES = (1_000, 2_500, 5_000, 10_000)
+
+
+def chain_graph_def(size: int, width: int = 1) -> GraphDefinition:
+    """
+    Return the definition of a layered graph with `size` nodes.
+
+    Every node adds the outputs of two nodes of the previous layer, with `width`
+    nodes per layer. A `width` of one results in a single chain of nodes.
+    """
+
+    operations: List[Dict[str, Any]] = []
+    dependencies: List[Dict[str, Any]] = []
+
+    for i in range(size):
+        if i < width:
+            operations.append({"name": f"node_{i}", "function": "benchmarks.ops.source"})
+            continue
+
+        operations.append({"name": f"node_{i}", "function": "benchmarks.ops.add"})
+        layer_start = (i // width - 1) * width
+        dependencies.append(
+            {
+                "name": f"node_{i}",
+                "inputs": [f"node_{layer_start + i % width}", f"node_{layer_start}"],
+            }
+        )
+
+    return GraphDefinition.model_validate(
+        {
+            "metadata": {"name": f"benchmark-{size}-{width}"},
+            "spec": {"operations": operations, "dependencies": dependencies},
+        }
+    )
+
+
+def measure(graph_def: GraphDefinition) -> Dict[str, float]:
+    """Return the time in seconds of every phase of composing `graph_def`."""
+
+    start = time.perf_counter()
+    graph = create_graph_from_def(graph_def)
+    index_time = time.perf_counter() - start
+
+    wire_time = 0.0
+
+    def wiring() -> None:
+        nonlocal wire_time
+        start = time.perf_counter()
+        evaluate_graph(graph)
+        wire_time = time.perf_counter() - start
+
+    with recursion_limit(sys.getrecursionlimit() + DAGSTER_FRAMES_PER_NODE * graph_depth(graph)):
+        dagster.job(name="wiring")(wiring)
+
+    start = time.perf_counter()
+    compose_job(graph_def)
+    compose_time = time.perf_counter() - start
+
+    return {"index": index_time, "wire": wire_time, "compose": compose_time}
+
+
+def main() -> None:
+    """Print the composition time of layered graphs of increasing size."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=100, help="Nodes per layer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Graph sizes.")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'index [s]':>10} {'wire [s]':>10} {'compose [s]':>12} {'µs/node':>8}")
+    for size in args.sizes:
+        times = measure(chain_graph_def(size, args.width))
+        per_node = 1e6 * (times["index"] + times["wire"]) / size
+        print(
+            f"{size:>8} {times['index']:>10.3f} {times['wire']:>10.3f} "
+            f"{times['compose']:>12.3f} {per_node:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
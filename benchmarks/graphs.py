@@ -0,0 +1,157 @@
+"""
+Synthetic graph definitions of configurable shape and size.
+
+Every generator returns a `GraphDefinition` with `size` nodes. Nodes without
+dependencies on other nodes read one of `inputs` graph inputs, or return a
+constant if there are none. Every other node combines the outputs of two
+nodes. With `pointers` set, those nodes return two named outputs and every
+dependency selects one of them through a pointer; otherwise nodes have a
+single output referenced through the default pointer.
+"""
+
+import math
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dagster_composable_graphs.models import GraphDefinition
+
+Edges = List[Optional[Tuple[int, int]]]
+GraphGenerator = Callable[..., GraphDefinition]
+
+# Share of source nodes in random graphs.
+RANDOM_SOURCE_RATIO = 0.1
+
+
+def _graph_def(
+    name: str,
+    edges: Edges,
+    inputs: int,
+    pointers: bool,
+) -> GraphDefinition:
+    """
+    Return the definition of a graph with a node for every entry of `edges`.
+
+    Arguments
+    ---------
+    name : str
+        Name of the graph.
+
+    edges : Edges
+        For every node, the two nodes it combines, or `None` for source nodes.
+        Nodes may only depend on nodes with a lower index.
+
+    inputs : int
+        Number of graph inputs, read by source nodes in turn.
+
+    pointers : bool
+        Whether combining nodes return two outputs selected through pointers.
+
+    Returns
+    -------
+    GraphDefinition
+        The definition of the graph.
+    """
+
+    function = "benchmarks.ops.combine" if pointers else "benchmarks.ops.add"
+    operations: List[Dict[str, Any]] = []
+    dependencies: List[Dict[str, Any]] = []
+    sources = 0
+
+    for i, edge in enumerate(edges):
+        if edge is None:
+            if inputs:
+                operations.append({"name": f"node_{i}", "function": "benchmarks.ops.identity"})
+                dependencies.append({"name": f"node_{i}", "inputs": [f"input_{sources % inputs}"]})
+            else:
+                operations.append({"name": f"node_{i}", "function": "benchmarks.ops.source"})
+
+            sources += 1
+            continue
+
+        operations.append({"name": f"node_{i}", "function": function})
+        dependencies.append(
+            {
+                "name": f"node_{i}",
+                "inputs": [
+                    _input(edges, dep, pointers, position) for position, dep in enumerate(edge)
+                ],
+            }
+        )
+
+    return GraphDefinition.model_validate(
+        {
+            "metadata": {"name": name},
+            "spec": {
+                "inputs": {f"input_{k}": k for k in range(inputs)},
+                "operations": operations,
+                "dependencies": dependencies,
+            },
+        }
+    )
+
+
+def _input(edges: Edges, dep: int, pointers: bool, position: int) -> Any:
+    """Return the input definition referencing node `dep`."""
+
+    if not pointers or edges[dep] is None:
+        return f"node_{dep}"
+
+    return {"node": f"node_{dep}", "pointer": "/total" if position == 0 else "/difference"}
+
+
+def chain(size: int, inputs: int = 0, pointers: bool = False) -> GraphDefinition:
+    """Return a single chain of nodes, each combining the output of the previous one."""
+
+    edges: Edges = [None, *((i - 1, i - 1) for i in range(1, size))]
+    return _graph_def(f"chain-{size}", edges, inputs, pointers)
+
+
+def fan_out(size: int, inputs: int = 0, pointers: bool = False) -> GraphDefinition:
+    """Return a single source node consumed by every other node."""
+
+    edges: Edges = [None, *[(0, 0)] * (size - 1)]
+    return _graph_def(f"fan-out-{size}", edges, inputs, pointers)
+
+
+def lattice(size: int, inputs: int = 0, pointers: bool = False) -> GraphDefinition:
+    """
+    Return layers of nodes, each combining two neighbours in the previous layer.
+
+    Layers have about `sqrt(size)` nodes, so that every pair of adjacent nodes
+    in a layer forms a diamond with their common dependency.
+    """
+
+    width = max(1, math.isqrt(size))
+    edges: Edges = [None] * min(width, size)
+    for i in range(width, size):
+        layer_start = (i // width - 1) * width
+        column = i % width
+        edges.append((layer_start + column, layer_start + (column + 1) % width))
+
+    return _graph_def(f"lattice-{size}", edges, inputs, pointers)
+
+
+def random_dag(size: int, inputs: int = 0, pointers: bool = False, seed: int = 0) -> GraphDefinition:
+    """
+    Return a random acyclic graph.
+
+    About one in ten nodes is a source node, and every other node combines two
+    random nodes declared before it. The graph only depends on `seed`.
+    """
+
+    rng = random.Random(seed)
+    edges: Edges = [None]
+    for i in range(1, size):
+        edges.append(
+            None if rng.random() < RANDOM_SOURCE_RATIO else (rng.randrange(i), rng.randrange(i))
+        )
+
+    return _graph_def(f"random-{size}-{seed}", edges, inputs, pointers)
+
+
+GENERATORS: Dict[str, GraphGenerator] = {
+    "chain": chain,
+    "fan-out": fan_out,
+    "lattice": lattice,
+    "random": random_dag,
+}
@@ -0,0 +1,31 @@
+from typing import Any, Tuple
+
+import dagster
+
+
+@dagster.op()
+def source() -> int:
+    """Return number `1`."""
+
+    return 1
+
+
+@dagster.op()
+def add(x: Any, y: Any) -> Any:
+    """Add two values."""
+
+    return x + y
+
+
+@dagster.op()
+def identity(x: Any) -> Any:
+    """Return the value unchanged."""
+
+    return x
+
+
+@dagster.op(out={"total": dagster.Out(), "difference": dagster.Out()})
+def combine(x: Any, y: Any) -> Tuple[Any, Any]:
+    """Return the sum and the difference of two values."""
+
+    return x + y, x - y
@@ -0,0 +1,239 @@
+"""
+Measure loading, validating, composing and executing synthetic graphs.
+
+Run with `python -m benchmarks.suite`. For every combination of graph shape,
+size, number of graph inputs and pointer usage, see module
+`benchmarks.graphs`, the benchmark writes the graph definition to a file in
+`--format` format and measures separately:
+
+- `load`: function `load_graph_def`,
+- `create`: function `create_graph_from_def`,
+- `compose`: function `compose_job`, which includes creating the graph,
+- `execute`: method `execute_in_process` of the composed job, only for graphs
+  up to `--execute-max` nodes.
+
+Times are the best of `--repeat` runs. Peak memory is measured with
+`tracemalloc` in a separate run, since tracing slows down allocations. Results
+are written in JSON format to `--output`. If `--baseline` is given, results are
+compared to those of a previous run and the benchmark fails when any time or
+peak memory grows by more than `--tolerance`.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import dagster
+
+from dagster_composable_graphs.compose import compose_job, create_graph_from_def
+from dagster_composable_graphs.formats import LOADERS, dump_graph_def, load_graph_def
+from dagster_composable_graphs.models import GraphDefinition
+
+from .graphs import GENERATORS
+
+SIZES = (10, 100, 1_000, 20_000)
+INPUTS = (0, 10)
+EXECUTE_MAX = 100
+METRICS = ("seconds", "peak_bytes")
+
+# Dagster logs every step event to the console by default.
+QUIET_RUN_CONFIG = {"loggers": {"console": {"config": {"log_level": "ERROR"}}}}
+
+ResultKey = Tuple[str, int, int, bool, str]
+
+
+def run_phases(file_path: Path, execute: bool, trace: bool) -> Dict[str, float]:
+    """
+    Run every phase on the graph definition in `file_path`.
+
+    Arguments
+    ---------
+    file_path : Path
+        Path to the graph definition.
+
+    execute : bool
+        Whether to execute the composed job.
+
+    trace : bool
+        Whether to return the peak memory of every phase in bytes instead of
+        its time in seconds.
+
+    Returns
+    -------
+    Dict[str, float]
+        Time or peak memory of every phase.
+    """
+
+    measurements: Dict[str, float] = {}
+
+    def phase(name: str, fn: Callable[[], Any]) -> Any:
+        if trace:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        value = fn()
+        measurements[name] = time.perf_counter() - start
+
+        if trace:
+            measurements[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        return value
+
+    graph_def = phase("load", lambda: load_graph_def(file_path))
+    phase("create", lambda: create_graph_from_def(graph_def))
+    job = phase("compose", lambda: compose_job(graph_def))
+
+    if execute:
+        phase("execute", lambda: job.execute_in_process(run_config=QUIET_RUN_CONFIG))
+
+    return measurements
+
+
+def measure(
+    graph_def: GraphDefinition, execute: bool, repeat: int, memory: bool, suffix: str
+) -> Dict[str, Dict[str, float | None]]:
+    """Return the best time and the peak memory of every phase for `graph_def`."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = Path(directory) / f"graph{suffix}"
+        dump_graph_def(graph_def, file_path)
+
+        runs = [run_phases(file_path, execute, trace=False) for _ in range(repeat)]
+        peaks = run_phases(file_path, execute, trace=True) if memory else {}
+
+    return {
+        name: {"seconds": min(run[name] for run in runs), "peak_bytes": peaks.get(name)}
+        for name in runs[0]
+    }
+
+
+def result_key(result: Dict[str, Any]) -> ResultKey:
+    """Return the key identifying the configuration and phase of a result."""
+
+    return (result["shape"], result["size"], result["inputs"], result["pointers"], result["phase"])
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """
+    Return a description of every result that regressed with respect to `baseline`.
+
+    A result regresses when its time or peak memory exceeds that of the
+    baseline by more than `tolerance`, as a fraction. Results without a
+    counterpart in the baseline are skipped.
+    """
+
+    baseline_results = {result_key(result): result for result in baseline}
+    regressions = []
+
+    for result in results:
+        previous = baseline_results.get(result_key(result))
+        if previous is None:
+            continue
+
+        for metric in METRICS:
+            value, previous_value = result[metric], previous.get(metric)
+            if value is None or not previous_value:
+                continue
+
+            if value > previous_value * (1 + tolerance):
+                shape, size, inputs, pointers, phase = result_key(result)
+                regressions.append(
+                    f"{shape} size={size} inputs={inputs} pointers={pointers} {phase} {metric}: "
+                    f"{previous_value:.4g} -> {value:.4g} (+{value / previous_value - 1:.0%})"
+                )
+
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks, write their results and compare them to a baseline."""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--shapes", nargs="+", choices=GENERATORS, default=list(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Graph sizes.")
+    parser.add_argument("--inputs", type=int, nargs="+", default=INPUTS, help="Input counts.")
+    parser.add_argument(
+        "--pointers", action="store_true", help="Also measure graphs with named outputs."
+    )
+    parser.add_argument(
+        "--format", choices=LOADERS, default=".yaml", help="Extension of the graph files."
+    )
+    parser.add_argument("--execute-max", type=int, default=EXECUTE_MAX)
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per graph.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip peak memory.")
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--baseline", type=Path, help="Results of a previous run.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = []
+    pointer_modes = (False, True) if args.pointers else (False,)
+
+    print(f"{'shape':>8} {'nodes':>6} {'inputs':>6} {'ptrs':>5} {'phase':>8} {'s':>9} {'MiB':>8}")
+    for shape, size, inputs, pointers in itertools.product(
+        args.shapes, args.sizes, args.inputs, pointer_modes
+    ):
+        graph_def = GENERATORS[shape](size, inputs=inputs, pointers=pointers)
+        phases = measure(
+            graph_def, size <= args.execute_max, args.repeat, not args.no_memory, args.format
+        )
+
+        for phase, measurements in phases.items():
+            results.append(
+                {
+                    "shape": shape,
+                    "size": size,
+                    "inputs": inputs,
+                    "pointers": pointers,
+                    "phase": phase,
+                    **measurements,
+                }
+            )
+
+            peak = measurements["peak_bytes"]
+            print(
+                f"{shape:>8} {size:>6} {inputs:>6} {pointers!s:>5} {phase:>8} "
+                f"{measurements['seconds']:>9.4f} "
+                f"{'-' if peak is None else format(peak / 2**20, '.1f'):>8}",
+                flush=True,
+            )
+
+    args.output.write_text(
+        json.dumps(
+            {
+                "environment": {
+                    "python": platform.python_version(),
+                    "dagster": dagster.__version__,
+                    "platform": platform.platform(),
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+    if args.baseline is not None:
+        regressions = compare(
+            results, json.loads(args.baseline.read_text())["results"], args.tolerance
+        )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
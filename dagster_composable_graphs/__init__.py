@@ -1,6 +1,18 @@
+from .assets import compose_assets, materialize_stale
+from .cache import CompositionCache
 from .compose import compose_job, load_graph_def_from_yaml
+from .formats import dump_graph_def, load_graph_def
+from .imports import import_registry
+from .partitions import backfill_run_requests
 
 __all__ = (
+    "CompositionCache",
+    "backfill_run_requests",
+    "compose_assets",
     "compose_job",
+    "dump_graph_def",
+    "import_registry",
+    "load_graph_def",
     "load_graph_def_from_yaml",
+    "materialize_stale",
 )
@@ -0,0 +1,451 @@
+import dataclasses
+import graphlib
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import dagster
+
+from .compose import create_graph_from_def
+from .errors import GraphDefinitionError
+from .file_inputs import FILE_INPUT_IO_MANAGER_KEY, FileReference
+from .io_managers import output_key
+from .jobs import input_field, input_value
+from .memoization import fingerprint, lineage_input_value
+from .models import (
+    DEFAULT_INITIAL_DATA_NAME,
+    FileInputDefinition,
+    Graph,
+    GraphDefinition,
+    PartitionInputDefinition,
+)
+from .partitions import graph_partitions_def, partition_value
+from .profiling import profile_phase
+from .util import to_snake_case
+
+# Tags of asset materializations recording the versions they were computed from.
+CODE_VERSION_TAG = "dagster/code_version"
+INPUT_DATA_VERSION_TAG_PREFIX = "dagster/input_data_version"
+INPUT_EVENT_POINTER_TAG_PREFIX = "dagster/input_event_pointer"
+DATA_VERSION_TAG = "dagster/data_version"
+
+# Metadata of the assets of graph inputs: the data version of their value in
+# the graph definition, or the file they reference.
+INPUT_DATA_VERSION_METADATA_KEY = "dagster-composable-graphs/input-data-version"
+INPUT_FILE_METADATA_KEY = "dagster-composable-graphs/input-file"
+
+
+def input_code_version(value: Any) -> str:
+    """
+    Return the code version of the asset of a graph input.
+
+    The version is a fingerprint of the value of the input in the graph
+    definition, or of the path and format of inputs referencing a file, so
+    that assets depending on an input become stale when its definition
+    changes.
+    """
+
+    if isinstance(value, FileInputDefinition):
+        value = (value.from_file, value.file_format())
+
+    return fingerprint(value)[:16]
+
+
+def input_data_version(value: Any) -> str:
+    """
+    Return the data version of the asset of a graph input, given the value it returns.
+
+    Like the keys of results memoized by lineage, see function
+    `lineage_input_value`, versions of `FileReference` values depend on the
+    path, modification time and size of the file rather than its content.
+    """
+
+    return fingerprint(lineage_input_value(value))[:16]
+
+
+def input_metadata(value: Any) -> Dict[str, Any]:
+    """
+    Return the metadata of the asset of a graph input, see function `current_input_data_version`.
+
+    Partition inputs have no metadata, since their value is the partition key.
+    """
+
+    if isinstance(value, FileInputDefinition):
+        reference = FileReference(
+            path=str(Path(value.from_file).resolve()), format=value.file_format()
+        )
+        return {INPUT_FILE_METADATA_KEY: dataclasses.asdict(reference)}
+
+    if isinstance(value, PartitionInputDefinition):
+        return {}
+
+    return {INPUT_DATA_VERSION_METADATA_KEY: input_data_version(value)}
+
+
+def current_input_data_version(metadata: Mapping[str, Any]) -> Optional[str]:
+    """
+    Return the data version of a graph input asset when materialized without overrides.
+
+    The version is read from the `metadata` of the asset, see function
+    `input_metadata`, and for inputs referencing a file computed from the
+    current modification time and size of the file. Returns `None` if the
+    asset is not that of a graph input given by value or file.
+    """
+
+    if INPUT_FILE_METADATA_KEY in metadata:
+        return input_data_version(FileReference(**metadata[INPUT_FILE_METADATA_KEY]))
+
+    if INPUT_DATA_VERSION_METADATA_KEY in metadata:
+        return metadata[INPUT_DATA_VERSION_METADATA_KEY]
+
+    return None
+
+
+def input_asset_builder(
+    key: dagster.AssetKey, value: Any, io_manager_key: Optional[str] = None, **kwargs: Any
+) -> dagster.AssetsDefinition:
+    """
+    Define a dagster asset returning the value of a graph input.
+
+    Like the input op of composed jobs, see function `input_op_builder`, the
+    value given in the graph definition may be overridden by the run
+    configuration, inputs referencing a file return a `FileReference` and
+    partition inputs the partition keys of the run. The data version of every
+    materialization is derived from the returned value, see function
+    `input_data_version`. Keyword arguments, such as `group_name` or
+    `partitions_def`, are passed to `dagster.asset`.
+    """
+
+    if isinstance(value, FileInputDefinition):
+        io_manager_key = io_manager_key or FILE_INPUT_IO_MANAGER_KEY
+
+    partition_input = isinstance(value, PartitionInputDefinition)
+
+    @dagster.asset(
+        key=key,
+        code_version=input_code_version(value),
+        config_schema=None if partition_input else input_field(value),
+        io_manager_key=io_manager_key,
+        description=f"Graph input `{key.path[-1]}`. May be overridden in the run configuration.",
+        metadata=input_metadata(value),
+        **kwargs,
+    )
+    def input_asset(context: dagster.AssetExecutionContext) -> dagster.Output:
+        if partition_input:
+            result = partition_value(value, context.op_execution_context)
+        else:
+            result = input_value(value, context.op_execution_context.op_config)
+
+        with warnings.catch_warnings():
+            # Dagster marks data versions of outputs as a beta feature.
+            warnings.simplefilter("ignore", dagster.BetaWarning)
+            return dagster.Output(
+                result, data_version=dagster.DataVersion(input_data_version(result))
+            )
+
+    return input_asset
+
+
+def asset_keys(graph: Graph, prefix: str) -> Dict[str, Dict[str, dagster.AssetKey]]:
+    """
+    Return the asset key of every output of every node of `graph`, by node and output name.
+
+    The key of a node with a single output is the name of the node, and that
+    of every output of a node with several outputs the name of the node
+    followed by the name of the output. Graph inputs are listed under the
+    name of the input op. All keys start with `prefix`.
+    """
+
+    input_step = to_snake_case(DEFAULT_INITIAL_DATA_NAME)
+    keys = {
+        input_step: {
+            name: dagster.AssetKey([prefix, input_step, name]) for name in graph.initial_data
+        }
+    }
+
+    for node in graph.nodes:
+        output_defs = graph.operations[node].output_defs
+        keys[node] = {
+            output_def.name: dagster.AssetKey(
+                [prefix, node] if len(output_defs) == 1 else [prefix, node, output_def.name]
+            )
+            for output_def in output_defs
+        }
+
+    return keys
+
+
+def compose_assets(
+    graph_def: GraphDefinition, targets: Optional[List[str]] = None
+) -> List[dagster.AssetsDefinition]:
+    """
+    Compile a graph definition into dagster assets.
+
+    The graph is created by function `create_graph_from_def` like for function
+    `compose_job`, and every output of every node becomes an asset keyed by
+    function `asset_keys`, with the name of the job as prefix and group. Every
+    graph input becomes an asset as well, whose code version changes with its
+    value, see function `input_code_version`. The code version of the asset of
+    an op is the `code_version` of the op, so that dagster records with every
+    materialization the code and input data versions it was computed from.
+    Function `stale_asset_keys` compares them to the current versions, and
+    function `materialize_stale` only materializes the stale assets.
+
+    Tags, hooks and the executor of the graph apply to jobs only, and dynamic
+    outputs cannot be composed into assets. Resources of the graph are bound
+    to the assets. When `spec.partitions` is set, all assets share the
+    partitions of the graph, and backfills materialize up to
+    `maxPartitionsPerRun` partitions per run.
+
+    Assets are materialized by separate runs, which load the assets they
+    depend on from the IO managers of previous runs. IO managers keeping
+    outputs in memory cannot pass them between runs, so graphs with
+    `spec.referenceCounting` or using `dagster.mem_io_manager` are rejected.
+
+    Raises `GraphDefinitionError` if an operation has dynamic outputs, if the
+    graph keeps outputs in memory, or if the partitions of the graph are not
+    valid, see function `graph_partitions_def`.
+
+    Arguments
+    ---------
+    graph_def : GraphDefinition
+        Definition of the composable graph.
+
+    targets : Optional[List[str]]
+        Names of the nodes whose outputs are requested. Defaults to
+        `spec.targets`. If empty, all nodes are kept.
+
+    Returns
+    -------
+    List[dagster.AssetsDefinition]
+        The assets of the graph inputs, then those of the nodes in topological
+        order.
+    """
+
+    prefix = to_snake_case(graph_def.metadata.name)
+
+    if graph_def.spec.reference_counting is not None:
+        raise GraphDefinitionError(
+            "Reference counting keeps outputs in memory, which cannot be composed into assets "
+            "materialized by separate runs."
+        )
+
+    with profile_phase("compose", graph_def.metadata.name):
+        graph = create_graph_from_def(graph_def, targets)
+        for key, resource in graph.resources.items():
+            if resource is dagster.mem_io_manager:
+                raise GraphDefinitionError(
+                    f"IO manager `{key}` keeps outputs in memory, which cannot be composed into "
+                    "assets materialized by separate runs."
+                )
+
+        partitions_def = graph_partitions_def(graph_def)
+        backfill_policy = None
+        if graph_def.spec.partitions is not None:
+            backfill_policy = dagster.BackfillPolicy.multi_run(
+                graph_def.spec.partitions.max_partitions_per_run
+            )
+
+        for node, operation in graph.operations.items():
+            if any(output_def.is_dynamic for output_def in operation.output_defs):
+                raise GraphDefinitionError(
+                    f"Node `{node}` has dynamic outputs, which cannot be composed into assets."
+                )
+
+        input_step = to_snake_case(DEFAULT_INITIAL_DATA_NAME)
+        keys = asset_keys(graph, prefix)
+        input_io_managers = graph.io_managers.get(input_step, {})
+
+        assets = [
+            input_asset_builder(
+                keys[input_step][name],
+                value,
+                input_io_managers.get(name),
+                group_name=prefix,
+                partitions_def=partitions_def,
+                backfill_policy=backfill_policy,
+            )
+            for name, value in graph.initial_data.items()
+        ]
+
+        for node_id in graph.order:
+            node = graph.nodes[node_id]
+            operation = graph.operations[node]
+
+            keys_by_input_name = {}
+            for position, input_def in enumerate(
+                operation.input_defs[: len(graph.dependencies.get(node, []))]
+            ):
+                step, name = output_key(graph, node, position)
+                keys_by_input_name[input_def.name] = keys[step][name]
+
+            # Asset ops are named after their key, since several nodes may call the same op.
+            name = f"{prefix}__{node}"
+            if isinstance(operation, dagster.OpDefinition):
+                assets.append(
+                    dagster.AssetsDefinition.from_op(
+                        operation.with_replaced_properties(name=name),
+                        keys_by_input_name=keys_by_input_name,
+                        keys_by_output_name=keys[node],
+                        group_name=prefix,
+                        partitions_def=partitions_def,
+                        backfill_policy=backfill_policy,
+                    )
+                )
+            else:
+                assets.append(
+                    dagster.AssetsDefinition.from_graph(
+                        operation.copy(name=name),
+                        keys_by_input_name=keys_by_input_name,
+                        keys_by_output_name=keys[node],
+                        group_name=prefix,
+                        partitions_def=partitions_def,
+                        backfill_policy=backfill_policy,
+                    )
+                )
+
+    return list(dagster.with_resources(assets, graph.resources))
+
+
+def stale_asset_keys(
+    assets: Iterable[dagster.AssetsDefinition],
+    instance: dagster.DagsterInstance,
+    partition_key: Optional[str] = None,
+    overridden: Iterable[dagster.AssetKey] = (),
+) -> List[dagster.AssetKey]:
+    """
+    Return the keys of the assets that must be materialized to be up to date.
+
+    An asset is stale if it was never materialized, if it has no code version
+    or its code version differs from that of its latest materialization, if
+    one of its upstream assets was materialized again since with another data
+    version, or if one of its upstream assets is stale itself. Assets of graph
+    inputs are stale as well if their current data version differs from that
+    of their latest materialization, see function `current_input_data_version`,
+    for instance when a referenced file was modified or the input was
+    overridden in the run configuration of that materialization. Upstream
+    assets not in `assets` are never stale. Partitioned assets are compared to
+    the latest materialization of the partition given by `partition_key`.
+
+    Arguments
+    ---------
+    assets : Iterable[dagster.AssetsDefinition]
+        Assets, typically created by function `compose_assets`.
+
+    instance : dagster.DagsterInstance
+        Instance storing the materializations of the assets.
+
+    partition_key : Optional[str]
+        Key of the partition of partitioned assets.
+
+    overridden : Iterable[dagster.AssetKey]
+        Keys of assets considered stale, such as those of graph inputs
+        overridden in the run configuration.
+
+    Returns
+    -------
+    List[dagster.AssetKey]
+        Keys of the stale assets.
+    """
+
+    code_versions: Dict[dagster.AssetKey, Optional[str]] = {}
+    input_versions: Dict[dagster.AssetKey, Optional[str]] = {}
+    upstream: Dict[dagster.AssetKey, List[dagster.AssetKey]] = {}
+    for assets_def in assets:
+        code_versions.update(
+            (key, assets_def.code_versions_by_key[key]) for key in sorted(assets_def.keys)
+        )
+        input_versions.update(
+            (key, current_input_data_version(metadata))
+            for key, metadata in assets_def.metadata_by_key.items()
+        )
+        upstream.update({key: sorted(deps) for key, deps in assets_def.asset_deps.items()})
+
+    latest: Dict[dagster.AssetKey, Optional[Tuple[int, Dict[str, str]]]] = {}
+
+    def latest_materialization(key: dagster.AssetKey) -> Optional[Tuple[int, Dict[str, str]]]:
+        if key not in latest:
+            records = instance.fetch_materializations(
+                dagster.AssetRecordsFilter(
+                    asset_key=key,
+                    asset_partitions=None if partition_key is None else [partition_key],
+                ),
+                limit=1,
+            ).records
+            latest[key] = None
+            if records:
+                latest[key] = (
+                    records[0].storage_id,
+                    dict(records[0].asset_materialization.tags or {}),
+                )
+
+        return latest[key]
+
+    def upstream_changed(key_tags: Dict[str, str], dep: dagster.AssetKey) -> bool:
+        # Dagster records the data version of partitioned upstream assets
+        # differently than the assets themselves, but always the event read.
+        storage_id, dep_tags = latest_materialization(dep) or (None, {})
+        name = dep.to_user_string()
+        return key_tags.get(f"{INPUT_EVENT_POINTER_TAG_PREFIX}/{name}") != str(storage_id) and (
+            key_tags.get(f"{INPUT_DATA_VERSION_TAG_PREFIX}/{name}") != dep_tags.get(DATA_VERSION_TAG)
+        )
+
+    # Upstream assets are visited first, so that their staleness is known.
+    order = graphlib.TopologicalSorter(
+        {
+            key: [dep for dep in upstream.get(key, []) if dep in code_versions]
+            for key in code_versions
+        }
+    ).static_order()
+
+    stale: Set[dagster.AssetKey] = set(overridden)
+    for key in order:
+        materialization = latest_materialization(key)
+        if (
+            materialization is None
+            or code_versions[key] is None
+            or materialization[1].get(CODE_VERSION_TAG) != code_versions[key]
+            or input_versions[key] not in (None, materialization[1].get(DATA_VERSION_TAG))
+            or any(
+                dep in stale or upstream_changed(materialization[1], dep)
+                for dep in upstream.get(key, [])
+            )
+        ):
+            stale.add(key)
+
+    return [key for key in code_versions if key in stale]
+
+
+def materialize_stale(
+    assets: List[dagster.AssetsDefinition],
+    instance: dagster.DagsterInstance,
+    partition_key: Optional[str] = None,
+    **kwargs: Any,
+) -> Optional[dagster.ExecuteInProcessResult]:
+    """
+    Materialize the stale assets among `assets`, see function `stale_asset_keys`.
+
+    Other assets are loaded by the IO managers of their consumers, which must
+    therefore persist outputs across runs, like the default IO manager of a
+    persistent instance. Assets configured in the `run_config` keyword
+    argument, such as graph inputs overridden for this run, are stale.
+    Partitioned assets are materialized for the partition given by
+    `partition_key`. Keyword arguments are passed to `dagster.materialize`.
+    Returns `None` without starting a run if all assets are up to date.
+    """
+
+    configured = (kwargs.get("run_config") or {}).get("ops", {})
+    overridden = [
+        key
+        for assets_def in assets
+        if assets_def.node_def.name in configured
+        for key in assets_def.keys
+    ]
+
+    keys = stale_asset_keys(assets, instance, partition_key, overridden)
+    if not keys:
+        return None
+
+    return dagster.materialize(
+        assets, instance=instance, selection=keys, partition_key=partition_key, **kwargs
+    )
@@ -0,0 +1,201 @@
+import dataclasses
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import dagster
+
+from .compose import FileSignature, compose_job, file_signature, load_operation, load_subgraph
+from .formats import load_graph_def
+from .models import GraphDefinition
+from .util import op_code_version
+
+CodeVersions = Tuple[Tuple[str, Tuple[Optional[str], ...]], ...]
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a `CompositionCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+@dataclasses.dataclass
+class _CacheEntry:
+    """Composed job together with the code versions and subgraph files it was built from."""
+
+    code_versions: CodeVersions
+    job: dagster.JobDefinition
+    files: Dict[str, Optional[FileSignature]] = dataclasses.field(default_factory=dict)
+
+
+def operation_code_versions(function_paths: Tuple[str, ...]) -> CodeVersions:
+    """
+    Return the code versions of the operations in the given paths.
+
+    The code version of an op is its `code_version`. For graphs it is the
+    code version of every op in the graph, including nested graphs.
+
+    Arguments
+    ---------
+    function_paths : Tuple[str, ...]
+        Importable paths to dagster op or graph definitions.
+
+    Returns
+    -------
+    CodeVersions
+        Pairs of operation path and code versions, in the order of `function_paths`.
+    """
+
+    versions = []
+    for function_path in function_paths:
+        operation = load_operation(function_path)
+
+        if isinstance(operation, dagster.OpDefinition):
+            versions.append((function_path, (op_code_version(operation),)))
+        else:
+            versions.append(
+                (function_path, tuple(op_code_version(op) for op in operation.iterate_op_defs()))
+            )
+
+    return tuple(versions)
+
+
+class CompositionCache:
+    """
+    Least recently used cache of jobs composed from graph definitions.
+
+    Jobs are keyed by a hash of the content of the graph definition, and of
+    the path of its file when loaded by method `load_job`. An entry is
+    only reused while the code versions of the operations it references, as
+    returned by function `operation_code_versions`, and the definition files
+    of its subgraphs are unchanged. Note that changes to ops without a
+    `code_version` are therefore not detected.
+
+    The cache is safe to use from several threads.
+
+    Arguments
+    ---------
+    maxsize : int
+        Maximum number of jobs kept in the cache. The least recently used job
+        is evicted when the cache is full.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if maxsize < 1:
+            raise ValueError(f"Argument `maxsize` must be positive, got {maxsize}.")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[dagster.JobDefinition]:
+        """Return the cached job for `key` if its code versions are still current."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                function_paths = tuple(path for path, _ in entry.code_versions)
+
+                if operation_code_versions(function_paths) == entry.code_versions and all(
+                    file_signature(path) == signature for path, signature in entry.files.items()
+                ):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.job
+
+            self.misses += 1
+            return None
+
+    def _put(self, key: str, graph_def: GraphDefinition, job: dagster.JobDefinition) -> None:
+        """Store `job` composed from `graph_def` under `key`, evicting old entries if needed."""
+
+        function_paths = tuple(op.function for op in graph_def.spec.operations if op.function)
+        files = {}
+        for op in graph_def.spec.operations:
+            if op.graph is not None:
+                files.update(load_subgraph(op.graph).files)
+
+        entry = _CacheEntry(
+            code_versions=operation_code_versions(function_paths), job=job, files=files
+        )
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def compose_job(
+        self, graph_def: GraphDefinition, targets: Optional[List[str]] = None
+    ) -> dagster.JobDefinition:
+        """
+        Return the job composed from `graph_def`, compiling it on a cache miss.
+
+        See function `compose_job` for details about the composition.
+        """
+
+        content = graph_def.model_dump_json(by_alias=True)
+        if targets is not None:
+            content += json.dumps(targets)
+
+        key = hashlib.sha256(content.encode()).hexdigest()
+
+        job = self._get(key)
+        if job is None:
+            job = compose_job(graph_def, targets)
+            self._put(key, graph_def, job)
+
+        return job
+
+    def load_job(self, file_path: str | Path) -> dagster.JobDefinition:
+        """
+        Return the job composed from the graph definition in `file_path`.
+
+        The absolute path and the content of the file are hashed directly, so
+        that on a cache hit the file is neither parsed nor validated. The path
+        is part of the key since relative paths in the definition are resolved
+        against its directory, see function `resolve_paths`.
+        """
+
+        path = Path(file_path).resolve()
+        key = hashlib.sha256(str(path).encode() + b"\0" + path.read_bytes()).hexdigest()
+
+        job = self._get(key)
+        if job is None:
+            graph_def = load_graph_def(file_path)
+            job = compose_job(graph_def)
+            self._put(key, graph_def, job)
+
+        return job
+
+    def info(self) -> CacheInfo:
+        """Return the statistics of the cache."""
+
+        with self._lock:
+            return CacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                maxsize=self.maxsize,
+                currsize=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        """Remove all jobs from the cache and reset its statistics."""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -1,19 +1,49 @@
+import dataclasses
+import inspect
+import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 import dagster
-import jsonpointer
-import yaml
 
+from .deduplication import MERGED_NODES_TAG, merge_duplicate_nodes
+from .dynamic import invoke_node, validate_input_modes
+from .errors import GraphDefinitionError
+from .file_inputs import FILE_INPUT_IO_MANAGER_KEY, file_input_io_manager
+from .formats import (
+    load_graph_def,
+    load_graph_def_from_yaml,  # noqa: F401 Re-exported for compatibility.
+)
+from .fusion import FUSED_NODES_TAG, fuse_linear_chains
+from .index import graph_depth, index_graph, prune_graph
+from .io_managers import apply_io_managers, select_io_managers, use_reference_counting
 from .jobs import input_op_builder
+from .memoization import memoize_operations
 from .models import (
     DEFAULT_INITIAL_DATA_NAME,
     DEFAULT_OUTPUT_KEY_NAME,
     DEFAULT_OUTPUT_POINTER,
+    CompiledPointer,
+    FileInputDefinition,
     Graph,
     GraphDefinition,
 )
-from .util import import_object, to_snake_case
+from .partitions import MAX_PARTITIONS_PER_RUN_TAG, graph_partitions_def
+from .pointers import compile_dependency_pointer
+from .profiling import COMPILE_PROFILE_TAG, active_profiler, profile_phase
+from .resources import (
+    load_resource,  # noqa: F401 Re-exported for compatibility.
+    resource_registry,
+)
+from .scheduling import load_durations, prioritize_graph
+from .streaming import fuse_streaming_segments
+from .telemetry import telemetry_hooks
+from .util import FileSignature, file_signature, import_object, recursion_limit, to_snake_case
+
+# Dagster walks job dependencies recursively when validating a job, using a few
+# frames for every node along the longest dependency chain.
+DAGSTER_FRAMES_PER_NODE = 4
 
 
 def load_operation(
@@ -35,32 +65,211 @@ def load_operation(
     return operation
 
 
-def load_resource(
-    function_path: str,
-) -> dagster.ResourceDefinition | dagster.ConfigurableResource:
-    """Return a dynamically loaded dagster resource definition from the given path."""
-
-    resource = import_object(function_path)
-    assert issubclass(resource, dagster.ConfigurableResource) or isinstance(
-        resource, dagster.ResourceDefinition
-    ), (
-        f"Loaded object from `{function_path}` must be of type `ResourceDefinition` or "
-        f"inherit from `ConfigurableResource`. Instead its type is `{type(resource)}`."
+def load_operations(
+    graph_def: GraphDefinition,
+) -> Tuple[Dict[str, dagster.GraphDefinition | dagster.OpDefinition], Dict[str, Any]]:
+    """
+    Return the operations of a graph and the resources required by its subgraphs.
+
+    Operations are loaded from their function by function `load_operation`,
+    or compiled from their graph definition file by function `load_subgraph`.
+
+    Raises `GraphDefinitionError` if an operation declares both or neither a
+    function and a graph, or subgraphs require different resources under the
+    same name.
+    """
+
+    operations: Dict[str, dagster.GraphDefinition | dagster.OpDefinition] = {}
+    resources: Dict[str, Any] = {}
+
+    for op in graph_def.spec.operations:
+        if (op.function is None) == (op.graph is None):
+            raise GraphDefinitionError(
+                f"Operation `{op.name}` must declare either a `function` or a `graph`."
+            )
+
+        if op.function is not None:
+            operations[op.name] = load_operation(op.function)
+            continue
+
+        subgraph = load_subgraph(op.graph)
+        operations[op.name] = subgraph.graph
+        for name, resource in subgraph.resources.items():
+            if resources.setdefault(name, resource) is not resource:
+                raise GraphDefinitionError(
+                    f"Subgraph `{op.graph}` of operation `{op.name}` requires resource "
+                    f"`{name}`, which another subgraph declares differently."
+                )
+
+    return operations, resources
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledSubgraph:
+    """
+    Dagster graph compiled from a graph definition file, see function `load_subgraph`.
+
+    `files` contains the modification time and size of the definition file
+    and of the files of all subgraphs it includes, by path, when it was
+    compiled.
+    """
+
+    graph: dagster.GraphDefinition
+    resources: Dict[str, Any]
+    files: Dict[str, Optional[FileSignature]]
+
+    def is_current(self) -> bool:
+        """Return whether no file the subgraph was compiled from changed since."""
+
+        return all(file_signature(path) == signature for path, signature in self.files.items())
+
+
+# Subgraphs compiled in this process by path of their definition file, and the
+# files read by the subgraphs being compiled by every thread, innermost last.
+_subgraphs: Dict[str, CompiledSubgraph] = {}
+_subgraphs_lock = threading.Lock()
+_compiling = threading.local()
+
+
+def load_subgraph(file_path: str | Path) -> CompiledSubgraph:
+    """
+    Return the dagster graph compiled from a graph definition file.
+
+    Every file is compiled once per process by function `compile_subgraph` and
+    shared by all graphs including it, until the file or the file of a
+    subgraph it includes is modified.
+
+    Raises `GraphDefinitionError` if the subgraph includes itself, directly or
+    through other subgraphs.
+    """
+
+    path = str(Path(file_path).resolve())
+    stack: List[Tuple[str, Dict[str, Optional[FileSignature]]]] = _compiling.__dict__.setdefault(
+        "stack", []
+    )
+
+    subgraph = _subgraphs.get(path)
+    if subgraph is None or not subgraph.is_current():
+        if path in [frame_path for frame_path, _ in stack]:
+            cycle = [frame_path for frame_path, _ in stack] + [path]
+            raise GraphDefinitionError(f"Subgraph includes itself: {' -> '.join(cycle)}")
+
+        files: Dict[str, Optional[FileSignature]] = {path: file_signature(path)}
+        stack.append((path, files))
+        try:
+            graph, resources = compile_subgraph(load_graph_def(path))
+        finally:
+            stack.pop()
+
+        subgraph = CompiledSubgraph(graph=graph, resources=resources, files=files)
+        with _subgraphs_lock:
+            _subgraphs[path] = subgraph
+
+    # Graphs including this subgraph depend on its files as well.
+    for _, files in stack:
+        files.update(subgraph.files)
+
+    return subgraph
+
+
+def invalidate_subgraphs() -> None:
+    """Forget all compiled subgraphs, so that they are compiled again on next use."""
+
+    with _subgraphs_lock:
+        _subgraphs.clear()
+
+
+def compile_subgraph(
+    graph_def: GraphDefinition,
+) -> Tuple[dagster.GraphDefinition, Dict[str, Any]]:
+    """
+    Compile a graph definition into a dagster graph to be used as an operation.
+
+    The inputs of the dagster graph are the graph inputs, in declaration
+    order, and must all be passed by the nodes using it. Their values in the
+    definition are not used. The outputs of the graph are those of its
+    targets, or otherwise of the nodes no other node depends on. A single
+    output is named `result`, so that it is referenced like the output of an
+    op, while several outputs are named after their node, followed by the
+    name of the output for nodes with several outputs.
+
+    Executor, resources and other settings of the job are taken from the graph
+    including the subgraph. Resources declared by the subgraph are returned,
+    so that they are provided to that job.
+
+    Arguments
+    ---------
+    graph_def : GraphDefinition
+        Definition of the composable graph.
+
+    Returns
+    -------
+    Tuple[dagster.GraphDefinition, Dict[str, Any]]
+        The dagster graph and the resources it requires, by name.
+    """
+
+    graph = create_graph_from_def(graph_def)
+
+    sinks = graph_def.spec.targets or [
+        node for node_id, node in enumerate(graph.nodes) if not graph.downstream[node_id]
+    ]
+    outputs = [
+        (node, output_def.name)
+        for node in sinks
+        for output_def in graph.operations[node].output_defs
+    ]
+    output_names = {
+        (node, key): node if key == DEFAULT_OUTPUT_KEY_NAME else f"{node}_{key}"
+        for node, key in outputs
+    }
+    if len(outputs) == 1:
+        output_names = {outputs[0]: DEFAULT_OUTPUT_KEY_NAME}
+
+    def wire(**inputs: Any) -> Dict[str, Any]:
+        results: Dict[str, Any] = dict(inputs)
+        for node_id in graph.order:
+            evaluate_node(graph, graph.nodes[node_id], results)
+
+        return {name: results[node][key] for (node, key), name in output_names.items()}
+
+    # Dagster reads the positional inputs of a graph from the signature of its
+    # function, so nodes pass inputs to the subgraph in declaration order.
+    wire.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [
+            inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+            for name in graph.initial_data
+        ]
     )
-    return resource
+
+    with recursion_limit(sys.getrecursionlimit() + DAGSTER_FRAMES_PER_NODE * graph_depth(graph)):
+        subgraph = dagster.graph(
+            name=to_snake_case(graph_def.metadata.name),
+            description=graph_def.spec.description,
+            ins={name: dagster.GraphIn() for name in graph.initial_data},
+            out={name: dagster.GraphOut() for name in output_names.values()},
+        )(wire)
+
+    return subgraph, graph.resources
 
 
 def load_executor(
     function_path: str,
+    config: Optional[Dict[str, Any]] = None,
 ) -> dagster.ExecutorDefinition:
-    """Return a dynamically loaded dagster executor definition from the given path."""
+    """
+    Return a dynamically loaded dagster executor definition from the given path.
+
+    The executor is configured with `config`, if given, for instance with the
+    `max_concurrent` steps or the `tag_concurrency_limits` of
+    `dagster.multiprocess_executor`.
+    """
 
     executor = import_object(function_path)
     assert isinstance(executor, dagster.ExecutorDefinition), (
         f"Loaded object from `{function_path}` must be of type `ExecutorDefinition`. "
         f"Instead its type is `{type(executor)}`."
     )
-    return executor
+    return executor.configured(config) if config else executor
 
 
 def dictify_graph_output(out: Any, key: str = DEFAULT_OUTPUT_KEY_NAME) -> Dict[str, Any]:
@@ -99,57 +308,200 @@ def dictify_graph_output(out: Any, key: str = DEFAULT_OUTPUT_KEY_NAME) -> Dict[s
     return {key: out}
 
 
-def create_graph_from_def(graph_def: GraphDefinition) -> Graph:
-    """Return a `Graph` object constructed from its definition.
+def compile_dependencies(
+    graph_def: GraphDefinition,
+    operations: Dict[str, dagster.GraphDefinition | dagster.OpDefinition],
+) -> Tuple[Dict[str, List[Tuple[str, CompiledPointer | None]]], Dict[str, Dict[int, str]]]:
+    """
+    Return the dependencies of every node and the modes of inputs not passed as values.
 
-    After defining a composable graph this function iterates over the
-    dependencies, converting them into nodes.
+    Pointers are compiled by function `compile_dependency_pointer`, see
+    attributes `dependencies` and `input_modes` of class `Graph`.
 
     Arguments
     ---------
     graph_def : GraphDefinition
         Definition of the composable graph.
 
+    operations : Dict[str, dagster.GraphDefinition | dagster.OpDefinition]
+        Loaded operations of the graph, by name.
+
     Returns
     -------
-    Graph
-        The processed graph.
+    Tuple[Dict[str, List[Tuple[str, CompiledPointer | None]]], Dict[str, Dict[int, str]]]
+        Dependencies and input modes by node name.
     """
 
-    operations = {op.name: load_operation(op.function) for op in graph_def.spec.operations}
-    resources = {res.name: load_resource(res.import_field)() for res in graph_def.spec.resources}
-
-    executor = None
-    if graph_def.spec.executor is not None:
-        executor = load_executor(graph_def.spec.executor)
-
     dependencies = {}
+    input_modes: Dict[str, Dict[int, str]] = {}
+
     for dep in graph_def.spec.dependencies:
         node_deps = []
-        for input_def in dep.inputs:
+        for position, input_def in enumerate(dep.inputs):
             if isinstance(input_def, str):
-                node_deps.append((input_def, DEFAULT_OUTPUT_POINTER))
+                input_node, pointer = input_def, DEFAULT_OUTPUT_POINTER
             else:
-                node_deps.append((input_def.node, input_def.pointer))
+                input_node, pointer = input_def.node, input_def.pointer
+
+                if input_def.mode != "value":
+                    input_modes.setdefault(dep.name, {})[position] = input_def.mode
+
+            node_deps.append(
+                (input_node, compile_dependency_pointer(dep.name, input_node, pointer, operations))
+            )
 
         dependencies[dep.name] = node_deps
 
-    return Graph(
-        operations=operations,
-        dependencies=dependencies,
-        initial_data=graph_def.spec.inputs,
-        resources=resources,
-        executor=executor,
+    return dependencies, input_modes
+
+
+def create_graph_from_def(graph_def: GraphDefinition, targets: Optional[List[str]] = None) -> Graph:
+    """Return a `Graph` object constructed from its definition.
+
+    Operations are imported, and those referencing another graph definition
+    file are compiled by function `load_subgraph`. Pointers of dependencies
+    are compiled and validated against the outputs declared by the operations
+    they reference, then nodes are indexed and sorted in topological order,
+    so that the graph can be wired in a single pass. Dynamic outputs must be
+    mapped or collected, see function `validate_input_modes`.
+
+    The indexed graph then goes through the following passes, in order:
+
+    1. When targets are given, the graph is pruned to the nodes needed to
+       compute them, see function `prune_graph`.
+    2. IO managers selected by operations and inputs are recorded for the
+       outputs they pass, see function `select_io_managers`.
+    3. Nodes linked by streamed inputs are fused into a single op passing
+       chunks through generators, see function `fuse_streaming_segments`.
+    4. When `spec.deduplication` is set, nodes calling the same operation with
+       the same inputs are merged, see function `merge_duplicate_nodes`.
+       Targets are never merged into other nodes, so their outputs remain
+       available.
+    5. Operations with a `cache` definition reuse stored results, see function
+       `memoize_operations`.
+    6. When `spec.fusion` is set, linear chains of plain ops are fused into
+       single steps, see function `fuse_linear_chains`. Targets are never
+       fused into the nodes consuming them, so their outputs remain available.
+    7. Ops are copied with the selected IO managers set on their outputs, see
+       function `apply_io_managers`.
+    8. When `spec.prioritization` is set, nodes are prioritized along the
+       critical path, see function `prioritize_graph`.
+
+    Finally, resources are added to the graph. When `spec.referenceCounting`
+    is set, the job uses an IO manager releasing outputs once their last
+    consumer loaded them, see class `ReferenceCountingIOManager`, and the
+    in-process executor. Inputs
+    referencing a file are passed by the IO manager under resource key
+    `file_input_io_manager`, see class `FileInputIOManager`, unless the graph
+    declares its own. When `spec.telemetry` is set, hooks recording runtime
+    figures are attached to every node, see function `telemetry_hooks`.
+
+    Raises `GraphDefinitionError` if a dependency references an unknown node or
+    output, an operation is named like a graph input, or reference counting is
+    enabled with an executor running steps in separate processes, and
+    `CyclicDependencyError` if the dependencies contain a cycle.
+
+    Arguments
+    ---------
+    graph_def : GraphDefinition
+        Definition of the composable graph.
+
+    targets : Optional[List[str]]
+        Names of the nodes whose outputs are requested. Defaults to
+        `spec.targets`. If empty, all nodes are kept.
+
+    Returns
+    -------
+    Graph
+        The processed graph.
+    """
+
+    operations, resources = load_operations(graph_def)
+    resources.update(
+        (res.name, resource_registry.get(res.import_field, res.config))
+        for res in graph_def.spec.resources
     )
 
+    executor_def = graph_def.spec.executor_definition()
+    executor = None
+    if executor_def is not None:
+        executor = load_executor(executor_def.import_field, executor_def.config)
+
+    with profile_phase("index", graph_def.metadata.name):
+        dependencies, input_modes = compile_dependencies(graph_def, operations)
+
+        graph = index_graph(
+            Graph(
+                operations=operations,
+                dependencies=dependencies,
+                initial_data=graph_def.spec.inputs,
+                resources=resources,
+                executor=executor,
+                input_modes=input_modes,
+                tags={op.name: op.node_tags() for op in graph_def.spec.operations if op.node_tags()},
+                cost_hints={
+                    op.name: op.cost_hint
+                    for op in graph_def.spec.operations
+                    if op.cost_hint is not None
+                },
+            )
+        )
+        validate_input_modes(graph)
+
+        if targets is None:
+            targets = graph_def.spec.targets
+
+        if targets:
+            graph = prune_graph(graph, targets)
+
+        graph = select_io_managers(graph_def, graph)
+
+        caches = {op.name: op.cache for op in graph_def.spec.operations if op.cache is not None}
+        graph = fuse_streaming_segments(graph, graph_def.spec.dependencies, caches)
+
+        if graph_def.spec.deduplication:
+            graph = merge_duplicate_nodes(graph, caches, keep=targets)
+
+        if caches:
+            graph = memoize_operations(
+                graph, graph_def.spec.operations, to_snake_case(graph_def.metadata.name)
+            )
+
+        if graph_def.spec.fusion:
+            graph = fuse_linear_chains(graph, keep=targets)
+
+        if graph.io_managers:
+            graph = apply_io_managers(graph)
+
+        if graph_def.spec.prioritization is not None:
+            stats = graph_def.spec.prioritization.stats
+            job_name = to_snake_case(graph_def.metadata.name)
+            graph = prioritize_graph(graph, load_durations(stats, job_name) if stats else None)
+
+        if graph_def.spec.reference_counting is not None:
+            graph = use_reference_counting(graph, graph_def.spec.reference_counting)
+
+        if any(isinstance(value, FileInputDefinition) for value in graph.initial_data.values()):
+            graph.resources.setdefault(FILE_INPUT_IO_MANAGER_KEY, file_input_io_manager)
+
+        if graph_def.spec.telemetry is not None:
+            graph.hooks |= telemetry_hooks(
+                sink=graph_def.spec.telemetry.sink,
+                observations=graph_def.spec.telemetry.observations,
+            )
+
+    return graph
+
 
 def evaluate_node(graph: Graph, node: str, results: Dict[str, Any]) -> Dict[str, Any]:
     """
     Evaluate a single node in a graph.
 
-    This function is called for each operation in a `Graph` object. If the
-    operation has not been visited before, the corresponding dagster
-    `OpDefinition` or `GraphDefinition` is invoked.
+    This function is called for each operation in a `Graph` object, invoking
+    the corresponding dagster `OpDefinition` or `GraphDefinition`.
+
+    The dependencies of the node must have been evaluated beforehand, which
+    function `evaluate_graph` guarantees by following `graph.order`.
 
     Note that this function is intended to be evaluated inside a function
     decorated by `@dagster.job`.
@@ -173,29 +525,25 @@ def evaluate_node(graph: Graph, node: str, results: Dict[str, Any]) -> Dict[str,
         Output of evaluating this node, processed by function `dictify_graph_output`.
     """
 
-    if node in results:
-        return results[node]
-
-    if node not in graph.dependencies or not graph.dependencies[node]:
-        # IF the node does not have any dependencies it can be directly
-        # invoked.
-        result = graph.operations[node].alias(node)()
+    # Dependencies are resolved from previous results, then passed as
+    # positional arguments, mapping over or collecting dynamic outputs. Tags of
+    # the node and hooks of the graph are attached to the aliased node.
+    input_values = []
 
-    else:
-        # If the node does have dependencies they are loaded and resolved, then
-        # passed as positional arguments.
+    for dep, pointer in graph.dependencies.get(node, []):
+        if pointer is None:
+            input_values.append(results[dep])
+        else:
+            input_values.append(pointer.resolve(results[dep]))
 
-        input_values = []
+    invocation = graph.operations[node].alias(node)
+    if node in graph.tags:
+        invocation = invocation.tag(graph.tags[node])
 
-        for dep, pointer in graph.dependencies[node]:
-            dep_result = evaluate_node(graph, dep, results)
+    if graph.hooks:
+        invocation = invocation.with_hooks(graph.hooks)
 
-            if isinstance(dep_result, dict):
-                input_values.append(jsonpointer.resolve_pointer(dep_result, pointer))
-            else:
-                input_values.append(dep_result)
-
-        result = graph.operations[node].alias(node)(*input_values)
+    result = invoke_node(invocation, input_values, graph.input_modes.get(node, {}))
 
     results[node] = dictify_graph_output(result)
     return results[node]
@@ -206,7 +554,7 @@ def evaluate_graph(graph: Graph) -> Dict[str, Any]:
     Iterate over operations in the `graph` evaluating nodes.
 
     This function generates the initial data from the graph definition and then
-    evaluates all operations in the graph.
+    evaluates all operations in the graph in topological order.
 
     Arguments
     ---------
@@ -219,50 +567,69 @@ def evaluate_graph(graph: Graph) -> Dict[str, Any]:
         Output of evaluating every node in the graph.
     """
 
-    results = dictify_graph_output(input_op_builder(DEFAULT_INITIAL_DATA_NAME, graph.initial_data)())
+    input_op = input_op_builder(
+        DEFAULT_INITIAL_DATA_NAME,
+        graph.initial_data,
+        graph.io_managers.get(to_snake_case(DEFAULT_INITIAL_DATA_NAME)),
+    )
+    results = dictify_graph_output(input_op())
 
-    for node in graph.operations:
-        evaluate_node(graph, node, results)
+    for node_id in graph.order:
+        evaluate_node(graph, graph.nodes[node_id], results)
 
     return results
 
 
-def load_graph_def_from_yaml(file_path: str | Path) -> GraphDefinition:
+def compose_job(
+    graph_def: GraphDefinition, targets: Optional[List[str]] = None
+) -> dagster.JobDefinition:
     """
-    Load a `GraphDefinition` from a file in `.yaml` format.
-
-    Arguments
-    ---------
-    file_path : str | Path
-        Path to the file to load.
+    Compile a graph definition into a dagster `JobDefinition.
 
-    Returns
-    -------
-    GraphDefinition
-        The definition of the graph.
+    Given the provided `GraphDefinition`, this function generates a dagster job
+    from it. If `targets` is given, or otherwise `spec.targets` is set, the job
+    only contains the nodes needed to compute the outputs of those nodes.
     """
 
-    return GraphDefinition.model_validate(yaml.safe_load(Path(file_path).read_text()))
+    name = to_snake_case(graph_def.metadata.name)
 
+    with profile_phase("compose", graph_def.metadata.name):
+        graph = create_graph_from_def(graph_def, targets)
+        partitions_def = graph_partitions_def(graph_def)
 
-def compose_job(graph_def: GraphDefinition) -> dagster.JobDefinition:
-    """
-    Compile a graph definition into a dagster `JobDefinition.
+        with recursion_limit(sys.getrecursionlimit() + DAGSTER_FRAMES_PER_NODE * graph_depth(graph)):
+            with profile_phase("wire", graph_def.metadata.name):
 
-    Given the provided `GraphDefinition`, this function generates a dagster job
-    from it.
-    """
+                @dagster.graph(name=name, description=graph_def.spec.description)
+                def composed_graph() -> None:
+                    evaluate_graph(graph)
 
-    graph = create_graph_from_def(graph_def)
+            metadata: Dict[str, Any] = {}
+            if graph_def.spec.partitions is not None:
+                metadata[MAX_PARTITIONS_PER_RUN_TAG] = (
+                    graph_def.spec.partitions.max_partitions_per_run
+                )
 
-    @dagster.job(
-        name=to_snake_case(graph_def.metadata.name),
-        description=graph_def.spec.description,
-        tags=graph_def.metadata.annotations,
-        resource_defs=graph.resources,
-        executor_def=graph.executor,
-    )
-    def composed_job() -> None:
-        evaluate_graph(graph)
+            if graph.fused:
+                metadata[FUSED_NODES_TAG] = graph.fused
+
+            if graph.merged:
+                metadata[MERGED_NODES_TAG] = graph.merged
+
+            with profile_phase("job", graph_def.metadata.name):
+                job = composed_graph.to_job(
+                    tags=graph_def.metadata.annotations,
+                    resource_defs=graph.resources,
+                    executor_def=graph.executor,
+                    partitions_def=partitions_def,
+                    metadata=metadata or None,
+                )
+
+        # The summary is attached once the job is built, so that it covers the
+        # construction of the job by dagster as well.
+        profiler = active_profiler()
+        if profiler is not None and profiler.attach_metadata:
+            summary = profiler.summary(graph_def.metadata.name)
+            job = job.with_metadata({**job.metadata, COMPILE_PROFILE_TAG: summary})
 
-    return composed_job
+        return job
@@ -0,0 +1,140 @@
+import dataclasses
+from typing import Any, Collection, Dict, Hashable, Optional, Tuple
+
+import dagster
+
+from .index import index_graph
+from .models import DEFAULT_OUTPUT_KEY_NAME, CacheDefinition, Graph
+
+MERGED_NODES_TAG = "dagster-composable-graphs/merged-nodes"
+
+
+def node_signature(
+    graph: Graph,
+    node: str,
+    merged: Dict[str, str],
+    caches: Optional[Dict[str, CacheDefinition]] = None,
+) -> Tuple[Hashable, ...]:
+    """
+    Return the canonical form of a node, identical for nodes computing the same outputs.
+
+    The signature contains the operation of the node, its inputs after
+    replacing merged nodes by the node they were merged into, with their
+    pointers and modes, its tags, the IO managers of its outputs, its cost
+    hint and its cache definition in `caches`, if any, so that merged nodes
+    are executed and memoized like their duplicates.
+    """
+
+    cache = (caches or {}).get(node)
+
+    modes = graph.input_modes.get(node, {})
+    inputs = tuple(
+        (merged.get(dep, dep), pointer, modes.get(position, "value"))
+        for position, (dep, pointer) in enumerate(graph.dependencies.get(node, []))
+    )
+
+    return (
+        id(graph.operations[node]),
+        inputs,
+        tuple(sorted(graph.tags.get(node, {}).items())),
+        tuple(sorted(graph.io_managers.get(node, {}).items())),
+        graph.cost_hints.get(node),
+        None if cache is None else cache.model_dump_json(),
+    )
+
+
+def merge_duplicate_nodes(
+    graph: Graph,
+    caches: Optional[Dict[str, CacheDefinition]] = None,
+    keep: Collection[str] = (),
+) -> Graph:
+    """
+    Return a copy of `graph` where nodes with the same signature are merged.
+
+    Nodes are compared by function `node_signature` in topological order, so
+    that nodes depending on merged duplicates are merged in turn. Every
+    duplicate is replaced by the first node of its signature, which consumers
+    of the duplicate reference instead. Merged nodes are recorded in
+    `graph.merged`, by name of the duplicate.
+
+    Operations are compared as loaded, so nodes calling the same function path
+    share the same operation. Operations must be deterministic for merging to
+    be safe. Nodes without inputs, which may read the clock or any other
+    state, are only merged if they are memoized: their stored results are
+    reused anyway.
+
+    Merged nodes are not part of the job, so dagster does not know their
+    outputs by their own name. Nodes in `keep`, such as the targets of the
+    graph, are never merged into another node, and outputs of other merged
+    nodes are read with function `output_for_node`.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    caches : Optional[Dict[str, CacheDefinition]]
+        Cache definitions of memoized operations, by node name, see function
+        `memoize_operations`.
+
+    keep : Collection[str]
+        Names of the nodes kept in the graph.
+
+    Returns
+    -------
+    Graph
+        The graph without duplicate nodes.
+    """
+
+    caches = caches or {}
+    merged = dict(graph.merged)
+    survivors: Dict[Tuple[Hashable, ...], str] = {}
+
+    for node_id in graph.order:
+        node = graph.nodes[node_id]
+        if not graph.dependencies.get(node) and node not in caches:
+            continue
+
+        signature = node_signature(graph, node, merged, caches)
+        survivor = survivors.setdefault(signature, node)
+        if survivor != node and node not in keep:
+            merged[node] = survivor
+
+    if len(merged) == len(graph.merged):
+        return graph
+
+    def kept(mapping: Dict[str, Any]) -> Dict[str, Any]:
+        return {node: value for node, value in mapping.items() if node not in merged}
+
+    return index_graph(
+        dataclasses.replace(
+            graph,
+            operations=kept(graph.operations),
+            dependencies={
+                node: [(merged.get(dep, dep), pointer) for dep, pointer in node_deps]
+                for node, node_deps in kept(graph.dependencies).items()
+            },
+            input_modes=kept(graph.input_modes),
+            fused=kept(graph.fused),
+            tags=kept(graph.tags),
+            cost_hints=kept(graph.cost_hints),
+            merged=merged,
+            io_managers=kept(graph.io_managers),
+        )
+    )
+
+
+def output_for_node(
+    result: dagster.ExecuteInProcessResult, node: str, output_name: str = DEFAULT_OUTPUT_KEY_NAME
+) -> Any:
+    """
+    Return an output of a node of an executed job, also if the node was merged.
+
+    Outputs of merged nodes are those of the node they were merged into, see
+    function `merge_duplicate_nodes`. `result.output_for_node` of dagster
+    raises for the names of merged nodes, which are not part of the job.
+    """
+
+    entry = result.job_def.metadata.get(MERGED_NODES_TAG)
+    merged = entry.value if entry is not None else {}
+    return result.output_for_node(merged.get(node, node), output_name)
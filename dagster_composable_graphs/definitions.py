@@ -0,0 +1,232 @@
+import concurrent.futures
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Literal, Optional
+
+import dagster
+
+from .compose import compose_job
+from .errors import GraphLoadError
+from .formats import load_graph_def
+from .imports import import_registry
+from .models import GraphDefinition
+from .resources import ResourceKey, ResourceRegistry
+
+
+def referenced_modules(graph_def: GraphDefinition) -> List[str]:
+    """Return the paths of the modules imported when composing `graph_def`."""
+
+    object_paths = [op.function for op in graph_def.spec.operations if op.function is not None]
+    object_paths.extend(res.import_field for res in graph_def.spec.resources)
+
+    executor_def = graph_def.spec.executor_definition()
+    if executor_def is not None:
+        object_paths.append(executor_def.import_field)
+
+    return list(dict.fromkeys(path.rpartition(".")[0] for path in object_paths))
+
+
+def load_graph_defs(
+    file_paths: Iterable[Path],
+    workers: Optional[int] = None,
+    pool: Literal["process", "thread"] = "process",
+) -> Dict[Path, GraphDefinition | Exception]:
+    """
+    Parse and validate several graph definition files in parallel.
+
+    Files are loaded by function `load_graph_def`, in the format given by their
+    extension.
+
+    Arguments
+    ---------
+    file_paths : Iterable[Path]
+        Paths to the files to load.
+
+    workers : Optional[int]
+        Number of workers parsing files. Defaults to the number of processors.
+        With a single worker files are loaded in the calling thread.
+
+    pool : Literal["process", "thread"]
+        Whether workers are processes or threads.
+
+    Returns
+    -------
+    Dict[Path, GraphDefinition | Exception]
+        The graph definition of every file, or the exception raised while
+        loading it.
+    """
+
+    file_paths = list(file_paths)
+    results: Dict[Path, GraphDefinition | Exception] = {}
+
+    if (workers or os.cpu_count() or 1) == 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            try:
+                results[file_path] = load_graph_def(file_path)
+            except Exception as exc:
+                results[file_path] = exc
+
+        return results
+
+    executor_class = (
+        concurrent.futures.ProcessPoolExecutor
+        if pool == "process"
+        else concurrent.futures.ThreadPoolExecutor
+    )
+
+    with executor_class(max_workers=workers) as executor:
+        futures = {file_path: executor.submit(load_graph_def, file_path) for file_path in file_paths}
+
+        for file_path, future in futures.items():
+            try:
+                results[file_path] = future.result()
+            except Exception as exc:
+                results[file_path] = exc
+
+    return results
+
+
+def load_definitions_from_directory(
+    path: str | Path,
+    pattern: str = "*.yaml",
+    workers: Optional[int] = None,
+    pool: Literal["process", "thread"] = "process",
+    import_workers: Optional[int] = 1,
+) -> dagster.Definitions:
+    """
+    Return dagster `Definitions` with a job for every graph definition file in a directory.
+
+    Files are parsed and validated in parallel by function `load_graph_defs`.
+    The distinct modules referenced by the graph definitions are then imported
+    once in the calling process by the shared `import_registry`, see method
+    `ImportRegistry.prefetch`, and jobs are composed with function
+    `compose_job`.
+    Resources declared by the graphs are merged into the resources of the
+    returned `Definitions`.
+
+    Raises `GraphLoadError` reporting every file that failed to load, either
+    because it is not a valid graph definition, a module cannot be imported,
+    the job cannot be composed or it declares a resource whose name is used by
+    another graph for a different resource.
+
+    Arguments
+    ---------
+    path : str | Path
+        Directory containing the graph definition files.
+
+    pattern : str
+        Glob pattern of the files to load, relative to `path`. Files may be in
+        any format supported by function `load_graph_def`.
+
+    workers : Optional[int]
+        Number of workers parsing files. Defaults to the number of processors.
+
+    pool : Literal["process", "thread"]
+        Whether workers are processes or threads.
+
+    import_workers : Optional[int]
+        Number of threads importing modules. By default modules are imported
+        in the calling thread. With `None`, the default of
+        `concurrent.futures.ThreadPoolExecutor`.
+
+    Returns
+    -------
+    dagster.Definitions
+        Definitions containing the jobs and resources of all graphs.
+    """
+
+    file_paths = sorted(Path(path).glob(pattern))
+    graph_defs = load_graph_defs(file_paths, workers=workers, pool=pool)
+    errors: Dict[Path, Exception] = {
+        file_path: result
+        for file_path, result in graph_defs.items()
+        if isinstance(result, Exception)
+    }
+
+    modules = {
+        file_path: referenced_modules(graph_def)
+        for file_path, graph_def in graph_defs.items()
+        if file_path not in errors
+    }
+    import_errors = import_registry.prefetch(
+        (module_path for module_paths in modules.values() for module_path in module_paths),
+        workers=import_workers,
+    )
+    for file_path, module_paths in modules.items():
+        failed = [path for path in module_paths if path in import_errors]
+        if failed:
+            errors[file_path] = import_errors[failed[0]]
+
+    return compose_definitions(graph_defs, errors)
+
+
+def compose_definitions(
+    graph_defs: Dict[Path, GraphDefinition | Exception],
+    errors: Dict[Path, Exception],
+    compose: Callable[[Path, GraphDefinition], dagster.JobDefinition] = (
+        lambda _, graph_def: compose_job(graph_def)
+    ),
+) -> dagster.Definitions:
+    """
+    Return dagster `Definitions` with the jobs composed from graph definitions.
+
+    Resources declared by the graphs are merged into the resources of the
+    returned `Definitions`. Raises `GraphLoadError` reporting every file in
+    `errors` and every file whose job cannot be composed or that declares a
+    resource whose name is used by another graph for a different resource.
+
+    Arguments
+    ---------
+    graph_defs : Dict[Path, GraphDefinition | Exception]
+        Graph definitions by file path, as returned by function
+        `load_graph_defs`.
+
+    errors : Dict[Path, Exception]
+        Errors of the files that failed to load, which are skipped.
+
+    compose : Callable[[Path, GraphDefinition], dagster.JobDefinition]
+        Function returning the job of a graph definition file. Defaults to
+        function `compose_job`.
+
+    Returns
+    -------
+    dagster.Definitions
+        Definitions containing the jobs and resources of all graphs.
+    """
+
+    errors = dict(errors)
+    jobs = []
+    resources: Dict[str, dagster.ResourceDefinition | dagster.ConfigurableResource] = {}
+    resource_keys: Dict[str, ResourceKey] = {}
+
+    for file_path, graph_def in graph_defs.items():
+        if file_path in errors:
+            continue
+
+        keys = {
+            res.name: ResourceRegistry.key(res.import_field, res.config)
+            for res in graph_def.spec.resources
+        }
+        conflicts = [name for name, key in keys.items() if resource_keys.get(name, key) != key]
+        if conflicts:
+            errors[file_path] = ValueError(
+                f"Resources {', '.join(conflicts)} are declared with a different import or "
+                "configuration by another graph."
+            )
+            continue
+
+        try:
+            job = compose(file_path, graph_def)
+        except Exception as exc:
+            errors[file_path] = exc
+            continue
+
+        jobs.append(job)
+        for res in graph_def.spec.resources:
+            resource_keys.setdefault(res.name, keys[res.name])
+            resources.setdefault(res.name, job.resource_defs[res.name])
+
+    if errors:
+        raise GraphLoadError(dict(sorted(errors.items())))
+
+    return dagster.Definitions(jobs=jobs, resources=resources)
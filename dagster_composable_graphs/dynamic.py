@@ -0,0 +1,104 @@
+from typing import Any, Dict, List, Set
+
+import dagster
+
+from .errors import GraphDefinitionError
+from .models import Graph
+from .pointers import output_keys
+
+
+def dynamic_output_keys(operation: dagster.GraphDefinition | dagster.OpDefinition) -> Set[str]:
+    """Return the keys of the outputs of `operation` declared with `DynamicOut`."""
+
+    return {
+        key
+        for key, output_def in zip(output_keys(operation), operation.output_defs)
+        if output_def.is_dynamic
+    }
+
+
+def validate_input_modes(graph: Graph) -> None:
+    """
+    Validate that dynamic outputs are mapped or collected, and nothing else is.
+
+    Outputs of mapped nodes are dynamic too, so that nodes may be mapped over
+    the results of other mapped nodes.
+
+    Raises `GraphDefinitionError` if a node maps over more than one input, an
+    input is mapped or collected from an output that is not dynamic, or a
+    dynamic output is passed as a single value or streamed.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+    """
+
+    dynamic: Dict[str, Set[str]] = {}
+
+    for node_id in graph.order:
+        node = graph.nodes[node_id]
+        modes = graph.input_modes.get(node, {})
+
+        if list(modes.values()).count("map") > 1:
+            raise GraphDefinitionError(f"Node `{node}` can only be mapped over a single input.")
+
+        for position, (dep, pointer) in enumerate(graph.dependencies.get(node, [])):
+            mode = modes.get(position, "value")
+            is_dynamic = pointer is not None and pointer.key in dynamic[dep]
+
+            if mode in ("value", "stream") and is_dynamic:
+                raise GraphDefinitionError(
+                    f"Input of node `{node}` from dynamic output `{pointer.key}` of `{dep}` "
+                    "must be mapped or collected."
+                )
+
+            if mode in ("map", "collect") and not is_dynamic:
+                raise GraphDefinitionError(
+                    f"Input of node `{node}` from `{dep}` uses mode `{mode}`, but it is not a "
+                    "dynamic output."
+                )
+
+        operation = graph.operations[node]
+        if "map" in modes.values():
+            dynamic[node] = set(output_keys(operation))
+        else:
+            dynamic[node] = dynamic_output_keys(operation)
+
+
+def invoke_node(invocation: Any, input_values: List[Any], modes: Dict[int, str]) -> Any:
+    """
+    Invoke a node within a job, mapping it over or collecting dynamic inputs.
+
+    Arguments
+    ---------
+    invocation : Any
+        Pending invocation of the node, such as the result of `OpDefinition.alias`.
+
+    input_values : List[Any]
+        Positional input values of the node.
+
+    modes : Dict[int, str]
+        Mode of the inputs not passed as a single value, by position.
+
+    Returns
+    -------
+    Any
+        Result of the invocation.
+    """
+
+    input_values = [
+        value.collect() if modes.get(position) == "collect" else value
+        for position, value in enumerate(input_values)
+    ]
+
+    mapped = [position for position, mode in modes.items() if mode == "map"]
+    if not mapped:
+        return invocation(*input_values)
+
+    position = mapped[0]
+
+    def invoke_item(item: Any) -> Any:
+        return invocation(*input_values[:position], item, *input_values[position + 1 :])
+
+    return input_values[position].map(invoke_item)
@@ -0,0 +1,32 @@
+from pathlib import Path
+from typing import Dict, List
+
+
+class GraphDefinitionError(ValueError):
+    """Raised when a graph definition cannot be compiled into a dagster job."""
+
+
+class CyclicDependencyError(GraphDefinitionError):
+    """
+    Raised when the dependencies of a graph definition contain a cycle.
+
+    Attribute `cycle` contains the names of the nodes in the cycle, starting and
+    ending at the same node.
+    """
+
+    def __init__(self, cycle: List[str]) -> None:
+        self.cycle = cycle
+        super().__init__(f"Dependencies contain a cycle: {' -> '.join(cycle)}")
+
+
+class GraphLoadError(Exception):
+    """
+    Raised when one or more graph definition files cannot be loaded.
+
+    Attribute `errors` maps the path of every failing file to its exception.
+    """
+
+    def __init__(self, errors: Dict[Path, Exception]) -> None:
+        self.errors = errors
+        details = "\n".join(f"  {path}: {type(exc).__name__}: {exc}" for path, exc in errors.items())
+        super().__init__(f"Failed to load {len(errors)} graph definition file(s):\n{details}")
@@ -0,0 +1,126 @@
+import dataclasses
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import dagster
+
+from .models import FileFormat
+
+FILE_INPUT_IO_MANAGER_KEY = "file_input_io_manager"
+
+
+def load_bytes(file_path: str) -> memoryview:
+    """Return a read-only, memory-mapped view of the bytes of a file."""
+
+    with open(file_path, "rb") as file:
+        if Path(file_path).stat().st_size == 0:
+            # Empty files cannot be memory-mapped.
+            return memoryview(b"")
+
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_npy(file_path: str) -> Any:
+    """Return a read-only NumPy array memory-mapped from a `.npy` file."""
+
+    import numpy
+
+    return numpy.load(file_path, mmap_mode="r")
+
+
+def load_arrow(file_path: str) -> Any:
+    """Return an Arrow table read without copies from a memory-mapped Arrow IPC file."""
+
+    import pyarrow
+
+    return pyarrow.ipc.open_file(pyarrow.memory_map(file_path)).read_all()
+
+
+def load_parquet(file_path: str) -> Any:
+    """Return an Arrow table read from a memory-mapped Parquet file."""
+
+    import pyarrow.parquet
+
+    return pyarrow.parquet.read_table(file_path, memory_map=True)
+
+
+FILE_LOADERS: Dict[FileFormat, Callable[[str], Any]] = {
+    "bytes": load_bytes,
+    "npy": load_npy,
+    "arrow": load_arrow,
+    "parquet": load_parquet,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class FileReference:
+    """
+    Reference to a file passed between steps instead of its content.
+
+    Formats `npy`, `arrow` and `parquet` require NumPy and PyArrow
+    respectively, which are imported when the file is loaded.
+    """
+
+    path: str
+    format: FileFormat
+
+    def load(self) -> Any:
+        """Return a memory-mapped view of the content of the file."""
+
+        return FILE_LOADERS[self.format](self.path)
+
+
+class FileInputIOManager(dagster.IOManager):
+    """
+    IO manager storing file inputs as references, loaded by every consumer.
+
+    Outputs are `FileReference` objects, written as small JSON documents in
+    `base_dir`. Consumers memory-map the referenced file, so that its content
+    is neither copied into the run configuration nor pickled between steps,
+    and pages are shared between the processes reading the same file.
+    Consumers whose input is of type `FileReference` receive the reference.
+    """
+
+    def __init__(self, base_dir: str | Path) -> None:
+        self.base_dir = Path(base_dir)
+
+    def _path(self, context: dagster.InputContext | dagster.OutputContext) -> Path:
+        return self.base_dir.joinpath(*context.get_identifier()).with_suffix(".json")
+
+    def handle_output(self, context: dagster.OutputContext, obj: FileReference) -> None:
+        """Store the reference to the file in `obj`."""
+
+        path = self._path(context)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(dataclasses.asdict(obj)))
+
+    def load_input(self, context: dagster.InputContext) -> Any:
+        """Return a memory-mapped view of the referenced file, or the reference itself."""
+
+        reference = FileReference(**json.loads(self._path(context.upstream_output).read_text()))
+
+        # Inputs typed as references, such as those keying memoized results, are not loaded.
+        if context.dagster_type.typing_type is FileReference:
+            return reference
+
+        return reference.load()
+
+
+@dagster.io_manager(
+    config_schema={
+        "base_dir": dagster.Field(
+            str,
+            is_required=False,
+            description="Directory of the references. Defaults to the instance storage.",
+        )
+    },
+    description="Passes graph inputs read from local files by reference.",
+)
+def file_input_io_manager(context: dagster.InitResourceContext) -> FileInputIOManager:
+    """Define an IO manager creating a `FileInputIOManager` for every run."""
+
+    return FileInputIOManager(
+        context.resource_config.get("base_dir") or context.instance.storage_directory()
+    )
@@ -0,0 +1,279 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict
+
+import yaml
+
+from .errors import GraphDefinitionError
+from .models import FileInputDefinition, GraphDefinition
+from .profiling import profile_phase
+
+YAML_SUFFIXES = (".yaml", ".yml")
+JSON_SUFFIXES = (".json",)
+BINARY_SUFFIXES = (".cgraph",)
+
+BINARY_MAGIC = b"DCGRAPH\x01"
+
+# Use the bindings to libyaml when they are available, which parse several
+# times faster than the pure Python implementation.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+@functools.cache
+def schema_version() -> str:
+    """Return a digest of the JSON schema of `GraphDefinition`."""
+
+    schema = json.dumps(GraphDefinition.model_json_schema(by_alias=True), sort_keys=True)
+    return hashlib.sha256(schema.encode()).hexdigest()[:16]
+
+
+def resolve_paths(graph_def: GraphDefinition, file_path: str | Path) -> GraphDefinition:
+    """
+    Resolve the relative paths in `graph_def` against the directory of its file, in place.
+
+    Paths of file inputs and of subgraphs are made absolute, so that the same
+    definition reads the same files whatever the working directory of the
+    process loading it, such as a code server or a step subprocess.
+    """
+
+    base_dir = Path(file_path).absolute().parent
+
+    for value in graph_def.spec.inputs.values():
+        if isinstance(value, FileInputDefinition):
+            value.from_file = os.path.normpath(base_dir / value.from_file)
+
+    for op in graph_def.spec.operations:
+        if op.graph is not None:
+            op.graph = os.path.normpath(base_dir / op.graph)
+
+    return graph_def
+
+
+def _relative_path(path: str, base_dir: Path) -> str:
+    """Return `path` relative to `base_dir`, or unchanged if it is on another drive."""
+
+    try:
+        return os.path.relpath(path, base_dir)
+    except ValueError:
+        return path
+
+
+def relative_paths(graph_def: GraphDefinition, file_path: str | Path) -> GraphDefinition:
+    """
+    Return a copy of `graph_def` with its paths relative to the directory of a file.
+
+    This is the inverse of function `resolve_paths`, so that a definition
+    written to `file_path` references the same files when loaded, and can be
+    moved along with them.
+    """
+
+    graph_def = graph_def.model_copy(deep=True)
+    base_dir = Path(file_path).absolute().parent
+
+    for value in graph_def.spec.inputs.values():
+        if isinstance(value, FileInputDefinition):
+            value.from_file = _relative_path(value.from_file, base_dir)
+
+    for op in graph_def.spec.operations:
+        if op.graph is not None:
+            op.graph = _relative_path(op.graph, base_dir)
+
+    return graph_def
+
+
+def load_graph_def_from_yaml(file_path: str | Path) -> GraphDefinition:
+    """
+    Load a `GraphDefinition` from a file in `.yaml` format.
+
+    Arguments
+    ---------
+    file_path : str | Path
+        Path to the file to load.
+
+    Returns
+    -------
+    GraphDefinition
+        The definition of the graph.
+    """
+
+    with profile_phase("parse", str(file_path)):
+        content = yaml.load(Path(file_path).read_bytes(), Loader=YamlLoader)
+
+    with profile_phase("validate", str(file_path)):
+        return resolve_paths(GraphDefinition.model_validate(content), file_path)
+
+
+def load_graph_def_from_json(file_path: str | Path) -> GraphDefinition:
+    """
+    Load a `GraphDefinition` from a file in `.json` format.
+
+    The file is parsed and validated in a single pass by pydantic.
+
+    Arguments
+    ---------
+    file_path : str | Path
+        Path to the file to load.
+
+    Returns
+    -------
+    GraphDefinition
+        The definition of the graph.
+    """
+
+    with profile_phase("parse", str(file_path)):
+        content = Path(file_path).read_bytes()
+
+    with profile_phase("validate", str(file_path)):
+        return resolve_paths(GraphDefinition.model_validate_json(content), file_path)
+
+
+def load_graph_def_from_binary(file_path: str | Path) -> GraphDefinition:
+    """
+    Load a `GraphDefinition` from a file written by function `dump_graph_def`.
+
+    Binary files contain the pickled models of a validated definition, which
+    are restored much faster than text is parsed. As the file was written for
+    the current schema, the models are trusted and not validated again.
+
+    Raises `GraphDefinitionError` if the file is not in binary format or was
+    written for a different schema of `GraphDefinition`, in which case it must
+    be written again from its source.
+
+    Like any pickled data, binary files must only be loaded from trusted
+    sources. Graph definitions import and run the modules they reference in any
+    case.
+
+    Arguments
+    ---------
+    file_path : str | Path
+        Path to the file to load.
+
+    Returns
+    -------
+    GraphDefinition
+        The definition of the graph.
+    """
+
+    with profile_phase("parse", str(file_path)), Path(file_path).open("rb") as file:
+        if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise GraphDefinitionError(f"File `{file_path}` is not a binary graph definition.")
+
+        version = file.read(len(schema_version())).decode(errors="replace")
+        if version != schema_version():
+            raise GraphDefinitionError(
+                f"File `{file_path}` was written for schema version `{version}`, but the "
+                f"current version is `{schema_version()}`. Write it again from its source."
+            )
+
+        graph_def = pickle.load(file)
+
+    if not isinstance(graph_def, GraphDefinition):
+        raise GraphDefinitionError(f"File `{file_path}` does not contain a graph definition.")
+
+    return resolve_paths(graph_def, file_path)
+
+
+LOADERS: Dict[str, Callable[[str | Path], GraphDefinition]] = {
+    **{suffix: load_graph_def_from_yaml for suffix in YAML_SUFFIXES},
+    **{suffix: load_graph_def_from_json for suffix in JSON_SUFFIXES},
+    **{suffix: load_graph_def_from_binary for suffix in BINARY_SUFFIXES},
+}
+
+
+def _file_format(file_path: str | Path) -> str:
+    """Return the suffix of `file_path`, raising `ValueError` if it is not supported."""
+
+    suffix = Path(file_path).suffix.lower()
+    if suffix not in LOADERS:
+        raise ValueError(
+            f"File `{file_path}` has unsupported extension `{suffix}`, expected one of "
+            f"{', '.join(LOADERS)}."
+        )
+
+    return suffix
+
+
+def load_graph_def(file_path: str | Path) -> GraphDefinition:
+    """
+    Load a `GraphDefinition` from a file, in the format given by its extension.
+
+    Files in `.yaml` or `.yml` format are loaded by function
+    `load_graph_def_from_yaml`, files in `.json` format by function
+    `load_graph_def_from_json` and files in `.cgraph` binary format by function
+    `load_graph_def_from_binary`. Relative paths in the definition are resolved
+    against the directory of the file, see function `resolve_paths`.
+
+    Arguments
+    ---------
+    file_path : str | Path
+        Path to the file to load.
+
+    Returns
+    -------
+    GraphDefinition
+        The definition of the graph.
+    """
+
+    return LOADERS[_file_format(file_path)](file_path)
+
+
+def dump_graph_def(graph_def: GraphDefinition, file_path: str | Path) -> None:
+    """
+    Write a `GraphDefinition` to a file, in the format given by its extension.
+
+    See function `load_graph_def` for the supported formats. Fields left to
+    their default values are omitted from text formats. Paths of file inputs
+    and subgraphs are written relative to the directory of the file, see
+    function `relative_paths`, so that a definition dumped next to its source
+    is written with the same paths.
+
+    The file is replaced atomically, so that concurrent readers never see a
+    partially written definition.
+
+    Arguments
+    ---------
+    graph_def : GraphDefinition
+        The definition of the graph.
+
+    file_path : str | Path
+        Path to the file to write.
+    """
+
+    suffix = _file_format(file_path)
+    graph_def = relative_paths(graph_def, file_path)
+
+    if suffix in BINARY_SUFFIXES:
+        data = (
+            BINARY_MAGIC
+            + schema_version().encode()
+            + pickle.dumps(graph_def, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+    else:
+        content = {
+            "apiVersion": graph_def.api_version,
+            "kind": graph_def.kind,
+            **graph_def.model_dump(mode="json", by_alias=True, exclude_defaults=True),
+        }
+        if suffix in YAML_SUFFIXES:
+            data = yaml.dump(content, Dumper=YamlDumper, sort_keys=False).encode()
+        else:
+            data = json.dumps(content).encode()
+
+    path = Path(file_path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+
+        os.replace(temp_path, path)
+
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
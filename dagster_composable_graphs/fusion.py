@@ -0,0 +1,233 @@
+import dataclasses
+import inspect
+import typing
+from typing import Any, Collection, Iterator, List, Mapping, Optional, Tuple
+
+import dagster
+
+from .index import index_graph
+from .models import CompiledPointer, Graph
+
+FUSED_NODES_TAG = "dagster-composable-graphs/fused-nodes"
+
+
+def is_plain_op(
+    operation: dagster.GraphDefinition | dagster.OpDefinition, generators: bool = False
+) -> bool:
+    """
+    Return whether `operation` is an op that can be called as a plain function.
+
+    Plain ops take only inputs, so they do not use the execution context,
+    resources or config, and return a single, non-dynamic output. Functions
+    yielding values are only accepted if `generators` is set, since dagster
+    expects them to yield outputs. Functions annotated to return a
+    `dagster.Output` or `dagster.DynamicOutput` are not plain, since their
+    return value wraps the output.
+    """
+
+    if not isinstance(operation, dagster.OpDefinition):
+        return False
+
+    # Ops defined with the `@dagster.op` decorator wrap the decorated function.
+    compute_fn = operation.compute_fn
+    return (
+        hasattr(compute_fn, "decorated_fn")
+        and not _returns_output(compute_fn.decorated_fn)
+        and not compute_fn.has_context_arg()
+        and not compute_fn.has_config_arg()
+        and not compute_fn.get_resource_args()
+        and (generators or not inspect.isgeneratorfunction(compute_fn.decorated_fn))
+        and not operation.required_resource_keys
+        and len(operation.output_defs) == 1
+        and not operation.output_defs[0].is_dynamic
+    )
+
+
+def _returns_output(fn: Any) -> bool:
+    """Return whether `fn` is annotated to return a `dagster.Output` or `dagster.DynamicOutput`."""
+
+    annotation = inspect.signature(fn).return_annotation
+    origin = typing.get_origin(annotation) or annotation
+    return isinstance(origin, type) and issubclass(origin, (dagster.Output, dagster.DynamicOutput))
+
+
+def find_linear_chains(graph: Graph, keep: Collection[str] = ()) -> List[List[int]]:
+    """
+    Return the single-consumer linear chains of plain ops in `graph`.
+
+    Two plain ops are linked when the first one is only consumed by the second
+    one and the second one depends on no other operation. Graph inputs may be
+    consumed by any node of a chain. Nodes mapping over or collecting dynamic
+    outputs, or with tags, priority or pool, are never part of a chain, since
+    their steps are scheduled individually, nor are nodes whose outputs are
+    passed by a selected IO manager.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    keep : Collection[str]
+        Names of nodes whose outputs must remain available. They may only end
+        a chain, so that they are not fused into the node consuming them.
+
+    Returns
+    -------
+    List[List[int]]
+        Node ids of every chain of at least two nodes, in dependency order.
+    """
+
+    plain = [
+        is_plain_op(graph.operations[node])
+        and node not in graph.input_modes
+        and node not in graph.tags
+        and node not in graph.io_managers
+        for node in graph.nodes
+    ]
+
+    def linked(node_id: int) -> Optional[int]:
+        """Return the id of the node `node_id` is fused into, if any."""
+
+        if not plain[node_id] or len(graph.downstream[node_id]) != 1 or graph.nodes[node_id] in keep:
+            return None
+
+        next_id = graph.downstream[node_id][0]
+        if not plain[next_id] or graph.upstream[next_id] != [node_id]:
+            return None
+
+        return next_id
+
+    links = [linked(node_id) for node_id in range(len(graph.nodes))]
+    linked_to = {next_id for next_id in links if next_id is not None}
+
+    chains = []
+    for node_id in graph.order:
+        if node_id in linked_to or links[node_id] is None:
+            continue
+
+        chain = [node_id]
+        while links[chain[-1]] is not None:
+            chain.append(links[chain[-1]])
+
+        chains.append(chain)
+
+    return chains
+
+
+def fused_op_builder(
+    name: str,
+    members: List[Tuple[str, dagster.OpDefinition, List[Optional[int]]]],
+    input_types: List[dagster.DagsterType],
+) -> dagster.OpDefinition:
+    """
+    Define a dagster op that runs a chain of plain ops in memory.
+
+    Arguments
+    ---------
+    name : str
+        Name of the created dagster op.
+
+    members : List[Tuple[str, dagster.OpDefinition, List[Optional[int]]]]
+        Node name, op and argument sources of every node in the chain. An
+        argument source is the index of an input of the fused op, or `None` for
+        the output of the previous node.
+
+    input_types : List[dagster.DagsterType]
+        Types of the inputs of the fused op.
+
+    Returns
+    -------
+    dagster.OpDefinition
+        The generated dagster `OpDefinition`.
+    """
+
+    input_names = [f"input_{index}" for index in range(len(input_types))]
+    steps = [(op_def.compute_fn.decorated_fn, sources) for _, op_def, sources in members]
+    node_names = [node for node, _, _ in members]
+
+    def compute_fn(
+        _context: dagster.OpExecutionContext, inputs: Mapping[str, Any]
+    ) -> Iterator[dagster.Output]:
+        value = None
+        for fn, sources in steps:
+            value = fn(
+                *(value if source is None else inputs[input_names[source]] for source in sources)
+            )
+            # Unannotated functions may still return their output wrapped.
+            if isinstance(value, dagster.Output):
+                value = value.value
+
+        yield dagster.Output(value)
+
+    tail = members[-1][1]
+    return dagster.OpDefinition(
+        compute_fn=compute_fn,
+        name=name,
+        ins={
+            input_name: dagster.In(dagster_type=input_type)
+            for input_name, input_type in zip(input_names, input_types)
+        },
+        outs={"result": dagster.Out(dagster_type=tail.output_defs[0].dagster_type)},
+        description=f"Fused nodes {', '.join(node_names)}.",
+        tags={FUSED_NODES_TAG: ",".join(node_names)},
+    )
+
+
+def fuse_linear_chains(graph: Graph, keep: Collection[str] = ()) -> Graph:
+    """
+    Return a copy of `graph` where linear chains of plain ops are fused into single ops.
+
+    Chains are found by function `find_linear_chains`. Every chain is replaced
+    by a single op, named after the last node of the chain, which calls the ops
+    of the chain one after the other passing values in memory. Therefore the
+    output of the chain remains available under the name of its last node,
+    while outputs of the other nodes of the chain are not stored and cannot be
+    read with `output_for_node`, unless they are listed in `keep`. The names of
+    fused nodes are recorded in `graph.fused` and in the tags of the fused op.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    keep : Collection[str]
+        Names of nodes whose outputs must remain available, such as targets.
+
+    Returns
+    -------
+    Graph
+        The graph with fused chains.
+    """
+
+    operations = dict(graph.operations)
+    dependencies = dict(graph.dependencies)
+    fused = dict(graph.fused)
+
+    for chain in find_linear_chains(graph, keep):
+        names = [graph.nodes[node_id] for node_id in chain]
+        members = []
+        fused_deps: List[Tuple[str, CompiledPointer | None]] = []
+        input_types = []
+
+        for position, node in enumerate(names):
+            op_def = operations.pop(node)
+            sources: List[Optional[int]] = []
+
+            for arg, (dep, pointer) in enumerate(dependencies.pop(node, [])):
+                if position > 0 and dep == names[position - 1]:
+                    sources.append(None)
+                    continue
+
+                sources.append(len(fused_deps))
+                fused_deps.append((dep, pointer))
+                input_types.append(op_def.input_defs[arg].dagster_type)
+
+            members.append((node, op_def, sources))
+
+        operations[names[-1]] = fused_op_builder(f"fused_{names[-1]}", members, input_types)
+        dependencies[names[-1]] = fused_deps
+        fused[names[-1]] = names
+
+    return index_graph(
+        dataclasses.replace(graph, operations=operations, dependencies=dependencies, fused=fused)
+    )
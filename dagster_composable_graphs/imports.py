@@ -0,0 +1,165 @@
+import concurrent.futures
+import contextlib
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Iterable, Optional
+
+from .profiling import profile_phase
+
+
+class ImportRegistry:
+    """
+    Cache of the modules and objects imported when composing graphs.
+
+    Every module is imported at most once, whether the import succeeds or
+    fails, so that a failing module is not imported again for every graph that
+    references it and a slow module only delays the first graph. The time
+    taken by every import is recorded, see method `timings`.
+
+    Cached failures are kept until they are invalidated, see method
+    `invalidate`. Modules already imported by the interpreter are not imported
+    again by invalidating them.
+    """
+
+    def __init__(self) -> None:
+        self._modules: Dict[str, ModuleType | ImportError] = {}
+        self._objects: Dict[str, Any] = {}
+        self._timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def import_module(self, module_path: str) -> ModuleType:
+        """
+        Return the module in `module_path`, importing it on first use.
+
+        Raises `ImportError` if the module cannot be imported, including on
+        every later call. Exceptions raised by the module while it is imported,
+        such as a `SyntaxError`, are raised as the cause of the `ImportError`.
+        """
+
+        module = self._modules.get(module_path)
+        if module is None:
+            start = time.perf_counter()
+
+            try:
+                with profile_phase("import", module_path):
+                    module = importlib.import_module(module_path)
+
+            except Exception as exc:
+                module = ImportError(f"Could not import module '{module_path}'")
+                module.__cause__ = exc
+
+            with self._lock:
+                self._timings.setdefault(module_path, time.perf_counter() - start)
+                module = self._modules.setdefault(module_path, module)
+
+        if isinstance(module, ImportError):
+            # Raise a copy, so that the cached error does not accumulate tracebacks.
+            raise ImportError(*module.args) from module.__cause__
+
+        return module
+
+    def import_object(self, object_path: str) -> Any:
+        """
+        Return the object in `object_path`, in `package.module.object` format.
+
+        Raises `ImportError` if the module cannot be imported and
+        `AttributeError` if the object is not found.
+        """
+
+        obj = self._objects.get(object_path)
+        if obj is not None:
+            return obj
+
+        module_path, _, object_name = object_path.rpartition(".")
+        module = self.import_module(module_path)
+
+        try:
+            obj = getattr(module, object_name)
+        except AttributeError as exc:
+            raise AttributeError(
+                f"Function '{object_name}' not found in module '{module_path}'"
+            ) from exc
+
+        with self._lock:
+            return self._objects.setdefault(object_path, obj)
+
+    def prefetch(
+        self, module_paths: Iterable[str], workers: Optional[int] = None
+    ) -> Dict[str, ImportError]:
+        """
+        Import every distinct module of `module_paths` not imported yet.
+
+        Imports run in a pool of threads, so that modules spending their import
+        time in I/O or in extensions releasing the GIL are imported
+        concurrently. Errors are collected rather than raised.
+
+        Arguments
+        ---------
+        module_paths : Iterable[str]
+            Paths of the modules to import.
+
+        workers : Optional[int]
+            Number of threads importing modules. With a single worker modules
+            are imported in the calling thread. Defaults to the default of
+            `concurrent.futures.ThreadPoolExecutor`.
+
+        Returns
+        -------
+        Dict[str, ImportError]
+            The error of every module that could not be imported.
+        """
+
+        module_paths = list(dict.fromkeys(module_paths))
+        pending = [path for path in module_paths if path not in self._modules]
+
+        if workers == 1 or len(pending) <= 1:
+            for module_path in pending:
+                self._try_import(module_path)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._try_import, pending))
+
+        return {path: error for path in module_paths if (error := self.error(path)) is not None}
+
+    def _try_import(self, module_path: str) -> None:
+        """Import the module in `module_path`, leaving its error in the cache."""
+
+        with contextlib.suppress(ImportError):
+            self.import_module(module_path)
+
+    def error(self, module_path: str) -> Optional[ImportError]:
+        """Return the error raised when importing `module_path`, if it failed."""
+
+        module = self._modules.get(module_path)
+        return module if isinstance(module, ImportError) else None
+
+    def timings(self) -> Dict[str, float]:
+        """Return the seconds taken to import every module, from slowest to fastest."""
+
+        with self._lock:
+            return dict(sorted(self._timings.items(), key=lambda item: -item[1]))
+
+    def invalidate(self, module_paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Forget the given modules, or all modules, and the objects imported from them.
+
+        Invalidated modules that failed to import are imported again on next use.
+        """
+
+        with self._lock:
+            paths = set(self._modules if module_paths is None else module_paths)
+
+            for module_path in paths:
+                self._modules.pop(module_path, None)
+                self._timings.pop(module_path, None)
+
+            self._objects = {
+                object_path: obj
+                for object_path, obj in self._objects.items()
+                if object_path.rpartition(".")[0] not in paths
+            }
+
+
+import_registry = ImportRegistry()
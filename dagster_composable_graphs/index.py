@@ -0,0 +1,233 @@
+import dataclasses
+from collections import deque
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .errors import CyclicDependencyError, GraphDefinitionError
+from .models import CompiledPointer, Graph
+
+
+def index_nodes(
+    node_ids: Dict[str, int],
+    dependencies: Dict[str, List[Tuple[str, CompiledPointer | None]]],
+    inputs: Dict[str, Any],
+) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Return the upstream and downstream adjacency arrays of a graph.
+
+    References to graph inputs are skipped, since inputs are not nodes of the
+    graph.
+
+    Arguments
+    ---------
+    node_ids : Dict[str, int]
+        Ids of the operations in the graph, by name.
+
+    dependencies : Dict[str, List[Tuple[str, CompiledPointer | None]]]
+        Dependencies of each node as `(name, pointer)` pairs.
+
+    inputs : Dict[str, Any]
+        Inputs of the graph.
+
+    Returns
+    -------
+    Tuple[List[List[int]], List[List[int]]]
+        For every node id, the ids of the nodes it depends on and the ids of the
+        nodes depending on it.
+    """
+
+    for node in node_ids:
+        if node in inputs:
+            raise GraphDefinitionError(f"Operation `{node}` has the same name as a graph input.")
+
+    upstream: List[List[int]] = [[] for _ in node_ids]
+    downstream: List[List[int]] = [[] for _ in node_ids]
+
+    for node, node_deps in dependencies.items():
+        if node not in node_ids:
+            raise GraphDefinitionError(
+                f"Dependencies are defined for `{node}`, which is not an operation of the graph."
+            )
+
+        dep_ids: Dict[int, None] = {}
+        for dep, _ in node_deps:
+            if dep in inputs:
+                continue
+
+            if dep not in node_ids:
+                raise GraphDefinitionError(
+                    f"Node `{node}` depends on `{dep}`, which is neither an operation nor an "
+                    "input of the graph."
+                )
+
+            dep_ids[node_ids[dep]] = None
+
+        upstream[node_ids[node]] = list(dep_ids)
+        for dep_id in dep_ids:
+            downstream[dep_id].append(node_ids[node])
+
+    return upstream, downstream
+
+
+def topological_order(
+    nodes: List[str], upstream: List[List[int]], downstream: List[List[int]]
+) -> List[int]:
+    """
+    Return the node ids of a graph sorted so that every node follows its dependencies.
+
+    The order is computed iteratively with Kahn's algorithm, so its cost is
+    linear in the number of nodes and edges and it is not bound by the
+    recursion limit. Nodes without dependencies keep their declaration order.
+
+    Raises `CyclicDependencyError` naming the nodes of one of the cycles if the
+    graph is not acyclic.
+
+    Arguments
+    ---------
+    nodes : List[str]
+        Names of the nodes, indexed by node id.
+
+    upstream : List[List[int]]
+        Ids of the nodes each node depends on.
+
+    downstream : List[List[int]]
+        Ids of the nodes depending on each node.
+
+    Returns
+    -------
+    List[int]
+        Topological order of the node ids.
+    """
+
+    pending = [len(node_upstream) for node_upstream in upstream]
+    ready = deque(node_id for node_id, count in enumerate(pending) if count == 0)
+    order = []
+
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+
+        for dep_id in downstream[node_id]:
+            pending[dep_id] -= 1
+            if pending[dep_id] == 0:
+                ready.append(dep_id)
+
+    if len(order) < len(nodes):
+        # Every node left behind has at least one pending dependency, so
+        # following those from any of them must eventually revisit a node.
+        node_id = next(node_id for node_id, count in enumerate(pending) if count)
+        visited: Dict[int, int] = {}
+        path = []
+
+        while node_id not in visited:
+            visited[node_id] = len(path)
+            path.append(node_id)
+            node_id = next(dep_id for dep_id in upstream[node_id] if pending[dep_id])
+
+        # Report the cycle in dependency order, starting from its first declared node.
+        cycle = path[visited[node_id] :][::-1]
+        start = cycle.index(min(cycle))
+        cycle = cycle[start:] + cycle[:start]
+        raise CyclicDependencyError([nodes[cycle_id] for cycle_id in [*cycle, cycle[0]]])
+
+    return order
+
+
+def graph_depth(graph: Graph) -> int:
+    """Return the number of nodes in the longest dependency chain of `graph`."""
+
+    depth = [0] * len(graph.nodes)
+    for node_id in graph.order:
+        depth[node_id] = 1 + max((depth[dep_id] for dep_id in graph.upstream[node_id]), default=0)
+
+    return max(depth, default=0)
+
+
+def index_graph(graph: Graph) -> Graph:
+    """
+    Return a copy of `graph` with its node index computed from its operations.
+
+    Node ids follow the order of `graph.operations`. See functions
+    `index_nodes` and `topological_order` for the errors raised when the
+    dependencies are not valid.
+    """
+
+    nodes = list(graph.operations)
+    node_ids = {name: node_id for node_id, name in enumerate(nodes)}
+    upstream, downstream = index_nodes(node_ids, graph.dependencies, graph.initial_data)
+
+    return dataclasses.replace(
+        graph,
+        nodes=nodes,
+        node_ids=node_ids,
+        upstream=upstream,
+        downstream=downstream,
+        order=topological_order(nodes, upstream, downstream),
+    )
+
+
+def upstream_closure(graph: Graph, node_ids: Iterable[int]) -> Set[int]:
+    """Return the given node ids together with the ids of every node they depend on."""
+
+    closure: Set[int] = set()
+    pending = list(node_ids)
+
+    while pending:
+        node_id = pending.pop()
+        if node_id not in closure:
+            closure.add(node_id)
+            pending.extend(graph.upstream[node_id])
+
+    return closure
+
+
+def prune_graph(graph: Graph, targets: List[str]) -> Graph:
+    """
+    Return a copy of `graph` restricted to the nodes needed to compute `targets`.
+
+    The pruned graph keeps the targets and all their upstream nodes, in
+    declaration order, and only the graph inputs used by those nodes.
+
+    Raises `GraphDefinitionError` if a target is not an operation of the graph.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    targets : List[str]
+        Names of the nodes whose outputs are requested.
+
+    Returns
+    -------
+    Graph
+        The pruned graph.
+    """
+
+    for target in targets:
+        if target not in graph.node_ids:
+            raise GraphDefinitionError(f"Target `{target}` is not an operation of the graph.")
+
+    selected = upstream_closure(graph, (graph.node_ids[target] for target in targets))
+    operations = {
+        graph.nodes[node_id]: graph.operations[graph.nodes[node_id]] for node_id in sorted(selected)
+    }
+
+    dependencies = {
+        node: graph.dependencies[node] for node in operations if node in graph.dependencies
+    }
+    used_inputs = {
+        dep for node_deps in dependencies.values() for dep, pointer in node_deps if pointer is None
+    }
+
+    return index_graph(
+        dataclasses.replace(
+            graph,
+            initial_data={k: v for k, v in graph.initial_data.items() if k in used_inputs},
+            operations=operations,
+            dependencies=dependencies,
+            input_modes={k: v for k, v in graph.input_modes.items() if k in dependencies},
+            fused={k: v for k, v in graph.fused.items() if k in operations},
+            tags={k: v for k, v in graph.tags.items() if k in operations},
+            cost_hints={k: v for k, v in graph.cost_hints.items() if k in operations},
+        )
+    )
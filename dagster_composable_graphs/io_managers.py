@@ -0,0 +1,562 @@
+import contextlib
+import dataclasses
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+import dagster
+
+from .errors import GraphDefinitionError
+from .file_inputs import load_arrow, load_bytes, load_npy
+from .models import (
+    DEFAULT_INITIAL_DATA_NAME,
+    Graph,
+    GraphDefinition,
+    ReferenceCountingDefinition,
+)
+from .util import to_snake_case
+
+OutputKey = Tuple[str, str]
+
+DEFAULT_IO_MANAGER_KEY = "io_manager"
+MMAP_IO_MANAGER_KEY = "mmap_io_manager"
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Return an estimate of the memory used by `obj` in bytes.
+
+    Uses method `memory_usage` of pandas objects and attribute `nbytes` of
+    NumPy arrays and Arrow tables, falling back to `sys.getsizeof`.
+    """
+
+    if hasattr(obj, "memory_usage"):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+
+    return sys.getsizeof(obj)
+
+
+def output_key(graph: Graph, node: str, position: int) -> OutputKey:
+    """Return the step key and output name of the value passed to an input of a node."""
+
+    dep, pointer = graph.dependencies[node][position]
+    if pointer is None:
+        return to_snake_case(DEFAULT_INITIAL_DATA_NAME), dep
+
+    output_defs = graph.operations[dep].output_defs
+    return dep, output_defs[0].name if len(output_defs) == 1 else pointer.key
+
+
+def count_output_consumers(graph: Graph) -> Dict[OutputKey, int]:
+    """
+    Return the number of times every output in `graph` is loaded by downstream ops.
+
+    Outputs are keyed by step key and output name. Only outputs of ops and
+    graph inputs consumed exclusively by ops are counted: ops nested in a
+    dagster graph may load their inputs any number of times, so outputs
+    consumed by graphs are left out. For the same reason, values passed to a
+    node mapped over a dynamic output, which load them once per item, are left
+    out too. Every item of a dynamic output is counted separately.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    Returns
+    -------
+    Dict[OutputKey, int]
+        Number of consumers of every counted output, including outputs without
+        consumers.
+    """
+
+    input_step = to_snake_case(DEFAULT_INITIAL_DATA_NAME)
+    counts: Dict[OutputKey, int] = {(input_step, name): 0 for name in graph.initial_data}
+
+    for node, operation in graph.operations.items():
+        if isinstance(operation, dagster.OpDefinition):
+            counts.update({(node, output_def.name): 0 for output_def in operation.output_defs})
+
+    uncounted = set()
+    for node, node_deps in graph.dependencies.items():
+        modes = graph.input_modes.get(node, {})
+        mapped = "map" in modes.values()
+
+        for position in range(len(node_deps)):
+            key = output_key(graph, node, position)
+
+            if not isinstance(graph.operations[node], dagster.OpDefinition) or (
+                mapped and position not in modes
+            ):
+                uncounted.add(key)
+            else:
+                counts[key] = counts.get(key, 0) + 1
+
+    return {key: count for key, count in counts.items() if key not in uncounted}
+
+
+class ReferenceCountingIOManager(dagster.IOManager):
+    """
+    IO manager keeping outputs in memory until their last consumer loaded them.
+
+    Outputs listed in `consumers` are released once they have been loaded as
+    many times as indicated, and are not stored at all when they have no
+    consumers. Other outputs are kept until the end of the run.
+
+    When storing an output would take the memory held by the IO manager above
+    `spill_threshold` bytes, the output is pickled to a file in
+    `spill_directory` instead, which is removed once the output is released.
+
+    Like dagster's in-memory IO manager, outputs are only shared between steps
+    running in the same process, so this IO manager is intended for in-process
+    executors. Note that released outputs are not available to retried steps.
+
+    Arguments
+    ---------
+    consumers : Mapping[OutputKey, int]
+        Number of consumers of every output, keyed by step key and output name,
+        as returned by function `count_output_consumers`.
+
+    spill_threshold : Optional[int]
+        Memory in bytes above which outputs are spilled to disk. Outputs are
+        never spilled if not set.
+
+    spill_directory : Optional[str]
+        Directory for spilled outputs. Defaults to a temporary directory.
+    """
+
+    def __init__(
+        self,
+        consumers: Mapping[OutputKey, int],
+        spill_threshold: Optional[int] = None,
+        spill_directory: Optional[str] = None,
+    ) -> None:
+        self.consumers = consumers
+        self.spill_threshold = spill_threshold
+        self.spill_directory = Path(spill_directory or tempfile.gettempdir())
+        self.memory = 0
+        self.peak_memory = 0
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._spilled: Dict[Tuple[str, ...], Path] = {}
+        self._sizes: Dict[Tuple[str, ...], int] = {}
+        self._remaining: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(context: dagster.OutputContext) -> Tuple[str, ...]:
+        return tuple(context.get_identifier())
+
+    def handle_output(self, context: dagster.OutputContext, obj: Any) -> None:
+        """Store `obj` unless it has no consumers, spilling it to disk if needed."""
+
+        count = self.consumers.get((context.step_key, context.name))
+        if count == 0:
+            return
+
+        key = self._key(context)
+        size = estimate_size(obj)
+
+        with self._lock:
+            if count is not None:
+                self._remaining[key] = count
+
+            if self.spill_threshold is not None and self.memory + size > self.spill_threshold:
+                self.spill_directory.mkdir(parents=True, exist_ok=True)
+                path = self.spill_directory / f"{uuid.uuid4().hex}.pkl"
+                path.write_bytes(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+                self._spilled[key] = path
+                return
+
+            self._values[key] = obj
+            self._sizes[key] = size
+            self.memory += size
+            self.peak_memory = max(self.peak_memory, self.memory)
+
+    def load_input(self, context: dagster.InputContext) -> Any:
+        """Return the stored output, releasing it if this is its last consumer."""
+
+        key = self._key(context.upstream_output)
+
+        with self._lock:
+            if key in self._spilled:
+                obj = pickle.loads(self._spilled[key].read_bytes())
+            else:
+                obj = self._values[key]
+
+            if key in self._remaining:
+                self._remaining[key] -= 1
+
+                if self._remaining[key] == 0:
+                    self._release(key)
+
+        return obj
+
+    def clear(self) -> None:
+        """Remove all stored outputs, including those spilled to disk."""
+
+        with self._lock:
+            for path in self._spilled.values():
+                path.unlink(missing_ok=True)
+
+            self._values.clear()
+            self._spilled.clear()
+            self._sizes.clear()
+            self._remaining.clear()
+            self.memory = 0
+
+    def _release(self, key: Tuple[str, ...]) -> None:
+        """Remove the output stored under `key`."""
+
+        del self._remaining[key]
+
+        if key in self._spilled:
+            os.remove(self._spilled.pop(key))
+        else:
+            del self._values[key]
+            self.memory -= self._sizes.pop(key)
+
+
+def reference_counting_io_manager(
+    consumers: Mapping[OutputKey, int],
+    spill_threshold: Optional[int] = None,
+    spill_directory: Optional[str] = None,
+) -> dagster.IOManagerDefinition:
+    """
+    Define an IO manager creating a `ReferenceCountingIOManager` for every run.
+
+    Outputs still stored at the end of the run are removed.
+
+    See class `ReferenceCountingIOManager` for a description of the arguments.
+    """
+
+    @dagster.io_manager(description="Keeps outputs in memory until their last consumer.")
+    def reference_counting(
+        _context: dagster.InitResourceContext,
+    ) -> Iterator[ReferenceCountingIOManager]:
+        io_manager = ReferenceCountingIOManager(consumers, spill_threshold, spill_directory)
+
+        try:
+            yield io_manager
+
+        finally:
+            io_manager.clear()
+
+    return reference_counting
+
+
+def use_reference_counting(graph: Graph, reference_counting: ReferenceCountingDefinition) -> Graph:
+    """
+    Return a copy of `graph` passing outputs with a reference counting IO manager.
+
+    The IO manager is provided under resource key `io_manager`, see function
+    `reference_counting_io_manager`. Since outputs are kept in the memory of
+    the process running the steps, the graph uses the in-process executor.
+
+    Raises `GraphDefinitionError` if the graph declares its own `io_manager`
+    resource, or an executor running steps in separate processes.
+    """
+
+    if DEFAULT_IO_MANAGER_KEY in graph.resources:
+        raise GraphDefinitionError(
+            "Resource `io_manager` cannot be declared when reference counting is enabled."
+        )
+
+    executor = graph.executor or dagster.in_process_executor
+    if executor.name != dagster.in_process_executor.name:
+        raise GraphDefinitionError(
+            f"Executor `{executor.name}` runs steps in separate processes, which cannot share "
+            "outputs kept in memory when reference counting is enabled."
+        )
+
+    io_manager = reference_counting_io_manager(
+        count_output_consumers(graph),
+        spill_threshold=reference_counting.spill_threshold,
+        spill_directory=reference_counting.spill_directory,
+    )
+
+    return dataclasses.replace(
+        graph,
+        resources={**graph.resources, DEFAULT_IO_MANAGER_KEY: io_manager},
+        executor=executor,
+    )
+
+
+def select_io_managers(graph_def: GraphDefinition, graph: Graph) -> Graph:
+    """
+    Return a copy of `graph` with the IO managers selected for its outputs.
+
+    An operation selects the IO manager of all its outputs and an input
+    definition the IO manager of the output it references, which is then
+    loaded through that IO manager by every consumer. The built-in
+    `MemoryMappedIOManager` is provided under key `mmap_io_manager` unless
+    the graph declares a resource with that name.
+
+    Raises `GraphDefinitionError` if the outputs of a dagster graph are
+    selected, as their IO manager is that of the ops inside the graph, if an
+    output is selected for two IO managers or if an IO manager is not a
+    resource of the graph.
+
+    Arguments
+    ---------
+    graph_def : GraphDefinition
+        Definition of the composable graph.
+
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    Returns
+    -------
+    Graph
+        The graph with the selected IO managers in `graph.io_managers`.
+    """
+
+    selected: Dict[OutputKey, str] = {}
+
+    def select(key: OutputKey, io_manager_key: str) -> None:
+        current = selected.setdefault(key, io_manager_key)
+        if current != io_manager_key:
+            raise GraphDefinitionError(
+                f"Output `{key[1]}` of node `{key[0]}` is passed by IO managers "
+                f"`{current}` and `{io_manager_key}`."
+            )
+
+    for op in graph_def.spec.operations:
+        if op.io_manager is not None and op.name in graph.operations:
+            for output_def in graph.operations[op.name].output_defs:
+                select((op.name, output_def.name), op.io_manager)
+
+    for dep in graph_def.spec.dependencies:
+        if dep.name not in graph.operations:
+            continue
+
+        for position, input_def in enumerate(dep.inputs):
+            if not isinstance(input_def, str) and input_def.io_manager is not None:
+                select(output_key(graph, dep.name, position), input_def.io_manager)
+
+    if not selected:
+        return graph
+
+    resources = dict(graph.resources)
+    if MMAP_IO_MANAGER_KEY in selected.values():
+        resources.setdefault(MMAP_IO_MANAGER_KEY, memory_mapped_io_manager)
+
+    io_managers: Dict[str, Dict[str, str]] = {}
+    for (node, name), io_manager_key in selected.items():
+        if isinstance(graph.operations.get(node), dagster.GraphDefinition):
+            raise GraphDefinitionError(
+                f"Node `{node}` is a graph, whose outputs are passed by the IO managers of "
+                "its ops."
+            )
+
+        if io_manager_key not in resources and io_manager_key != DEFAULT_IO_MANAGER_KEY:
+            raise GraphDefinitionError(
+                f"IO manager `{io_manager_key}` of node `{node}` is not a resource of the graph."
+            )
+
+        io_managers.setdefault(node, {})[name] = io_manager_key
+
+    return dataclasses.replace(graph, resources=resources, io_managers=io_managers)
+
+
+def apply_io_managers(graph: Graph) -> Graph:
+    """
+    Return a copy of `graph` whose ops store their outputs with the selected IO managers.
+
+    Ops are copied with the IO manager key of their outputs replaced, see
+    function `select_io_managers`. Nodes calling the same op with the same
+    IO managers share the copy, named after the op and the IO managers.
+    """
+
+    copies: Dict[Tuple[int, Tuple[Tuple[str, str], ...]], dagster.OpDefinition] = {}
+    operations = dict(graph.operations)
+    input_step = to_snake_case(DEFAULT_INITIAL_DATA_NAME)
+
+    for node, io_managers in graph.io_managers.items():
+        if node == input_step:
+            continue
+
+        op_def = graph.operations[node]
+        key = (id(op_def), tuple(sorted(io_managers.items())))
+        if key not in copies:
+            outs = {}
+            for output_def in op_def.output_defs:
+                out = (dagster.DynamicOut if output_def.is_dynamic else dagster.Out).from_definition(
+                    output_def
+                )
+                outs[output_def.name] = out._replace(
+                    io_manager_key=io_managers.get(output_def.name, out.io_manager_key)
+                )
+
+            suffix = "_".join(dict.fromkeys(value for _, value in key[1]))
+            copies[key] = op_def.with_replaced_properties(name=f"{op_def.name}_{suffix}", outs=outs)
+
+        operations[node] = copies[key]
+
+    return dataclasses.replace(graph, operations=operations)
+
+
+def payload_format(obj: Any) -> str:
+    """
+    Return the format in which `MemoryMappedIOManager` stores `obj`.
+
+    NumPy arrays without Python objects are stored as `npy`, Arrow tables and
+    record batches as `arrow`, bytes-like objects as `bytes` and all other
+    objects as `pickle`. NumPy and PyArrow objects are recognized without
+    importing these libraries.
+    """
+
+    library = type(obj).__module__.partition(".")[0]
+    if library == "numpy" and type(obj).__name__ in ("ndarray", "memmap"):
+        return "pickle" if obj.dtype.hasobject else "npy"
+
+    if library == "pyarrow" and type(obj).__name__ in ("Table", "RecordBatch"):
+        return "arrow"
+
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return "bytes"
+
+    return "pickle"
+
+
+def write_npy(path: Path, obj: Any) -> None:
+    """Write a NumPy array to a `.npy` file."""
+
+    import numpy
+
+    numpy.save(path, obj, allow_pickle=False)
+
+
+def write_arrow(path: Path, obj: Any) -> None:
+    """Write an Arrow table or record batch to an Arrow IPC file."""
+
+    import pyarrow
+
+    with pyarrow.OSFile(str(path), "wb") as sink, pyarrow.ipc.new_file(sink, obj.schema) as writer:
+        writer.write(obj)
+
+
+def write_bytes(path: Path, obj: Any) -> None:
+    """Write a bytes-like object to a file."""
+
+    path.write_bytes(obj)
+
+
+def write_pickle(path: Path, obj: Any) -> None:
+    """Write an object to a file with pickle."""
+
+    path.write_bytes(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_pickle(file_path: str) -> Any:
+    """Return an object read from a file written by function `write_pickle`."""
+
+    return pickle.loads(Path(file_path).read_bytes())
+
+
+# Writer, loader and file suffix of every payload format, see function `payload_format`.
+PAYLOAD_FORMATS: Dict[str, Tuple[Callable[[Path, Any], None], Callable[[str], Any], str]] = {
+    "npy": (write_npy, load_npy, ".npy"),
+    "arrow": (write_arrow, load_arrow, ".arrow"),
+    "bytes": (write_bytes, load_bytes, ".bin"),
+    "pickle": (write_pickle, load_pickle, ".pkl"),
+}
+
+
+class MemoryMappedIOManager(dagster.IOManager):
+    """
+    IO manager storing outputs in files that consumers memory-map.
+
+    Outputs are stored in `base_dir` in the format given by function
+    `payload_format`. NumPy arrays, Arrow tables and bytes are loaded as
+    read-only views of the memory-mapped file, so that they cross step and
+    process boundaries without being serialized or copied, and processes
+    reading the same output share its pages. Arrow record batches are loaded
+    as tables. Other outputs are pickled.
+
+    With `base_dir` on a memory-backed file system such as `/dev/shm`, outputs
+    are passed through shared memory. Files are kept after the run, so that
+    its steps may be re-executed, until they are removed by method `clear`,
+    for instance from a `dagster.run_status_sensor`.
+    """
+
+    def __init__(self, base_dir: str | Path) -> None:
+        self.base_dir = Path(base_dir)
+
+    def _path(self, context: dagster.InputContext | dagster.OutputContext) -> Path:
+        return self.base_dir.joinpath(*context.get_identifier())
+
+    def handle_output(self, context: dagster.OutputContext, obj: Any) -> None:
+        """Write `obj` to a file in its payload format."""
+
+        path = self._path(context)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        write, _, suffix = PAYLOAD_FORMATS[payload_format(obj)]
+        write(path.with_name(path.name + suffix), obj)
+
+    def load_input(self, context: dagster.InputContext) -> Any:
+        """Return a view of the memory-mapped file of the upstream output."""
+
+        path = self._path(context.upstream_output)
+
+        for _, load, suffix in PAYLOAD_FORMATS.values():
+            file_path = path.with_name(path.name + suffix)
+            if file_path.exists():
+                return load(str(file_path))
+
+        raise FileNotFoundError(f"No stored output found at '{path}'.")
+
+    def clear(self, run_id: str) -> int:
+        """
+        Remove the files storing the outputs of the run `run_id`.
+
+        Other files in the directory of the run, such as those written by other
+        IO managers to the instance storage, are kept. Returns the number of
+        removed files.
+        """
+
+        suffixes = {suffix for _, _, suffix in PAYLOAD_FORMATS.values()}
+        removed = 0
+
+        # Paths are sorted in reverse, so that directories follow their content.
+        for path in sorted((self.base_dir / run_id).rglob("*"), reverse=True):
+            if path.is_dir():
+                with contextlib.suppress(OSError):
+                    path.rmdir()
+
+            elif path.suffix in suffixes:
+                path.unlink(missing_ok=True)
+                removed += 1
+
+        with contextlib.suppress(OSError):
+            (self.base_dir / run_id).rmdir()
+
+        return removed
+
+
+@dagster.io_manager(
+    config_schema={
+        "base_dir": dagster.Field(
+            str,
+            is_required=False,
+            description="Directory of the outputs, such as `/dev/shm`. Defaults to the instance "
+            "storage.",
+        )
+    },
+    description="Passes outputs through memory-mapped files.",
+)
+def memory_mapped_io_manager(context: dagster.InitResourceContext) -> MemoryMappedIOManager:
+    """Define an IO manager creating a `MemoryMappedIOManager` for every run."""
+
+    return MemoryMappedIOManager(
+        context.resource_config.get("base_dir") or context.instance.storage_directory()
+    )
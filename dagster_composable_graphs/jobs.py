@@ -1,11 +1,58 @@
-from typing import Any, Dict, Iterator
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
 
 import dagster
 
+from .file_inputs import FILE_INPUT_IO_MANAGER_KEY, FileReference
+from .models import FileInputDefinition, PartitionInputDefinition
+from .partitions import partition_value
 from .util import to_snake_case
 
 
-def input_op_builder(name: str, static_value: Dict[str, Any]) -> dagster.OpDefinition:
+def input_out(value: Any, io_manager_key: Optional[str] = None) -> dagster.Out:
+    """Return the output of the input op for a graph input, passed by the given IO manager."""
+
+    if isinstance(value, FileInputDefinition):
+        return dagster.Out(FileReference, io_manager_key=io_manager_key or FILE_INPUT_IO_MANAGER_KEY)
+
+    if isinstance(value, PartitionInputDefinition):
+        return dagster.Out(
+            str if value.from_partition == "key" else list, io_manager_key=io_manager_key
+        )
+
+    return dagster.Out(type(value), io_manager_key=io_manager_key)
+
+
+def input_field(value: Any) -> dagster.Field:
+    """Return the configuration field overriding a graph input, the path for file inputs."""
+
+    if isinstance(value, FileInputDefinition):
+        return dagster.Field(
+            str,
+            default_value=value.from_file,
+            is_required=False,
+            description=f"Path to the {value.file_format()} file read by consumers.",
+        )
+
+    return dagster.Field(type(value), default_value=value, is_required=False)
+
+
+def input_value(value: Any, config_value: Any) -> Any:
+    """Return the output of the input op for a graph input, given its configured value."""
+
+    if isinstance(value, FileInputDefinition):
+        path = Path(config_value)
+        if not path.is_file():
+            raise FileNotFoundError(f"Input file '{config_value}' not found.")
+
+        return FileReference(path=str(path.resolve()), format=value.file_format())
+
+    return config_value
+
+
+def input_op_builder(
+    name: str, static_value: Dict[str, Any], io_managers: Optional[Dict[str, str]] = None
+) -> dagster.OpDefinition:
     """
     Define a dagster op that returns the input data for a graph.
 
@@ -13,7 +60,12 @@ def input_op_builder(name: str, static_value: Dict[str, Any]) -> dagster.OpDefin
     a way that is compatible with the compilation of a dagster `JobDefinition`.
 
     Input values given in the graph definition may be overridden by the run
-    configuration.
+    configuration. Inputs referencing a file are not read by the op: it
+    outputs a `FileReference` to the configured path, passed by the
+    `FileInputIOManager` under resource key `file_input_io_manager`, so that
+    consumers receive a memory-mapped view of the file. Partition inputs are
+    not configurable: the op outputs the partition keys of the run, see
+    function `partition_value`.
 
     Arguments
     ---------
@@ -23,13 +75,18 @@ def input_op_builder(name: str, static_value: Dict[str, Any]) -> dagster.OpDefin
     static_value : Dict[str, Any]
         Dictionary containing input values as provided in the graph definition.
 
+    io_managers : Optional[Dict[str, str]]
+        Resource keys of the IO managers passing inputs, by input name. Inputs
+        not listed are passed by the IO manager of the job.
+
     Returns
     -------
     dagster.OpDefinition
         The generated dagster `OpDefinition`.
     """
 
-    op_outs = {k: dagster.Out(type(v)) for k, v in static_value.items()}
+    io_managers = io_managers or {}
+    op_outs = {k: input_out(v, io_managers.get(k)) for k, v in static_value.items()}
 
     if len(op_outs) == 1:
         # A dummy output is added so that the output of this op is always a dictionary.
@@ -39,8 +96,9 @@ def input_op_builder(name: str, static_value: Dict[str, Any]) -> dagster.OpDefin
         name=to_snake_case(name),
         out=op_outs,
         config_schema={
-            k: dagster.Field(type(v), default_value=v, is_required=False)
+            k: input_field(v)
             for k, v in static_value.items()
+            if not isinstance(v, PartitionInputDefinition)
         },
         description=(
             f"Return initial values for parameters {', '.join(static_value)}. "
@@ -48,9 +106,10 @@ def input_op_builder(name: str, static_value: Dict[str, Any]) -> dagster.OpDefin
         ),
     )
     def op_fn(context: dagster.OpExecutionContext) -> Iterator[dagster.Output]:
-        yield from (
-            dagster.Output(context.op_config.get(k, v), output_name=k)
-            for k, v in static_value.items()
-        )
+        for k, v in static_value.items():
+            if isinstance(v, PartitionInputDefinition):
+                yield dagster.Output(partition_value(v, context), output_name=k)
+            else:
+                yield dagster.Output(input_value(v, context.op_config.get(k, v)), output_name=k)
 
     return op_fn
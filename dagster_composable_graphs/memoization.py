@@ -0,0 +1,430 @@
+import contextlib
+import dataclasses
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import dagster
+
+from .errors import GraphDefinitionError
+from .file_inputs import FileReference
+from .fusion import is_plain_op
+from .index import upstream_closure
+from .models import (
+    DEFAULT_CACHE_MAX_SIZE,
+    CacheDefinition,
+    FileInputDefinition,
+    Graph,
+    OperationDef,
+)
+from .util import file_signature, op_code_version
+
+DEFAULT_CACHE_LOCATION = Path(tempfile.gettempdir()) / "dagster-composable-graphs"
+
+# Errors raised when pickling objects that do not support it, such as
+# memory-mapped views of file inputs or locally defined functions.
+UNPICKLABLE_ERRORS = (TypeError, AttributeError, pickle.PicklingError)
+
+
+def fingerprint(*values: Any) -> str:
+    """
+    Return a hash of the pickled `values`.
+
+    Values that compare equal may still have different fingerprints, for
+    example dictionaries with a different insertion order, which only results
+    in a cache miss.
+    """
+
+    return hashlib.sha256(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class LocalResultStore:
+    """
+    Store of pickled results in a local directory.
+
+    Every result is stored in its own file, written to a temporary file first
+    and then renamed, so that readers never see partial results. Concurrent
+    processes can therefore share a store: a result removed by another process
+    is simply a miss. Results are evicted least recently used first once the
+    size of the directory exceeds `max_size`.
+
+    Arguments
+    ---------
+    directory : str | Path
+        Directory where results are stored. It is created on first write.
+
+    max_size : int
+        Size of the stored results in bytes above which results are evicted.
+
+    ttl : Optional[float]
+        Seconds after which a stored result expires. Results never expire if
+        `None`.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        """Return the path of the file storing the result for `key`."""
+
+        return self.directory / f"{key}.pkl"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return whether a current result is stored for `key`, and the result if so."""
+
+        path = self._path(key)
+
+        try:
+            with path.open("rb") as file:
+                created, value = pickle.load(file)
+
+        except FileNotFoundError:
+            return False, None
+
+        if self.ttl is not None and time.time() - created > self.ttl:
+            path.unlink(missing_ok=True)
+            return False, None
+
+        # The modification time of a result tracks its last use for eviction.
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, evicting old results if the store is too large."""
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump((time.time(), value), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temp_path, self._path(key))
+
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        self.evict()
+
+    def _entries(self) -> Iterator[Tuple[float, int, str]]:
+        """Yield modification time, size and path of every stored result."""
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".pkl"):
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = entry.stat()
+                        yield stat.st_mtime, stat.st_size, entry.path
+
+    def evict(self) -> int:
+        """
+        Remove least recently used results until the store fits `max_size`.
+
+        Returns the number of removed results.
+        """
+
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        evicted = 0
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+            size -= entry_size
+            evicted += 1
+
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all stored results."""
+
+        for _, _, path in list(self._entries()):
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+
+def operation_version(operation: dagster.GraphDefinition | dagster.OpDefinition) -> Tuple:
+    """Return the code versions of an op, or of every op in a graph."""
+
+    if isinstance(operation, dagster.OpDefinition):
+        return (op_code_version(operation),)
+
+    return tuple(op_code_version(op) for op in operation.iterate_op_defs())
+
+
+class Lineage(NamedTuple):
+    """
+    Lineage of a node memoized by key strategy `lineage`, see function `lineage_key`.
+
+    `key` is a fingerprint of the node and its upstream nodes, while the values
+    of the graph inputs they consume, listed in `inputs` with their value in
+    the graph definition, are only known at run time.
+    """
+
+    key: str
+    inputs: Dict[str, Any]
+
+
+def lineage_key(graph: Graph, node: str, function_paths: Dict[str, str]) -> Lineage:
+    """
+    Return the lineage of `node`, from which the keys of its results are derived.
+
+    The lineage of a node consists of the node and all its upstream nodes. Its
+    key is a fingerprint of their functions, code versions and dependencies.
+    Graph inputs may be overridden in the run configuration, or reference a
+    file modified after the graph is created, so their values are added to
+    the key at run time, see function `lineage_input_value`.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    node : str
+        Name of the node.
+
+    function_paths : Dict[str, str]
+        Importable path of the function of every operation.
+
+    Returns
+    -------
+    Lineage
+        The lineage of the node.
+    """
+
+    lineage = upstream_closure(graph, [graph.node_ids[node]])
+
+    nodes = []
+    inputs = {}
+    for name in sorted(graph.nodes[node_id] for node_id in lineage):
+        node_deps = []
+        for dep, pointer in graph.dependencies.get(name, []):
+            if pointer is None:
+                inputs[dep] = graph.initial_data[dep]
+
+            node_deps.append((dep, None if pointer is None else pointer.pointer))
+
+        version = operation_version(graph.operations[name])
+        nodes.append((name, function_paths[name], version, node_deps))
+
+    return Lineage(key=fingerprint(nodes), inputs=dict(sorted(inputs.items())))
+
+
+def lineage_input_value(value: Any) -> Any:
+    """
+    Return the value of a graph input identifying it in the key of a result.
+
+    Files are identified by path, modification time and size, rather than by
+    their content.
+    """
+
+    if isinstance(value, FileReference):
+        return (value.path, file_signature(value.path))
+
+    return value
+
+
+def memoized_op_builder(
+    name: str,
+    op_def: dagster.OpDefinition,
+    function_path: str,
+    store: LocalResultStore,
+    lineage: Optional[Lineage] = None,
+) -> dagster.OpDefinition:
+    """
+    Define a dagster op that reuses stored results of a plain op.
+
+    Arguments
+    ---------
+    name : str
+        Name of the created dagster op.
+
+    op_def : dagster.OpDefinition
+        The memoized op, see function `is_plain_op`.
+
+    function_path : str
+        Importable path of the op, part of the keys of its results.
+
+    store : LocalResultStore
+        Store of the results.
+
+    lineage : Optional[Lineage]
+        Lineage of the node. If given, results are keyed by the lineage key and
+        the values of the graph inputs of the lineage, received by additional
+        inputs following those of the op. Inputs referencing a file receive the
+        `FileReference` itself. If `None`, results are keyed by a fingerprint
+        of the function path, the `code_version` and the input values of the op.
+
+    Returns
+    -------
+    dagster.OpDefinition
+        The generated dagster `OpDefinition`.
+    """
+
+    fn = op_def.compute_fn.decorated_fn
+    code_version = op_code_version(op_def)
+    lineage_inputs = {} if lineage is None else lineage.inputs
+    lineage_names = [f"lineage_input_{index}" for index in range(len(lineage_inputs))]
+
+    def compute_fn(context: dagster.OpExecutionContext, **inputs: Any) -> Iterator[dagster.Output]:
+        values = {k: v for k, v in inputs.items() if k not in lineage_names}
+
+        try:
+            if lineage is None:
+                result_key = fingerprint(function_path, code_version, sorted(values.items()))
+            else:
+                result_key = fingerprint(
+                    lineage.key, [lineage_input_value(inputs[k]) for k in lineage_names]
+                )
+
+        except UNPICKLABLE_ERRORS as exc:
+            context.log.warning(
+                f"Inputs of `{name}` cannot be fingerprinted, so its result is not cached: {exc}"
+            )
+            yield dagster.Output(fn(**values), metadata={"cache_hit": False})
+            return
+
+        hit, value = store.get(result_key)
+
+        if hit:
+            context.log.debug(f"Reusing stored result {result_key}.")
+        else:
+            value = fn(**values)
+            try:
+                store.put(result_key, value)
+            except UNPICKLABLE_ERRORS as exc:
+                context.log.warning(f"Result of `{name}` cannot be stored: {exc}")
+
+        yield dagster.Output(value, metadata={"cache_key": result_key, "cache_hit": hit})
+
+    ins = {input_def.name: dagster.In.from_definition(input_def) for input_def in op_def.input_defs}
+    ins.update(
+        (input_name, dagster.In(FileReference if isinstance(value, FileInputDefinition) else Any))
+        for input_name, value in zip(lineage_names, lineage_inputs.values())
+    )
+
+    # Dagster reads the positional inputs of an op from the signature of its
+    # function, so that lineage inputs follow the inputs of the memoized op.
+    compute_fn.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [
+            inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+            for name in ["context", *ins]
+        ]
+    )
+
+    return dagster.op(
+        name=name,
+        ins=ins,
+        out={
+            output_def.name: dagster.Out.from_definition(output_def)
+            for output_def in op_def.output_defs
+        },
+        description=op_def.description,
+        tags=op_def.tags,
+        code_version=code_version,
+    )(compute_fn)
+
+
+def memoize_operations(graph: Graph, operation_defs: List[OperationDef], namespace: str) -> Graph:
+    """
+    Return a copy of `graph` where operations with a `cache` definition are memoized.
+
+    Memoized operations are replaced by ops built with function
+    `memoized_op_builder`, named after the node they replace and storing
+    results in a `LocalResultStore` per operation. With key strategy `inputs`,
+    results are keyed by the input values of the operation. With key strategy
+    `lineage`, results are keyed by the lineage of the operation, see function
+    `lineage_key`, and by the values of the graph inputs it depends on, which
+    are wired to the memoized op, so that outputs of upstream nodes are never
+    hashed; this assumes upstream operations are deterministic and cannot be
+    used by nodes mapped over a dynamic output.
+
+    Results are stored in the `location` of the cache definition or, by
+    default, in a directory per namespace and node under
+    `DEFAULT_CACHE_LOCATION`, so that stores with different limits never
+    evict the results of each other. Results whose inputs cannot be pickled
+    are not cached.
+
+    Only plain ops can be memoized, see function `is_plain_op`. Changes to ops
+    without a `code_version` are not detected.
+
+    Raises `GraphDefinitionError` if an operation cannot be memoized.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    operation_defs : List[OperationDef]
+        Definitions of the operations in the graph.
+
+    namespace : str
+        Name of the directory of the default stores, such as the job name.
+
+    Returns
+    -------
+    Graph
+        The graph with memoized operations.
+    """
+
+    function_paths = {op.name: op.function or op.graph for op in operation_defs}
+    operations = dict(graph.operations)
+    dependencies = dict(graph.dependencies)
+
+    for operation_def in operation_defs:
+        cache: Optional[CacheDefinition] = operation_def.cache
+        node = operation_def.name
+
+        # Nodes may have been pruned or merged into another node.
+        if cache is None or node not in graph.operations:
+            continue
+
+        if not is_plain_op(graph.operations[node]):
+            raise GraphDefinitionError(
+                f"Operation `{node}` cannot be memoized: only ops taking inputs alone and "
+                "returning a single output are supported."
+            )
+
+        lineage = None
+        if cache.key == "lineage":
+            if "map" in graph.input_modes.get(node, {}).values():
+                raise GraphDefinitionError(
+                    f"Operation `{node}` is mapped over a dynamic output and cannot be "
+                    "memoized by lineage."
+                )
+
+            lineage = lineage_key(graph, node, function_paths)
+            dependencies[node] = [
+                *dependencies.get(node, []),
+                *((name, None) for name in lineage.inputs),
+            ]
+
+        store = LocalResultStore(
+            cache.location or DEFAULT_CACHE_LOCATION / namespace / node,
+            max_size=cache.max_size,
+            ttl=cache.ttl,
+        )
+        operations[node] = memoized_op_builder(
+            f"memoized_{node}", graph.operations[node], function_paths[node], store, lineage
+        )
+
+    return dataclasses.replace(graph, operations=operations, dependencies=dependencies)
@@ -1,5 +1,6 @@
 import dataclasses
-from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple
+from pathlib import PurePath
+from typing import Any, ClassVar, Dict, List, Literal, Optional, Set, Tuple
 
 import dagster
 import pydantic
@@ -9,6 +10,14 @@ DEFAULT_OUTPUT_KEY_NAME: Literal["result"] = "result"
 DEFAULT_OUTPUT_POINTER: Literal["/result"] = "/result"
 DEFAULT_INITIAL_DATA_NAME: Literal["inputs"] = "inputs"
 
+FileFormat = Literal["bytes", "npy", "arrow", "parquet"]
+FILE_FORMATS_BY_SUFFIX: Dict[str, FileFormat] = {
+    ".npy": "npy",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".parquet": "parquet",
+}
+
 
 class ApplicationModel(pydantic.BaseModel):
     """Base model for application-specific models with camel case alias generation."""
@@ -28,11 +37,88 @@ class Metadata(ApplicationModel):
     )
 
 
+DEFAULT_CACHE_MAX_SIZE = 2**30
+
+# Tags read by dagster to order steps and limit their concurrency by pool.
+PRIORITY_TAG = "dagster/priority"
+POOL_TAG = "dagster/concurrency_key"
+
+
+class CacheDefinition(ApplicationModel):
+    """Configuration of the memoization of the results of an operation."""
+
+    key: Literal["inputs", "lineage"] = pydantic.Field(
+        default="inputs",
+        description=(
+            "Strategy used to key results: a fingerprint of the input values of the operation, "
+            "or of the graph inputs and code versions of the operation and its upstream nodes."
+        ),
+    )
+    ttl: Optional[float] = pydantic.Field(
+        description="Seconds after which stored results expire.", default=None
+    )
+    location: Optional[str] = pydantic.Field(
+        description="Directory where results are stored.", default=None
+    )
+    max_size: int = pydantic.Field(
+        description="Size in bytes above which the least recently used results are evicted.",
+        default=DEFAULT_CACHE_MAX_SIZE,
+    )
+
+
 class OperationDef(ApplicationModel):
     """Definition of an operation in the graph."""
 
     name: str = pydantic.Field(description="Name of the operation.")
-    function: str = pydantic.Field(description="Function associated with the operation.")
+    function: Optional[str] = pydantic.Field(
+        description="Function associated with the operation.", default=None
+    )
+    graph: Optional[str] = pydantic.Field(
+        description=(
+            "Path to the definition of a composable graph used as the operation, instead of a "
+            "function. Relative paths are resolved from the directory of the definition file."
+        ),
+        default=None,
+    )
+    cache: Optional[CacheDefinition] = pydantic.Field(
+        description="Reuse stored results of the operation instead of executing it.",
+        default=None,
+    )
+    tags: Dict[str, str] = pydantic.Field(
+        description="Dagster tags of the node, used for instance by tag concurrency limits.",
+        default_factory=dict,
+    )
+    priority: Optional[int] = pydantic.Field(
+        description="Priority of the node. Executors start steps of higher priority first.",
+        default=None,
+    )
+    pool: Optional[str] = pydantic.Field(
+        description="Concurrency pool of the node, limiting the steps running across runs.",
+        default=None,
+    )
+    cost_hint: Optional[float] = pydantic.Field(
+        description="Estimated duration of the node, used when prioritizing steps.",
+        default=None,
+    )
+    io_manager: Optional[str] = pydantic.Field(
+        description=(
+            "Resource key of the IO manager passing the outputs of the operation to its "
+            "consumers, for instance `mmap_io_manager`. Defaults to the IO manager of the job."
+        ),
+        default=None,
+    )
+
+    def node_tags(self) -> Dict[str, str]:
+        """Return the dagster tags of the node, including its priority and pool."""
+
+        tags = dict(self.tags)
+        if self.priority is not None:
+            tags[PRIORITY_TAG] = str(self.priority)
+
+        if self.pool is not None:
+            tags[POOL_TAG] = self.pool
+
+        return tags
 
 
 class InputDefinition(ApplicationModel):
@@ -42,6 +128,29 @@ class InputDefinition(ApplicationModel):
     pointer: str = pydantic.Field(
         default=DEFAULT_OUTPUT_POINTER, description="Pointer to the specific output of the node."
     )
+    mode: Literal["value", "map", "collect", "stream"] = pydantic.Field(
+        default="value",
+        description=(
+            "How the output is passed: as a single value, mapping the operation over each "
+            "item of a dynamic output, collecting all items of a dynamic output in a list, or "
+            "streaming the chunks yielded by the node as an iterator, in the same step."
+        ),
+    )
+    buffer: Optional[int] = pydantic.Field(
+        description=(
+            "Number of chunks of a streamed output produced ahead of the consumer, in a "
+            "background thread. Chunks are produced on demand by default."
+        ),
+        default=None,
+        ge=1,
+    )
+    io_manager: Optional[str] = pydantic.Field(
+        description=(
+            "Resource key of the IO manager passing the referenced output, for instance "
+            "`mmap_io_manager`. Applies to every consumer of that output."
+        ),
+        default=None,
+    )
 
 
 class DependencyDefinition(ApplicationModel):
@@ -60,6 +169,149 @@ class ResourceDefinition(ApplicationModel):
     import_field: str = pydantic.Field(
         description="Importable path to the resource.", alias="import"
     )
+    config: Dict[str, Any] = pydantic.Field(
+        description=(
+            "Configuration of the resource. Jobs declaring a resource with the same import "
+            "and configuration share a single instance of it."
+        ),
+        default_factory=dict,
+    )
+
+
+class ExecutorDefinition(ApplicationModel):
+    """Definition of the executor of a job and its configuration."""
+
+    import_field: str = pydantic.Field(
+        description="Importable path to the executor.", alias="import"
+    )
+    config: Dict[str, Any] = pydantic.Field(
+        description="Configuration of the executor, such as `max_concurrent`.",
+        default_factory=dict,
+    )
+
+
+class ReferenceCountingDefinition(ApplicationModel):
+    """Configuration of the reference counting IO manager of a job."""
+
+    spill_threshold: Optional[int] = pydantic.Field(
+        description="Memory in bytes above which outputs are spilled to disk.", default=None
+    )
+    spill_directory: Optional[str] = pydantic.Field(
+        description="Directory for outputs spilled to disk.", default=None
+    )
+
+
+class TelemetryDefinition(ApplicationModel):
+    """Configuration of the runtime telemetry recorded for every node of a job."""
+
+    sink: Optional[str] = pydantic.Field(
+        description="Path to a JSONL file where a record is appended for every step.",
+        default=None,
+    )
+    observations: bool = pydantic.Field(
+        description="Also report records as asset observations keyed by job and node.",
+        default=False,
+    )
+
+
+class PrioritizationDefinition(ApplicationModel):
+    """Configuration of the prioritization of steps along the critical path of a job."""
+
+    stats: Optional[str] = pydantic.Field(
+        description=(
+            "Path to a telemetry JSONL file with the historical durations of the nodes. Nodes "
+            "without durations are weighted by their cost hint."
+        ),
+        default=None,
+    )
+
+
+class FileInputDefinition(ApplicationModel):
+    """
+    Graph input referencing a local file, read memory-mapped by the nodes using it.
+
+    Only mappings with key `fromFile`, and optionally `format`, are file
+    inputs; other mappings are passed as values.
+    """
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    from_file: str = pydantic.Field(
+        description=(
+            "Path to the file, relative to the directory of the definition file. May be "
+            "overridden in the run configuration."
+        )
+    )
+    format: Optional[FileFormat] = pydantic.Field(
+        description="Format of the file. Inferred from its extension by default, else `bytes`.",
+        default=None,
+    )
+
+    def file_format(self) -> FileFormat:
+        """Return the format of the file, also when inferred from its extension."""
+
+        return self.format or FILE_FORMATS_BY_SUFFIX.get(PurePath(self.from_file).suffix, "bytes")
+
+
+class PartitionInputDefinition(ApplicationModel):
+    """
+    Graph input providing the partition key of the run, set by the input op.
+
+    Only mappings with key `fromPartition`, and optionally `dimension`, are
+    partition inputs; other mappings are passed as values.
+    """
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    from_partition: Literal["key", "keys"] = pydantic.Field(
+        description=(
+            "Partition key of the run, or list of the partition keys of a run covering a range "
+            "of partitions, as launched by batched backfills."
+        )
+    )
+    dimension: Optional[str] = pydantic.Field(
+        description="Dimension of multi-dimensional partitions whose keys are provided.",
+        default=None,
+    )
+
+
+class TimeWindowPartitionsDefinition(ApplicationModel):
+    """Definition of partitions covering consecutive time windows."""
+
+    start: str = pydantic.Field(description="Start of the first partition, formatted by `fmt`.")
+    end: Optional[str] = pydantic.Field(
+        description="End of the last partition, formatted by `fmt`. Defaults to now.",
+        default=None,
+    )
+    cron_schedule: str = pydantic.Field(
+        description="Cron schedule at which partitions start.", default="0 0 * * *"
+    )
+    fmt: str = pydantic.Field(description="Format of the partition keys.", default="%Y-%m-%d")
+    timezone: Optional[str] = pydantic.Field(
+        description="Timezone of the schedule. Defaults to UTC.", default=None
+    )
+
+
+class PartitionDimensionDefinition(ApplicationModel):
+    """Definition of static or time-window partitions. Exactly one must be set."""
+
+    static: Optional[List[str]] = pydantic.Field(description="Keys of the partitions.", default=None)
+    time_window: Optional[TimeWindowPartitionsDefinition] = pydantic.Field(
+        description="Partitions covering consecutive time windows.", default=None
+    )
+
+
+class PartitionsDefinition(PartitionDimensionDefinition):
+    """Definition of the partitions of a job. Exactly one kind of partitions must be set."""
+
+    multi: Optional[Dict[str, PartitionDimensionDefinition]] = pydantic.Field(
+        description="Partitions crossing two dimensions, by dimension name.", default=None
+    )
+    max_partitions_per_run: int = pydantic.Field(
+        description="Number of consecutive partitions launched in a single run by backfills.",
+        default=1,
+        ge=1,
+    )
 
 
 class GraphSpec(ApplicationModel):
@@ -68,8 +320,12 @@ class GraphSpec(ApplicationModel):
     description: Optional[str] = pydantic.Field(
         description="Description of the composed job.", default=None
     )
-    inputs: Dict[str, Any] = pydantic.Field(
-        description="Inputs for the graph.", default_factory=dict
+    inputs: Dict[str, FileInputDefinition | PartitionInputDefinition | Any] = pydantic.Field(
+        description=(
+            "Inputs for the graph, given by value, as a reference to a local file or as the "
+            "partition key of the run."
+        ),
+        default_factory=dict,
     )
     operations: List[OperationDef] = pydantic.Field(
         description="List of operations in the graph.", default_factory=list
@@ -80,9 +336,51 @@ class GraphSpec(ApplicationModel):
     resources: List[ResourceDefinition] = pydantic.Field(
         description="Resources used in the job.", default_factory=list
     )
-    executor: Optional[str] = pydantic.Field(
-        description="Importable path to the executor used in this job.", default=None
+    executor: Optional[str | ExecutorDefinition] = pydantic.Field(
+        description="Importable path to the executor used in this job, or its definition.",
+        default=None,
+    )
+    targets: List[str] = pydantic.Field(
+        description=(
+            "Operations whose outputs are requested. Only these and the nodes they depend on "
+            "are composed. All operations are composed if empty."
+        ),
+        default_factory=list,
+    )
+    deduplication: bool = pydantic.Field(
+        description="Merge nodes calling the same operation with the same inputs.",
+        default=False,
+    )
+    fusion: bool = pydantic.Field(
+        description="Fuse single-consumer linear chains of plain ops into single steps.",
+        default=False,
+    )
+    reference_counting: Optional[ReferenceCountingDefinition] = pydantic.Field(
+        description="Release outputs from memory once their last consumer loaded them.",
+        default=None,
+    )
+    telemetry: Optional[TelemetryDefinition] = pydantic.Field(
+        description=(
+            "Record the duration and output size of every node, with the peak memory of the "
+            "process executing it."
+        ),
+        default=None,
+    )
+    prioritization: Optional[PrioritizationDefinition] = pydantic.Field(
+        description="Start the steps with the longest remaining path first.",
+        default=None,
     )
+    partitions: Optional[PartitionsDefinition] = pydantic.Field(
+        description="Partitions of the job, backfilled in parallel runs.", default=None
+    )
+
+    def executor_definition(self) -> Optional[ExecutorDefinition]:
+        """Return the definition of the executor, if any, also when given as a path."""
+
+        if isinstance(self.executor, str):
+            return ExecutorDefinition(import_field=self.executor)
+
+        return self.executor
 
 
 class GraphDefinition(ApplicationModel):
@@ -94,12 +392,61 @@ class GraphDefinition(ApplicationModel):
     spec: GraphSpec = pydantic.Field(description="Specification of the graph.")
 
 
+@dataclasses.dataclass(frozen=True)
+class CompiledPointer:
+    """
+    JSON pointer to an output of a node, parsed once when a graph is created.
+
+    Outputs of nodes are stored in dictionaries keyed by output name, see
+    function `dictify_graph_output`, so a pointer always references a single
+    key and resolving it is a direct lookup.
+    """
+
+    pointer: str
+    key: str
+
+    def resolve(self, result: Dict[str, Any]) -> Any:
+        """Return the output referenced by the pointer from the outputs of a node."""
+
+        return result[self.key]
+
+
 @dataclasses.dataclass
 class Graph:
-    """Representation of a graph with its components."""
+    """
+    Representation of a graph with its components.
+
+    Besides the name-based `operations` and `dependencies`, the graph holds an
+    integer index of its nodes: `nodes` maps node ids to names, `node_ids` maps
+    names back to ids, `upstream` and `downstream` contain the ids of adjacent
+    operations for every node id and `order` is a topological order of all node
+    ids. References to graph inputs are not part of the adjacency arrays.
+
+    Inputs not passed as a single value are listed in `input_modes`, by node
+    name and input position. Nodes replaced by a fused op are listed in
+    `fused`, under the name of the node executing them. Hooks in `hooks` are
+    attached to every node and dagster tags in `tags` to the nodes they are
+    listed under. Estimated costs of nodes are listed in `cost_hints`. Nodes
+    merged into an identical node are listed in `merged`, mapped to the name of
+    the node they were merged into. Resource keys of the IO managers selected
+    for outputs are listed in `io_managers`, by node name and output name,
+    those of graph inputs under the name of the input op.
+    """
 
     initial_data: Dict[str, Any]
     operations: Dict[str, dagster.GraphDefinition | dagster.OpDefinition]
-    dependencies: Dict[str, List[Tuple[str, str | None]]]
+    dependencies: Dict[str, List[Tuple[str, CompiledPointer | None]]]
     resources: Dict[str, dagster.ResourceDefinition | dagster.ConfigurableResource]
     executor: Optional[dagster.ExecutorDefinition]
+    nodes: List[str] = dataclasses.field(default_factory=list)
+    node_ids: Dict[str, int] = dataclasses.field(default_factory=dict)
+    upstream: List[List[int]] = dataclasses.field(default_factory=list)
+    downstream: List[List[int]] = dataclasses.field(default_factory=list)
+    order: List[int] = dataclasses.field(default_factory=list)
+    input_modes: Dict[str, Dict[int, str]] = dataclasses.field(default_factory=dict)
+    fused: Dict[str, List[str]] = dataclasses.field(default_factory=dict)
+    hooks: Set[dagster.HookDefinition] = dataclasses.field(default_factory=set)
+    tags: Dict[str, Dict[str, str]] = dataclasses.field(default_factory=dict)
+    cost_hints: Dict[str, float] = dataclasses.field(default_factory=dict)
+    merged: Dict[str, str] = dataclasses.field(default_factory=dict)
+    io_managers: Dict[str, Dict[str, str]] = dataclasses.field(default_factory=dict)
@@ -0,0 +1,207 @@
+from typing import Any, List, Optional, Sequence
+
+import dagster
+
+from .errors import GraphDefinitionError
+from .models import (
+    GraphDefinition,
+    PartitionDimensionDefinition,
+    PartitionInputDefinition,
+    PartitionsDefinition,
+)
+
+# Tags of runs covering a range of partitions, read by dagster for jobs and assets alike.
+PARTITION_RANGE_START_TAG = "dagster/asset_partition_range_start"
+PARTITION_RANGE_END_TAG = "dagster/asset_partition_range_end"
+
+# Metadata of composed jobs holding the number of partitions launched per backfill run.
+MAX_PARTITIONS_PER_RUN_TAG = "dagster-composable-graphs/max-partitions-per-run"
+
+
+def build_partitions_def(
+    definition: PartitionsDefinition | PartitionDimensionDefinition,
+) -> dagster.PartitionsDefinition:
+    """
+    Return the dagster partitions of a partitions definition or of one of its dimensions.
+
+    Raises `GraphDefinitionError` unless exactly one kind of partitions is set,
+    or if multi-dimensional partitions do not have exactly two dimensions, the
+    only number dagster supports.
+    """
+
+    kinds = [
+        kind
+        for kind in ("static", "time_window", "multi")
+        if getattr(definition, kind, None) is not None
+    ]
+    if len(kinds) != 1:
+        raise GraphDefinitionError(
+            "Partitions must be either static, time windows or multi-dimensional, "
+            f"got {', '.join(f'`{kind}`' for kind in kinds) or 'none'}."
+        )
+
+    if definition.static is not None:
+        return dagster.StaticPartitionsDefinition(definition.static)
+
+    if definition.time_window is not None:
+        time_window = definition.time_window
+        return dagster.TimeWindowPartitionsDefinition(
+            start=time_window.start,
+            end=time_window.end,
+            cron_schedule=time_window.cron_schedule,
+            fmt=time_window.fmt,
+            timezone=time_window.timezone,
+        )
+
+    dimensions = definition.multi  # type: ignore[union-attr]
+    if len(dimensions) != 2:  # noqa: PLR2004
+        raise GraphDefinitionError(
+            f"Multi-dimensional partitions must have two dimensions, got {len(dimensions)}."
+        )
+
+    return dagster.MultiPartitionsDefinition(
+        {name: build_partitions_def(dimension) for name, dimension in dimensions.items()}
+    )
+
+
+def graph_partitions_def(graph_def: GraphDefinition) -> Optional[dagster.PartitionsDefinition]:
+    """
+    Return the dagster partitions of a graph, if any, and validate its partition inputs.
+
+    Raises `GraphDefinitionError` if the graph has partition inputs but no
+    partitions, or if a partition input references a dimension that is not
+    one of the multi-dimensional partitions of the graph.
+    """
+
+    partitions = graph_def.spec.partitions
+    partitions_def = None if partitions is None else build_partitions_def(partitions)
+    dimensions = [] if partitions is None or partitions.multi is None else list(partitions.multi)
+
+    for name, value in graph_def.spec.inputs.items():
+        if not isinstance(value, PartitionInputDefinition):
+            continue
+
+        if partitions_def is None:
+            raise GraphDefinitionError(
+                f"Input `{name}` reads the partition key, but the graph declares no partitions."
+            )
+
+        if value.dimension is not None and value.dimension not in dimensions:
+            raise GraphDefinitionError(
+                f"Input `{name}` reads the keys of dimension `{value.dimension}`, which is not "
+                "a dimension of the partitions of the graph."
+            )
+
+    return partitions_def
+
+
+def partition_value(value: PartitionInputDefinition, context: dagster.OpExecutionContext) -> Any:
+    """
+    Return the partition key, or the list of partition keys, of the run of `context`.
+
+    Runs covering a range of partitions have no single partition key, so that
+    only inputs providing the list of keys may be used by batched backfills.
+    """
+
+    keys = [context.partition_key] if value.from_partition == "key" else context.partition_keys
+    if value.dimension is not None:
+        partitions_def = context.job_def.partitions_def
+        keys = [
+            partitions_def.get_partition_key_from_str(key).keys_by_dimension[value.dimension]
+            for key in keys
+        ]
+
+    return keys[0] if value.from_partition == "key" else list(keys)
+
+
+def partition_batches(
+    partitions_def: dagster.PartitionsDefinition,
+    max_partitions_per_run: int,
+    partition_keys: Optional[Sequence[str]] = None,
+) -> List[dagster.PartitionKeyRange]:
+    """
+    Split partitions into ranges of at most `max_partitions_per_run` consecutive partitions.
+
+    Arguments
+    ---------
+    partitions_def : dagster.PartitionsDefinition
+        Partitions of the job.
+
+    max_partitions_per_run : int
+        Number of partitions in every range but the last one.
+
+    partition_keys : Optional[Sequence[str]]
+        Keys of the partitions to split. Defaults to all partitions. Keys that
+        are not consecutive are never part of the same range.
+
+    Returns
+    -------
+    List[dagster.PartitionKeyRange]
+        Ranges of partitions, in partition order.
+    """
+
+    all_keys = list(partitions_def.get_partition_keys())
+    selected = set(all_keys if partition_keys is None else partition_keys)
+
+    batches: List[List[str]] = []
+    previous = None
+    for position, key in enumerate(all_keys):
+        if key not in selected:
+            continue
+
+        if previous != position - 1 or len(batches[-1]) == max_partitions_per_run:
+            batches.append([])
+
+        batches[-1].append(key)
+        previous = position
+
+    return [dagster.PartitionKeyRange(batch[0], batch[-1]) for batch in batches]
+
+
+def backfill_run_requests(
+    job: dagster.JobDefinition, partition_keys: Optional[Sequence[str]] = None
+) -> List[dagster.RunRequest]:
+    """
+    Return the run requests backfilling partitions of a composed job in batches.
+
+    Every run covers up to `spec.partitions.maxPartitionsPerRun` consecutive
+    partitions, see function `partition_batches`, so that a backfill launches
+    fewer runs, spread over the run workers. Runs of a single partition are
+    requested by partition key, others by range of partitions, whose keys are
+    provided to inputs declared with `fromPartition: keys`.
+
+    Raises `GraphDefinitionError` if the job is not partitioned.
+
+    Arguments
+    ---------
+    job : dagster.JobDefinition
+        Job composed by function `compose_job`.
+
+    partition_keys : Optional[Sequence[str]]
+        Keys of the partitions to backfill. Defaults to all partitions.
+
+    Returns
+    -------
+    List[dagster.RunRequest]
+        The run requests, to be returned by a sensor or schedule targeting the job.
+    """
+
+    if job.partitions_def is None:
+        raise GraphDefinitionError(f"Job `{job.name}` is not partitioned.")
+
+    max_partitions_per_run = job.metadata.get(MAX_PARTITIONS_PER_RUN_TAG)
+    batches = partition_batches(
+        job.partitions_def,
+        1 if max_partitions_per_run is None else max_partitions_per_run.value,
+        partition_keys,
+    )
+
+    return [
+        dagster.RunRequest(job_name=job.name, partition_key=batch.start)
+        if batch.start == batch.end
+        else dagster.RunRequest(
+            job_name=job.name,
+            tags={PARTITION_RANGE_START_TAG: batch.start, PARTITION_RANGE_END_TAG: batch.end},
+        )
+        for batch in batches
+    ]
@@ -0,0 +1,108 @@
+import functools
+from typing import Dict, List, Optional
+
+import dagster
+import jsonpointer
+
+from .errors import GraphDefinitionError
+from .models import DEFAULT_OUTPUT_KEY_NAME, CompiledPointer
+
+
+@functools.lru_cache(maxsize=None)
+def compile_pointer(pointer: str) -> CompiledPointer:
+    """
+    Parse a JSON pointer to an output of a node.
+
+    Raises `GraphDefinitionError` if the pointer is not valid or does not
+    reference exactly one output.
+
+    Arguments
+    ---------
+    pointer : str
+        JSON pointer, such as `/result`.
+
+    Returns
+    -------
+    CompiledPointer
+        The parsed pointer.
+    """
+
+    try:
+        parts = jsonpointer.JsonPointer(pointer).parts
+    except jsonpointer.JsonPointerException as exc:
+        raise GraphDefinitionError(f"Pointer `{pointer}` is not valid: {exc}") from exc
+
+    if len(parts) != 1:
+        raise GraphDefinitionError(f"Pointer `{pointer}` must reference a single output.")
+
+    return CompiledPointer(pointer=pointer, key=parts[0])
+
+
+def output_keys(operation: dagster.GraphDefinition | dagster.OpDefinition) -> List[str]:
+    """
+    Return the keys under which the outputs of an operation are stored.
+
+    Operations with a single output are stored under `DEFAULT_OUTPUT_KEY_NAME`
+    and those with several outputs under their output names, as declared in
+    `output_defs`.
+    """
+
+    if len(operation.output_defs) == 1:
+        return [DEFAULT_OUTPUT_KEY_NAME]
+
+    return [output_def.name for output_def in operation.output_defs]
+
+
+def compile_dependency_pointer(
+    node: str,
+    dep: str,
+    pointer: str,
+    operations: Dict[str, dagster.GraphDefinition | dagster.OpDefinition],
+) -> Optional[CompiledPointer]:
+    """
+    Compile the pointer of a dependency and validate it against the outputs it references.
+
+    Raises `GraphDefinitionError` naming both nodes if the pointer is not valid
+    or references an output not declared by the operation of `dep`.
+
+    Arguments
+    ---------
+    node : str
+        Name of the node that depends on `dep`.
+
+    dep : str
+        Name of the node or graph input providing the value.
+
+    pointer : str
+        JSON pointer to the output of `dep`.
+
+    operations : Dict[str, dagster.GraphDefinition | dagster.OpDefinition]
+        Operations in the graph.
+
+    Returns
+    -------
+    Optional[CompiledPointer]
+        The compiled pointer, or `None` if `dep` is not an operation, in which
+        case the pointer is not used.
+    """
+
+    try:
+        compiled = compile_pointer(pointer)
+    except GraphDefinitionError as exc:
+        raise GraphDefinitionError(f"Input of node `{node}` from `{dep}`: {exc}") from exc
+
+    if dep not in operations:
+        return None
+
+    keys = output_keys(operations[dep])
+    if compiled.key not in keys:
+        declared = "declares no outputs"
+        if keys:
+            declared = f"declares outputs {', '.join(f'`{key}`' for key in keys)}"
+
+        raise GraphDefinitionError(
+            f"Input of node `{node}` references output `{compiled.key}` of node `{dep}` "
+            f"through pointer `{pointer}`, but `{dep}` {declared}."
+        )
+
+    return compiled
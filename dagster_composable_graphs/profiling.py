@@ -0,0 +1,203 @@
+import contextlib
+import dataclasses
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+COMPILE_PROFILE_TAG = "dagster-composable-graphs/compile-profile"
+
+
+@dataclasses.dataclass(frozen=True)
+class PhaseRecord:
+    """
+    Measurement of a single phase of loading or composing a graph.
+
+    Phases are `parse` and `validate` for graph definition files, `import` for
+    modules, `resources` for instantiating resources, `index` for creating a
+    graph from its definition, `wire` and `job` for dagster's construction of
+    the graph and job, and `compose` for the whole composition of a job, which
+    spans all other phases of that job. `name` is the file path, module path,
+    resource path or graph name the phase applies to, and `graph` the name of
+    the graph composed while the phase ran, if any.
+
+    Allocations are the net number of memory blocks allocated by the
+    interpreter during the phase, see function `sys.getallocatedblocks`.
+    """
+
+    phase: str
+    name: str
+    graph: Optional[str]
+    seconds: float
+    allocations: int
+
+
+class CompileProfiler:
+    """
+    Recorder of the phases of loading and composing graphs.
+
+    Phases are recorded while the profiler is active, see function
+    `profile_compilation`. Only phases running in the current process are
+    recorded, so files parsed by worker processes are not.
+
+    Arguments
+    ---------
+    attach_metadata : bool
+        Whether composed jobs include a summary of their phases in metadata
+        entry `COMPILE_PROFILE_TAG`.
+
+    callback : Optional[Callable[[PhaseRecord], None]]
+        Function called with every recorded phase.
+    """
+
+    def __init__(
+        self,
+        attach_metadata: bool = False,
+        callback: Optional[Callable[[PhaseRecord], None]] = None,
+    ) -> None:
+        self.attach_metadata = attach_metadata
+        self.callback = callback
+        self.records: List[PhaseRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def graph(self) -> Optional[str]:
+        """Name of the graph being composed by the current thread, if any."""
+
+        return getattr(self._local, "graph", None)
+
+    @contextlib.contextmanager
+    def phase(self, phase: str, name: str) -> Iterator[None]:
+        """Record the wall time and allocations of the code run within the context."""
+
+        graph = self.graph
+        if phase == "compose":
+            self._local.graph = name
+
+        allocations = sys.getallocatedblocks()
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            record = PhaseRecord(
+                phase=phase,
+                name=name,
+                graph=name if phase == "compose" else graph,
+                seconds=time.perf_counter() - start,
+                allocations=sys.getallocatedblocks() - allocations,
+            )
+            self._local.graph = graph
+
+            with self._lock:
+                self.records.append(record)
+
+            if self.callback is not None:
+                self.callback(record)
+
+    def summary(self, graph: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Return the total time, allocations and count of every phase.
+
+        Arguments
+        ---------
+        graph : Optional[str]
+            If given, only phases recorded while composing this graph are
+            summarized.
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            Keys `seconds`, `allocations` and `count` by phase.
+        """
+
+        with self._lock:
+            records = [r for r in self.records if graph is None or r.graph == graph]
+
+        return _aggregate(records, lambda record: record.phase)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Return a structured report of all recorded phases.
+
+        The report contains the summary of every phase under key `phases`, and
+        for every phase the totals by name under key `names`, so that slow
+        modules are listed under `names["import"]` and slow graphs under
+        `names["compose"]`. Names are sorted from slowest to fastest.
+        """
+
+        with self._lock:
+            records = list(self.records)
+
+        names = {}
+        for phase in dict.fromkeys(record.phase for record in records):
+            totals = _aggregate([r for r in records if r.phase == phase], lambda r: r.name)
+            names[phase] = dict(sorted(totals.items(), key=lambda item: -item[1]["seconds"]))
+
+        return {"phases": _aggregate(records, lambda record: record.phase), "names": names}
+
+
+def _aggregate(
+    records: List[PhaseRecord], key: Callable[[PhaseRecord], str]
+) -> Dict[str, Dict[str, float]]:
+    """Return the total time, allocations and count of `records` grouped by `key`."""
+
+    totals: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        total = totals.setdefault(key(record), {"seconds": 0.0, "allocations": 0, "count": 0})
+        total["seconds"] += record.seconds
+        total["allocations"] += record.allocations
+        total["count"] += 1
+
+    return totals
+
+
+_profiler: Optional[CompileProfiler] = None
+
+
+def active_profiler() -> Optional[CompileProfiler]:
+    """Return the active `CompileProfiler`, if any."""
+
+    return _profiler
+
+
+@contextlib.contextmanager
+def profile_compilation(
+    attach_metadata: bool = False,
+    callback: Optional[Callable[[PhaseRecord], None]] = None,
+) -> Iterator[CompileProfiler]:
+    """
+    Record the phases of loading and composing graphs within the context.
+
+    The profiler is active in all threads of the process until the context
+    exits, after which the previously active profiler, if any, is restored.
+    See class `CompileProfiler` for the arguments.
+
+    For instance, the modules slowest to import when loading a directory of
+    graph definitions are listed in `profiler.report()["names"]["import"]`.
+    """
+
+    global _profiler  # noqa: PLW0603
+
+    previous = _profiler
+    _profiler = CompileProfiler(attach_metadata=attach_metadata, callback=callback)
+
+    try:
+        yield _profiler
+
+    finally:
+        _profiler = previous
+
+
+@contextlib.contextmanager
+def profile_phase(phase: str, name: str) -> Iterator[None]:
+    """Record a phase in the active profiler, doing nothing if there is none."""
+
+    if _profiler is None:
+        yield
+        return
+
+    with _profiler.phase(phase, name):
+        yield
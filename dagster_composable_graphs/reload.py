@@ -0,0 +1,272 @@
+import dataclasses
+import hashlib
+import importlib
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import dagster
+
+from .compose import (
+    FileSignature,
+    compose_job,
+    file_signature,
+    invalidate_subgraphs,
+    load_subgraph,
+)
+from .definitions import compose_definitions, referenced_modules
+from .formats import load_graph_def
+from .imports import import_registry
+from .models import GraphDefinition
+from .resources import resource_registry
+
+
+class Fingerprint(NamedTuple):
+    """Modification time and size of a file, with a hash of its content."""
+
+    signature: Optional[FileSignature]
+    digest: Optional[str]
+
+
+def file_fingerprint(file_path: str | Path, previous: Optional[Fingerprint] = None) -> Fingerprint:
+    """
+    Return the fingerprint of a file, or `previous` if the file was not modified since.
+
+    The content of the file is only hashed when its modification time or size
+    changed, so that files merely touched keep the same digest. Missing files
+    have neither signature nor digest.
+    """
+
+    signature = file_signature(file_path)
+    if previous is not None and previous.signature == signature:
+        return previous
+
+    if signature is None:
+        return Fingerprint(signature=None, digest=None)
+
+    return Fingerprint(
+        signature=signature, digest=hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+    )
+
+
+def module_file(module_path: str) -> Optional[str]:
+    """Return the source file of an imported module, if any."""
+
+    module = sys.modules.get(module_path)
+    return getattr(module, "__file__", None)
+
+
+class ReloadInfo(NamedTuple):
+    """Outcome of the last call of method `DefinitionsReloader.reload`."""
+
+    composed: List[Path]
+    reused: List[Path]
+    removed: List[Path]
+    modules: List[str]
+
+
+@dataclasses.dataclass
+class _GraphFile:
+    """Job composed from a graph definition file, with the files it was composed from."""
+
+    fingerprint: Fingerprint
+    graph_def: GraphDefinition
+    job: dagster.JobDefinition
+    subgraph_files: Dict[str, Optional[FileSignature]]
+
+
+class DefinitionsReloader:
+    """
+    Incremental loader of the jobs of the graph definition files in a directory.
+
+    Every call of method `reload` returns the same definitions as function
+    `load_definitions_from_directory`, but only recomposes the jobs of the
+    files that changed since the previous call, reusing the `JobDefinition`
+    of every other file. A job is recomposed when its graph definition file,
+    the file of a subgraph it includes or the source file of a module it
+    references changed. Modified modules are reloaded with
+    `importlib.reload`, and the objects and resources imported from them are
+    invalidated in the shared registries.
+
+    Files are compared by modification time and size first, and by a hash of
+    their content only when those differ, so that the cost of a reload is
+    proportional to the changes rather than to the number of graphs.
+
+    Arguments
+    ---------
+    path : str | Path
+        Directory containing the graph definition files.
+
+    pattern : str
+        Glob pattern of the files to load, relative to `path`.
+
+    import_workers : Optional[int]
+        Number of threads importing modules, see method
+        `ImportRegistry.prefetch`.
+    """
+
+    def __init__(
+        self, path: str | Path, pattern: str = "*.yaml", import_workers: Optional[int] = 1
+    ) -> None:
+        self.path = Path(path)
+        self.pattern = pattern
+        self.import_workers = import_workers
+        self._files: Dict[Path, _GraphFile] = {}
+        self._modules: Dict[str, Fingerprint] = {}
+        self._info = ReloadInfo(composed=[], reused=[], removed=[], modules=[])
+
+    def _reload_modules(self) -> Tuple[List[str], Dict[str, Exception]]:
+        """Reload the modified modules, returning them and the errors of those failing to."""
+
+        reloaded = []
+        errors: Dict[str, Exception] = {}
+
+        for module_path, previous in self._modules.items():
+            source = module_file(module_path)
+            if source is None:
+                continue
+
+            fingerprint = file_fingerprint(source, previous)
+            if fingerprint.digest == previous.digest:
+                self._modules[module_path] = fingerprint
+                continue
+
+            try:
+                importlib.reload(sys.modules[module_path])
+            except Exception as exc:
+                errors[module_path] = exc
+                continue
+
+            self._modules[module_path] = fingerprint
+            reloaded.append(module_path)
+
+        if reloaded:
+            import_registry.invalidate(reloaded)
+            resource_registry.invalidate(reloaded)
+            invalidate_subgraphs()
+
+        return reloaded, errors
+
+    @staticmethod
+    def _is_stale(state: _GraphFile, reloaded: Set[str]) -> bool:
+        """Return whether the job of an unchanged file must be recomposed."""
+
+        if reloaded.intersection(referenced_modules(state.graph_def)):
+            return True
+
+        # Subgraphs may reference reloaded modules as well.
+        return bool(state.subgraph_files) and (
+            bool(reloaded)
+            or any(
+                file_signature(path) != signature for path, signature in state.subgraph_files.items()
+            )
+        )
+
+    def reload(self) -> dagster.Definitions:
+        """
+        Return dagster `Definitions` with a job for every graph definition file.
+
+        Raises `GraphLoadError` reporting every file that failed to load, as
+        function `load_definitions_from_directory`. Files that failed are
+        loaded again on the next call.
+        """
+
+        file_paths = sorted(self.path.glob(self.pattern))
+        removed = [file_path for file_path in self._files if file_path not in file_paths]
+        for file_path in removed:
+            del self._files[file_path]
+
+        reloaded, module_errors = self._reload_modules()
+
+        graph_defs: Dict[Path, GraphDefinition | Exception] = {}
+        fingerprints: Dict[Path, Fingerprint] = {}
+        stale: Set[Path] = set()
+
+        for file_path in file_paths:
+            state = self._files.get(file_path)
+            fingerprint = file_fingerprint(file_path, state.fingerprint if state else None)
+            fingerprints[file_path] = fingerprint
+
+            if state is not None and fingerprint.digest == state.fingerprint.digest:
+                state.fingerprint = fingerprint
+                graph_defs[file_path] = state.graph_def
+                if self._is_stale(state, set(reloaded)):
+                    stale.add(file_path)
+                continue
+
+            try:
+                graph_defs[file_path] = load_graph_def(file_path)
+            except Exception as exc:
+                graph_defs[file_path] = exc
+
+            stale.add(file_path)
+
+        errors: Dict[Path, Exception] = {
+            file_path: result
+            for file_path, result in graph_defs.items()
+            if isinstance(result, Exception)
+        }
+
+        modules = {
+            file_path: referenced_modules(graph_def)
+            for file_path, graph_def in graph_defs.items()
+            if file_path not in errors
+        }
+        import_errors = import_registry.prefetch(
+            (
+                module_path
+                for file_path in stale
+                if file_path in modules
+                for module_path in modules[file_path]
+            ),
+            workers=self.import_workers,
+        )
+        import_errors.update(module_errors)
+        for file_path, module_paths in modules.items():
+            failed = [path for path in module_paths if path in import_errors]
+            if failed:
+                errors[file_path] = import_errors[failed[0]]
+
+        composed: List[Path] = []
+        reused: List[Path] = []
+
+        def compose(file_path: Path, graph_def: GraphDefinition) -> dagster.JobDefinition:
+            if file_path not in stale:
+                reused.append(file_path)
+                return self._files[file_path].job
+
+            job = compose_job(graph_def)
+            subgraph_files: Dict[str, Optional[FileSignature]] = {}
+            for op in graph_def.spec.operations:
+                if op.graph is not None:
+                    subgraph_files.update(load_subgraph(op.graph).files)
+
+            self._files[file_path] = _GraphFile(
+                fingerprint=fingerprints[file_path],
+                graph_def=graph_def,
+                job=job,
+                subgraph_files=subgraph_files,
+            )
+            for module_path in modules[file_path]:
+                source = module_file(module_path)
+                if source is not None and module_path not in self._modules:
+                    self._modules[module_path] = file_fingerprint(source)
+
+            composed.append(file_path)
+            return job
+
+        try:
+            return compose_definitions(graph_defs, errors, compose=compose)
+        finally:
+            # Jobs that could not be recomposed are loaded again on the next call.
+            for file_path in stale.difference(composed):
+                self._files.pop(file_path, None)
+
+            self._info = ReloadInfo(
+                composed=composed, reused=reused, removed=removed, modules=reloaded
+            )
+
+    def info(self) -> ReloadInfo:
+        """Return which files and modules the last reload recomposed, reused or dropped."""
+
+        return self._info
@@ -0,0 +1,138 @@
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import dagster
+
+from .profiling import profile_phase
+from .util import import_object
+
+ResourceKey = Tuple[str, str]
+
+
+def load_resource(
+    function_path: str,
+) -> dagster.ResourceDefinition | dagster.ConfigurableResource:
+    """
+    Return a dynamically loaded dagster resource definition from the given path.
+
+    IO managers are resources as well, defined either by an
+    `IOManagerDefinition` or by a class inheriting from
+    `ConfigurableIOManagerFactory`, like `ConfigurableIOManager`.
+    """
+
+    resource = import_object(function_path)
+    assert isinstance(resource, dagster.ResourceDefinition) or (
+        isinstance(resource, type)
+        and issubclass(
+            resource, (dagster.ConfigurableResource, dagster.ConfigurableIOManagerFactory)
+        )
+    ), (
+        f"Loaded object from `{function_path}` must be of type `ResourceDefinition` or "
+        f"inherit from `ConfigurableResource` or `ConfigurableIOManagerFactory`. Instead its "
+        f"type is `{type(resource)}`."
+    )
+    return resource
+
+
+def instantiate_resource(
+    resource: dagster.ResourceDefinition
+    | type[dagster.ConfigurableResource]
+    | type[dagster.ConfigurableIOManagerFactory],
+    config: Dict[str, Any],
+) -> Any:
+    """
+    Return an instance of a resource loaded by function `load_resource`.
+
+    Configurable resources are instantiated with `config` as keyword
+    arguments, while resource definitions are configured with it. Resource
+    definitions without configuration are called as before, except IO
+    manager definitions which are initialized by dagster for every run.
+    """
+
+    if isinstance(resource, dagster.IOManagerDefinition) and not config:
+        return resource
+
+    if isinstance(resource, dagster.ResourceDefinition):
+        return resource.configured(config) if config else resource()
+
+    return resource(**config)
+
+
+class ResourceRegistry:
+    """
+    Cache of the resources of composed jobs, shared by all jobs of the process.
+
+    Resources are identified by their import path and configuration, so that
+    every job declaring the same resource with the same configuration uses the
+    same instance, for instance a single connection pool of a client.
+    """
+
+    def __init__(self) -> None:
+        self._resources: Dict[ResourceKey, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(import_path: str, config: Dict[str, Any]) -> ResourceKey:
+        """Return the key identifying a resource by import path and configuration."""
+
+        return import_path, json.dumps(config, sort_keys=True, default=repr)
+
+    def get(self, import_path: str, config: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Return the instance of a resource, creating it on first use.
+
+        Arguments
+        ---------
+        import_path : str
+            Path to the resource in `package.module.resource` format, see
+            function `load_resource`.
+
+        config : Optional[Dict[str, Any]]
+            Configuration of the resource, see function `instantiate_resource`.
+
+        Returns
+        -------
+        Any
+            The shared instance of the resource.
+        """
+
+        config = config or {}
+        key = self.key(import_path, config)
+
+        instance = self._resources.get(key)
+        if instance is None:
+            resource = load_resource(import_path)
+
+            with profile_phase("resources", import_path):
+                instance = instantiate_resource(resource, config)
+
+            with self._lock:
+                instance = self._resources.setdefault(key, instance)
+
+        return instance
+
+    def __len__(self) -> int:
+        """Return the number of resource instances."""
+
+        return len(self._resources)
+
+    def invalidate(self, module_paths: Iterable[str]) -> None:
+        """Forget the resources imported from the given modules."""
+
+        paths = set(module_paths)
+        with self._lock:
+            self._resources = {
+                key: instance
+                for key, instance in self._resources.items()
+                if key[0].rpartition(".")[0] not in paths
+            }
+
+    def clear(self) -> None:
+        """Forget all resources, so that they are created again on next use."""
+
+        with self._lock:
+            self._resources.clear()
+
+
+resource_registry = ResourceRegistry()
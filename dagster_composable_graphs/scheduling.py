@@ -0,0 +1,159 @@
+import dataclasses
+import json
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .models import PRIORITY_TAG, Graph
+
+DEFAULT_NODE_COST = 1.0
+
+
+@dataclasses.dataclass(frozen=True)
+class CriticalPath:
+    """
+    Result of the critical path analysis of a graph.
+
+    `remaining` is the cost of the longest path starting at every node,
+    including the node itself, and `path` the nodes of the longest path of the
+    graph. `makespan` is the cost of that path, which is the least wall time of
+    the graph with unlimited parallelism, while `total_cost` is the sum of the
+    costs of all nodes, which is its wall time when nodes run one at a time.
+    """
+
+    costs: Dict[str, float]
+    remaining: Dict[str, float]
+    path: List[str]
+    makespan: float
+    total_cost: float
+
+
+def load_durations(file_path: str | Path, job: Optional[str] = None) -> Dict[str, float]:
+    """
+    Return the median duration of every node from a telemetry sink.
+
+    Only successful steps are considered. The file is written by the telemetry
+    hooks of composed jobs, see function `telemetry_hooks`, and may not exist
+    yet, in which case no durations are returned.
+
+    Arguments
+    ---------
+    file_path : str | Path
+        Path to the JSONL file with telemetry records.
+
+    job : Optional[str]
+        If given, only records of the job with this name are considered.
+
+    Returns
+    -------
+    Dict[str, float]
+        Median duration in seconds, by node name.
+    """
+
+    path = Path(file_path)
+    if not path.exists():
+        return {}
+
+    durations: Dict[str, List[float]] = {}
+    with path.open() as file:
+        for line in file:
+            record = json.loads(line)
+            if (
+                record.get("status") == "success"
+                and record.get("duration") is not None
+                and (job is None or record.get("job") == job)
+            ):
+                durations.setdefault(record["node"], []).append(record["duration"])
+
+    return {node: statistics.median(values) for node, values in durations.items()}
+
+
+def node_costs(graph: Graph, durations: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Return the estimated cost of every node of `graph`.
+
+    The cost of a node is its historical duration in `durations` if known,
+    else its cost hint in `graph.cost_hints`, else `DEFAULT_NODE_COST`. Fused
+    nodes without a historical duration cost as much as all nodes they execute.
+    """
+
+    durations = durations or {}
+
+    def cost(node: str) -> float:
+        return graph.cost_hints.get(node, DEFAULT_NODE_COST)
+
+    return {
+        node: durations.get(node, sum(cost(member) for member in graph.fused.get(node, [node])))
+        for node in graph.nodes
+    }
+
+
+def critical_path(graph: Graph, durations: Optional[Dict[str, float]] = None) -> CriticalPath:
+    """
+    Return the critical path analysis of `graph`.
+
+    Nodes are weighted by function `node_costs`. The longest remaining path of
+    every node is computed in reverse topological order, so the cost of the
+    analysis is linear in the number of nodes and edges.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    durations : Optional[Dict[str, float]]
+        Historical duration of nodes, for instance loaded by function
+        `load_durations`.
+
+    Returns
+    -------
+    CriticalPath
+        The cost of the longest path from every node and the critical path.
+    """
+
+    costs = node_costs(graph, durations)
+    remaining = [0.0] * len(graph.nodes)
+    successor: List[Optional[int]] = [None] * len(graph.nodes)
+
+    for node_id in reversed(graph.order):
+        next_id = max(graph.downstream[node_id], key=lambda dep_id: remaining[dep_id], default=None)
+        successor[node_id] = next_id
+        remaining[node_id] = costs[graph.nodes[node_id]] + (
+            0.0 if next_id is None else remaining[next_id]
+        )
+
+    path = []
+    node_id = max(range(len(graph.nodes)), key=lambda i: remaining[i], default=None)
+    while node_id is not None:
+        path.append(graph.nodes[node_id])
+        node_id = successor[node_id]
+
+    return CriticalPath(
+        costs=costs,
+        remaining={node: remaining[node_id] for node_id, node in enumerate(graph.nodes)},
+        path=path,
+        makespan=max(remaining, default=0.0),
+        total_cost=sum(costs.values()),
+    )
+
+
+def prioritize_graph(graph: Graph, durations: Optional[Dict[str, float]] = None) -> Graph:
+    """
+    Return a copy of `graph` where nodes are prioritized by their longest remaining path.
+
+    Every node is tagged with a dagster priority, so that among the steps
+    ready to run, executors start first those with the longest remaining path
+    according to function `critical_path`. Priorities are the ranks of the
+    remaining path costs, from `0` for the shortest. Nodes with an explicit
+    priority keep it.
+    """
+
+    remaining = critical_path(graph, durations).remaining
+    ranks = {cost: rank for rank, cost in enumerate(sorted(set(remaining.values())))}
+
+    tags = {}
+    for node in graph.nodes:
+        node_tags = graph.tags.get(node, {})
+        tags[node] = {PRIORITY_TAG: str(ranks[remaining[node]]), **node_tags}
+
+    return dataclasses.replace(graph, tags=tags)
@@ -0,0 +1,373 @@
+import dataclasses
+import inspect
+import queue
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+import dagster
+
+from .errors import GraphDefinitionError
+from .fusion import FUSED_NODES_TAG, is_plain_op
+from .index import index_graph
+from .models import (
+    CacheDefinition,
+    CompiledPointer,
+    DependencyDefinition,
+    Graph,
+    InputDefinition,
+)
+
+# Seconds between checks of whether the consumer of a prefetched stream stopped.
+PREFETCH_POLL_INTERVAL = 0.1
+
+
+class StreamInput(NamedTuple):
+    """Argument of a node streamed from the output of another node of its segment."""
+
+    member: int
+    buffer: Optional[int]
+
+
+def prefetch(iterable: Iterable[Any], size: int) -> Iterator[Any]:
+    """
+    Iterate over `iterable` in a background thread, up to `size` items ahead.
+
+    Exceptions raised by `iterable` are raised again to the consumer. When the
+    consumer stops early, the thread stops once the item it is producing is
+    done, and closes `iterable` if it has a `close` method, like generators,
+    so that their cleanup runs in the thread consuming them.
+    """
+
+    items: queue.Queue = queue.Queue(maxsize=size)
+    stopped = threading.Event()
+    done = object()
+
+    def put(item: Any, error: Optional[BaseException] = None) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put((item, error), timeout=PREFETCH_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    close = getattr(iterable, "close", None)
+                    if close is not None:
+                        close()
+
+                    return
+        except Exception as exc:
+            put(done, exc)
+            return
+
+        put(done)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+
+                return
+
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def validate_streamed_input(graph: Graph, node: str, dep: str, consumers: int) -> None:
+    """
+    Validate that `node` may stream the output of `dep`, which has `consumers` consumers.
+
+    Raises `GraphDefinitionError` if `dep` is not an operation, or its output
+    has other consumers or is passed by a selected IO manager.
+    """
+
+    if dep not in graph.operations:
+        raise GraphDefinitionError(
+            f"Input of node `{node}` from `{dep}` is streamed, but only outputs of operations "
+            "can be streamed."
+        )
+
+    if consumers != 1:
+        raise GraphDefinitionError(
+            f"Output of node `{dep}` is streamed to `{node}` and cannot have other consumers."
+        )
+
+    if dep in graph.io_managers:
+        raise GraphDefinitionError(
+            f"Output of node `{dep}` is streamed to `{node}` and cannot be passed by an IO manager."
+        )
+
+
+def validate_segment_member(graph: Graph, node: str, last: bool, cached: bool = False) -> None:
+    """
+    Validate that `node` may be part of a streaming segment, as its `last` node or not.
+
+    Raises `GraphDefinitionError` if the node is `cached`, since streamed
+    chunks are never stored, if the operation of `node` is not a plain op, see
+    function `is_plain_op`, maps over or collects a dynamic output, or yields
+    chunks while being the last node of the segment.
+    """
+
+    if cached:
+        raise GraphDefinitionError(
+            f"Node `{node}` is part of a streaming segment and cannot be memoized."
+        )
+
+    operation = graph.operations[node]
+    if not is_plain_op(operation, generators=True) or (
+        set(graph.input_modes.get(node, {}).values()) - {"stream"}
+    ):
+        raise GraphDefinitionError(
+            f"Node `{node}` cannot be part of a streaming segment: only ops taking inputs alone "
+            "and returning a single output are supported."
+        )
+
+    if last and inspect.isgeneratorfunction(operation.compute_fn.decorated_fn):  # type: ignore[union-attr]
+        raise GraphDefinitionError(
+            f"Node `{node}` ends a streaming segment and must return a value instead of "
+            "yielding chunks."
+        )
+
+
+def find_streaming_segments(
+    graph: Graph, caches: Optional[Dict[str, CacheDefinition]] = None
+) -> List[List[int]]:
+    """
+    Return the segments of nodes linked by streamed inputs in `graph`.
+
+    A node streaming an input receives an iterator over the chunks returned or
+    yielded by the node it depends on, which must have no other consumer,
+    since chunks are only produced once. Nodes of a segment are plain ops,
+    which may yield chunks, except the last node of the segment, which
+    consumes its streamed inputs and returns a value. See functions
+    `validate_streamed_input` and `validate_segment_member` for the errors
+    raised when a segment is not valid.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    caches : Optional[Dict[str, CacheDefinition]]
+        Cache definitions of memoized operations, by node name.
+
+    Returns
+    -------
+    List[List[int]]
+        Node ids of every segment, in topological order, ending with the node
+        returning a value.
+    """
+
+    consumers: Dict[str, int] = {}
+    for node_deps in graph.dependencies.values():
+        for dep, _ in node_deps:
+            consumers[dep] = consumers.get(dep, 0) + 1
+
+    producers: Dict[str, List[str]] = {}
+    for node, modes in graph.input_modes.items():
+        for position in (position for position, mode in modes.items() if mode == "stream"):
+            dep = graph.dependencies[node][position][0]
+            validate_streamed_input(graph, node, dep, consumers[dep])
+            producers.setdefault(node, []).append(dep)
+
+    streamed = {dep for deps in producers.values() for dep in deps}
+    for node in sorted(streamed | set(producers), key=graph.node_ids.__getitem__):
+        validate_segment_member(
+            graph, node, last=node not in streamed, cached=node in (caches or {})
+        )
+
+    segments = []
+    for node_id in graph.order:
+        node = graph.nodes[node_id]
+        if node not in producers or node in streamed:
+            continue
+
+        segment = set()
+        pending = [node]
+        while pending:
+            member = pending.pop()
+            segment.add(graph.node_ids[member])
+            pending.extend(producers.get(member, []))
+
+        segments.append([member_id for member_id in graph.order if member_id in segment])
+
+    return segments
+
+
+def streaming_op_builder(
+    name: str,
+    members: List[Tuple[str, dagster.OpDefinition, List[int | StreamInput]]],
+    input_types: List[dagster.DagsterType],
+) -> dagster.OpDefinition:
+    """
+    Define a dagster op that runs a streaming segment as a generator pipeline.
+
+    Arguments
+    ---------
+    name : str
+        Name of the created dagster op.
+
+    members : List[Tuple[str, dagster.OpDefinition, List[int | StreamInput]]]
+        Node name, op and argument sources of every node in the segment, in
+        topological order. An argument source is the index of an input of the
+        created op, or a `StreamInput` referencing the member streaming it.
+
+    input_types : List[dagster.DagsterType]
+        Types of the inputs of the created op.
+
+    Returns
+    -------
+    dagster.OpDefinition
+        The generated dagster `OpDefinition`.
+    """
+
+    input_names = [f"input_{index}" for index in range(len(input_types))]
+    steps = [(op_def.compute_fn.decorated_fn, sources) for _, op_def, sources in members]
+    node_names = [node for node, _, _ in members]
+
+    def argument(source: int | StreamInput, inputs: Mapping[str, Any], values: List[Any]) -> Any:
+        if not isinstance(source, StreamInput):
+            return inputs[input_names[source]]
+
+        stream = iter(values[source.member])
+        return stream if source.buffer is None else prefetch(stream, source.buffer)
+
+    def compute_fn(
+        _context: dagster.OpExecutionContext, inputs: Mapping[str, Any]
+    ) -> Iterator[dagster.Output]:
+        # Calling generator functions only creates the generators, so that
+        # chunks are pulled through the pipeline by the last node.
+        values: List[Any] = []
+        for fn, sources in steps:
+            values.append(fn(*(argument(source, inputs, values) for source in sources)))
+
+        yield dagster.Output(values[-1])
+
+    tail = members[-1][1]
+    return dagster.OpDefinition(
+        compute_fn=compute_fn,
+        name=name,
+        ins={
+            input_name: dagster.In(dagster_type=input_type)
+            for input_name, input_type in zip(input_names, input_types)
+        },
+        outs={"result": dagster.Out(dagster_type=tail.output_defs[0].dagster_type)},
+        description=f"Streamed nodes {', '.join(node_names)}.",
+        tags={FUSED_NODES_TAG: ",".join(node_names)},
+    )
+
+
+def fuse_streaming_segments(
+    graph: Graph,
+    dependency_defs: List[DependencyDefinition],
+    caches: Optional[Dict[str, CacheDefinition]] = None,
+) -> Graph:
+    """
+    Return a copy of `graph` where every streaming segment runs as a single op.
+
+    Segments are found by function `find_streaming_segments`. Like linear
+    chains fused by function `fuse_linear_chains`, every segment is replaced
+    by a single op named after its last node, recorded in `graph.fused`. The
+    op passes streamed outputs as iterators between the functions of the
+    segment, so that chunks flow through the segment one at a time and are
+    never stored: peak memory depends on the size of chunks rather than that
+    of the stream, and the last node receives the first chunks as soon as they
+    are produced. Streamed inputs with a `buffer` are prefetched in a
+    background thread, see function `prefetch`. Tags and cost hints of the
+    nodes of a segment apply to the op. The graph is returned unchanged if no
+    input is streamed.
+
+    Arguments
+    ---------
+    graph : Graph
+        Processed graph, typically created by function `create_graph_from_def`.
+
+    dependency_defs : List[DependencyDefinition]
+        Definitions of the dependencies of the graph, with the buffer sizes of
+        streamed inputs.
+
+    caches : Optional[Dict[str, CacheDefinition]]
+        Cache definitions of memoized operations, by node name. Nodes of
+        streaming segments cannot be memoized.
+
+    Returns
+    -------
+    Graph
+        The graph with fused streaming segments.
+    """
+
+    segments = find_streaming_segments(graph, caches)
+    if not segments:
+        return graph
+
+    buffers = {
+        (dep.name, position): input_def.buffer
+        for dep in dependency_defs
+        for position, input_def in enumerate(dep.inputs)
+        if isinstance(input_def, InputDefinition) and input_def.mode == "stream"
+    }
+
+    operations = dict(graph.operations)
+    dependencies = dict(graph.dependencies)
+    input_modes = dict(graph.input_modes)
+    fused = dict(graph.fused)
+    tags = dict(graph.tags)
+    cost_hints = dict(graph.cost_hints)
+
+    for segment in segments:
+        names = [graph.nodes[node_id] for node_id in segment]
+        members = []
+        segment_deps: List[Tuple[str, CompiledPointer | None]] = []
+        input_types = []
+        segment_tags: Dict[str, str] = {}
+        segment_cost = [cost_hints.pop(node) for node in names if node in cost_hints]
+
+        for node in names:
+            op_def = operations.pop(node)
+            modes = input_modes.pop(node, {})
+            segment_tags |= tags.pop(node, {})
+            sources: List[int | StreamInput] = []
+
+            for arg, (dep, pointer) in enumerate(dependencies.pop(node, [])):
+                if modes.get(arg) == "stream":
+                    sources.append(StreamInput(names.index(dep), buffers.get((node, arg))))
+                    continue
+
+                sources.append(len(segment_deps))
+                segment_deps.append((dep, pointer))
+                input_types.append(op_def.input_defs[arg].dagster_type)
+
+            members.append((node, op_def, sources))
+
+        operations[names[-1]] = streaming_op_builder(f"streamed_{names[-1]}", members, input_types)
+        dependencies[names[-1]] = segment_deps
+        fused[names[-1]] = names
+        if segment_tags:
+            tags[names[-1]] = segment_tags
+
+        if segment_cost:
+            cost_hints[names[-1]] = sum(segment_cost)
+
+    return index_graph(
+        dataclasses.replace(
+            graph,
+            operations=operations,
+            dependencies=dependencies,
+            input_modes=input_modes,
+            fused=fused,
+            tags=tags,
+            cost_hints=cost_hints,
+        )
+    )
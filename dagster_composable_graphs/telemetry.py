@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+import dagster
+
+from .io_managers import estimate_size
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Module `resource` is not available on Windows.
+    resource = None
+
+# Number of step start events read at once, latest first, to find that of a step.
+STEP_START_PAGE_SIZE = 16
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Return the peak resident set size of the current process in bytes.
+
+    Returns `None` on platforms where it is not available.
+    """
+
+    if resource is None:  # pragma: no cover
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports the peak in kibibytes and macOS in bytes.
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def step_start_time(context: dagster.HookContext) -> Optional[float]:
+    """
+    Return the timestamp of the start event of the step `context` refers to.
+
+    Start events of the run are read latest first, so that the event of a step
+    that just ended is found in the first page, instead of reading every event
+    of the run after each step. Returns `None` if the step has no start event.
+    """
+
+    cursor = None
+    while True:
+        connection = context.instance.get_records_for_run(
+            context.run_id,
+            cursor=cursor,
+            of_type=dagster.DagsterEventType.STEP_START,
+            limit=STEP_START_PAGE_SIZE,
+            ascending=False,
+        )
+        for record in connection.records:
+            if record.event_log_entry.step_key == context.step_key:
+                return record.event_log_entry.timestamp
+
+        if not connection.has_more:
+            return None
+
+        cursor = connection.cursor
+
+
+def node_telemetry(context: dagster.HookContext, status: str) -> Dict[str, Any]:
+    """
+    Return the runtime figures of the step `context` refers to.
+
+    The duration runs from the start event of the step, see function
+    `step_start_time`, to the call of the hook. The peak resident set size is
+    process-wide: it is that of the process executing the step since it
+    started, so with an in-process executor it covers every step run so far
+    and does not measure the node. The output size is estimated by function
+    `estimate_size`.
+
+    Arguments
+    ---------
+    context : dagster.HookContext
+        Context of a hook triggered by the step.
+
+    status : str
+        Whether the step succeeded or failed.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Job name, run id, node name, step key and status of the step, with its
+        `duration` in seconds, the `process_peak_rss` of the process and the
+        `output_size` of the step in bytes.
+    """
+
+    timestamp = time.time()
+    start_time = step_start_time(context)
+
+    return {
+        "job": context.job_name,
+        "run_id": context.run_id,
+        "node": context.op.name,
+        "step_key": context.step_key,
+        "status": status,
+        "timestamp": timestamp,
+        "duration": None if start_time is None else timestamp - start_time,
+        "process_peak_rss": peak_rss(),
+        "output_size": sum(estimate_size(value) for value in context.op_output_values.values()),
+    }
+
+
+def emit_telemetry(
+    context: dagster.HookContext,
+    record: Dict[str, Any],
+    sink: Optional[str],
+    observations: bool,
+) -> None:
+    """
+    Emit a telemetry record to the run logs, the JSONL `sink` and as an asset observation.
+
+    Every record is written to the sink with a single append, so several step
+    processes may share a sink. Asset observations are reported for asset key
+    `[job, node]`, only if `observations` is set.
+    """
+
+    context.log.info(
+        f"Telemetry of node `{record['node']}`: duration {record['duration']} s, "
+        f"process peak RSS {record['process_peak_rss']} bytes, "
+        f"output size {record['output_size']} bytes."
+    )
+
+    if sink is not None:
+        Path(sink).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(sink, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(record) + "\n").encode())
+        finally:
+            os.close(fd)
+
+    if observations:
+        context.instance.report_runless_asset_event(
+            dagster.AssetObservation(
+                asset_key=dagster.AssetKey([record["job"], record["node"]]),
+                metadata={
+                    key: value
+                    for key, value in record.items()
+                    if key not in {"job", "node"} and value is not None
+                },
+            )
+        )
+
+
+def telemetry_hooks(
+    sink: Optional[str] = None, observations: bool = False
+) -> Set[dagster.HookDefinition]:
+    """
+    Return hooks recording the runtime figures of every step they are attached to.
+
+    Figures are computed by function `node_telemetry` once a step succeeds or
+    fails, and emitted by function `emit_telemetry`.
+
+    Arguments
+    ---------
+    sink : Optional[str]
+        Path to a JSONL file where records are appended.
+
+    observations : bool
+        Whether records are also reported as asset observations.
+
+    Returns
+    -------
+    Set[dagster.HookDefinition]
+        The success and failure hooks.
+    """
+
+    @dagster.success_hook(name="telemetry_success_hook")
+    def success_hook(context: dagster.HookContext) -> None:
+        emit_telemetry(context, node_telemetry(context, "success"), sink, observations)
+
+    @dagster.failure_hook(name="telemetry_failure_hook")
+    def failure_hook(context: dagster.HookContext) -> None:
+        emit_telemetry(context, node_telemetry(context, "failure"), sink, observations)
+
+    return {success_hook, failure_hook}
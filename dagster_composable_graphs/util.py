@@ -1,6 +1,22 @@
-import importlib
+import contextlib
 import re
-from typing import Any, Callable
+import sys
+import threading
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+import dagster
+
+from .imports import import_registry
+
+FileSignature = Tuple[int, int]
+
+# The recursion limit is process-wide, while jobs may be composed in several
+# threads at once. It is restored once the last thread raising it exits.
+_recursion_lock = threading.Lock()
+_recursion_users = 0
+_recursion_previous = 0
 
 
 def to_snake_case(input_string: str) -> str:
@@ -36,7 +52,8 @@ def import_object(function_path: str) -> Callable[..., Any]:
     Return a dynamically loaded function from the given path.
 
     Raises `ImportError` if the module is not found and `AttributeError` if the
-    function is not found.
+    function is not found. Modules and functions are cached by the shared
+    `import_registry`, see class `ImportRegistry`.
 
     Arguments
     ---------
@@ -49,17 +66,59 @@ def import_object(function_path: str) -> Callable[..., Any]:
         The loaded function.
     """
 
-    *module_parts, function_name = function_path.split(".")
-    module_path = ".".join(module_parts)
+    return import_registry.import_object(function_path)
+
+
+@contextlib.contextmanager
+def recursion_limit(limit: int) -> Iterator[None]:
+    """
+    Raise the recursion limit of the interpreter to at least `limit` within the context.
+
+    The limit is never lowered while any thread is within the context, and
+    the limit set before the first of them entered is restored when the last
+    of them exits.
+
+    Arguments
+    ---------
+    limit : int
+        Minimum recursion limit within the context.
+    """
+
+    global _recursion_users, _recursion_previous  # noqa: PLW0603
+
+    with _recursion_lock:
+        if _recursion_users == 0:
+            _recursion_previous = sys.getrecursionlimit()
+
+        _recursion_users += 1
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), limit))
 
     try:
-        module = importlib.import_module(module_path)
-        return getattr(module, function_name)
+        yield
+
+    finally:
+        with _recursion_lock:
+            _recursion_users -= 1
+            if _recursion_users == 0:
+                sys.setrecursionlimit(_recursion_previous)
+
 
-    except ImportError as exc:
-        raise ImportError(f"Could not import module '{module_path}'") from exc
+def op_code_version(op_def: dagster.OpDefinition) -> Optional[str]:
+    """Return the `code_version` of a dagster op, or `None` if it does not define one."""
+
+    with warnings.catch_warnings():
+        # Dagster exposes the code version of an op only through deprecated
+        # property `version`.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return op_def.version
+
+
+def file_signature(file_path: str | Path) -> Optional[FileSignature]:
+    """Return the modification time and size of a file, or `None` if it does not exist."""
+
+    try:
+        stat = Path(file_path).stat()
+    except FileNotFoundError:
+        return None
 
-    except AttributeError as exc:
-        raise AttributeError(
-            f"Function '{function_name}' not found in module '{module_path}'"
-        ) from exc
+    return stat.st_mtime_ns, stat.st_size
@@ -24,12 +24,15 @@ export default defineConfig({
             },
           ],
         },
-        // {
-        //   label: "Reference",
-        //   autogenerate: {
-        //     directory: "reference",
-        //   },
-        // },
+        {
+          label: "Reference",
+          items: [
+            {
+              label: "Graph Specification",
+              link: "/reference/spec",
+            },
+          ],
+        },
       ],
       pagination: false,
       expressiveCode: {
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Iterator
+from typing import Any, Dict, Iterator, List
 
 import dagster
 
@@ -17,6 +17,20 @@ def multiply(x: Any, y: Any) -> Any:
     return x * y
 
 
+@dagster.op()
+def multiply_output(x: Any, y: Any) -> dagster.Output[Any]:
+    """Multiply two values, returning the product with metadata."""
+
+    return dagster.Output(x * y, metadata={"operation": "multiply"})
+
+
+@dagster.op()
+def multiply_unannotated(x, y):
+    """Multiply two values, returning the product with metadata without annotations."""
+
+    return dagster.Output(x * y, metadata={"operation": "multiply"})
+
+
 @dagster.op(out={"out0": dagster.Out(int), "out1": dagster.Out(int)})
 def return_multiple() -> Iterator[dagster.Output]:
     """Return multiple outputs."""
@@ -38,8 +52,113 @@ class TestResource(dagster.ConfigurableResource):
     attr: int = 3
 
 
+@dagster.resource(config_schema={"value": int})
+def configured_value(context: dagster.InitResourceContext) -> int:
+    """Return the configured value."""
+
+    return context.resource_config["value"]
+
+
+@dagster.op(required_resource_keys={"value"})
+def op_that_uses_configured_value(context: dagster.OpExecutionContext) -> int:
+    """Return the configured value of resource `value`."""
+
+    return context.resources.value
+
+
 @dagster.op()
 def op_that_uses_resource(test_resource: TestResource) -> int:
     """Return the attribute of the resource."""
 
     return test_resource.attr
+
+
+@dagster.op(out={})
+def return_nothing():
+    """Return no outputs."""
+
+
+@dagster.op()
+def add(x: Any, y: Any) -> Any:
+    """Add two values."""
+
+    return x + y
+
+
+@dagster.graph()
+def multiply_graph(x: Any, y: Any) -> Any:
+    """Multiply two values within a graph."""
+
+    return multiply(x, y)
+
+
+@dagster.op(out=dagster.DynamicOut(int))
+def emit_range(n: int) -> Iterator[dagster.DynamicOutput]:
+    """Return numbers from `0` to `n - 1` as a dynamic output."""
+
+    for i in range(n):
+        yield dagster.DynamicOutput(i, mapping_key=str(i))
+
+
+@dagster.op()
+def sum_values(values: List[Any]) -> Any:
+    """Return the sum of the provided values."""
+
+    return sum(values)
+
+
+@dagster.op()
+def fail(x: Any) -> Any:
+    """Raise an error."""
+
+    raise ValueError(f"Failed on {x}.")
+
+
+@dagster.op()
+def decode(data: Any) -> str:
+    """Return bytes decoded as UTF-8 text."""
+
+    return bytes(data).decode()
+
+
+@dagster.io_manager
+def value_io_manager() -> dagster.InMemoryIOManager:
+    """Keep outputs in memory."""
+
+    return dagster.InMemoryIOManager()
+
+
+@dagster.op()
+def encode(value: Any) -> bytes:
+    """Return a value as UTF-8 encoded text."""
+
+    return str(value).encode()
+
+
+@dagster.op(code_version="1")
+def versioned_add(x: Any, y: Any) -> Any:
+    """Add two values, with a code version."""
+
+    return x + y
+
+
+@dagster.op()
+def count_up(n: int) -> Iterator[int]:
+    """Yield the integers up to `n`, one chunk at a time."""
+
+    yield from range(n)
+
+
+@dagster.op()
+def scale_chunks(chunks: Any, factor: int) -> Iterator[int]:
+    """Yield every chunk of a stream multiplied by `factor`."""
+
+    for chunk in chunks:
+        yield chunk * factor
+
+
+@dagster.op()
+def take_first(chunks: Any) -> Any:
+    """Return the first chunk of a stream."""
+
+    return next(iter(chunks))
@@ -0,0 +1,206 @@
+from pathlib import Path
+
+import dagster
+import pytest
+
+from dagster_composable_graphs.assets import (
+    compose_assets,
+    input_code_version,
+    input_data_version,
+    materialize_stale,
+    stale_asset_keys,
+)
+from dagster_composable_graphs.compose import load_graph_def_from_yaml
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.file_inputs import FileReference
+from dagster_composable_graphs.models import (
+    FileInputDefinition,
+    OperationDef,
+    ReferenceCountingDefinition,
+    ResourceDefinition,
+)
+
+data_path = Path(__file__).parent / "data"
+
+
+def _key(*path: str) -> dagster.AssetKey:
+    return dagster.AssetKey(["test_assets", *path])
+
+
+def test_compose_assets() -> None:
+    """Tests that graph inputs and the outputs of every node become assets."""
+
+    assets = compose_assets(load_graph_def_from_yaml(data_path / "test_assets.yaml"))
+
+    assert [key for assets_def in assets for key in sorted(assets_def.keys)] == [
+        _key("inputs", "a"),
+        _key("inputs", "b"),
+        _key("inputs", "c"),
+        _key("left"),
+        _key("right"),
+        _key("multiple", "out0"),
+        _key("multiple", "out1"),
+        _key("total"),
+        _key("shifted"),
+        _key("product"),
+    ]
+    assert {
+        group_name for assets_def in assets for group_name in assets_def.group_names_by_key.values()
+    } == {"test_assets"}
+
+    deps = {key: deps for assets_def in assets for key, deps in assets_def.asset_deps.items()}
+
+    assert deps[_key("shifted")] == {_key("multiple", "out1"), _key("inputs", "a")}
+    assert deps[_key("product")] == {_key("total"), _key("inputs", "a")}
+
+    execution = dagster.materialize(assets)
+
+    assert execution.asset_value(_key("product")) == 9  # noqa: PLR2004
+    assert execution.asset_value(_key("shifted")) == 8  # noqa: PLR2004
+
+
+def test_materialize_stale() -> None:
+    """Tests that only assets whose code or upstream data changed are materialized."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_assets.yaml")
+    instance = dagster.DagsterInstance.ephemeral()
+    assets = compose_assets(graph_def)
+
+    assert len(stale_asset_keys(assets, instance)) == 10  # noqa: PLR2004
+    assert materialize_stale(assets, instance).success
+
+    # Assets of ops without a code version, and their consumers, are always stale.
+    unversioned = [
+        _key("multiple", "out0"),
+        _key("multiple", "out1"),
+        _key("shifted"),
+        _key("product"),
+    ]
+    assert stale_asset_keys(assets, instance) == unversioned
+
+    graph_def.spec.inputs["c"] = 4
+    assets = compose_assets(graph_def)
+
+    assert set(stale_asset_keys(assets, instance)) == {
+        _key("inputs", "c"),
+        _key("right"),
+        _key("total"),
+        *unversioned,
+    }
+
+    execution = materialize_stale(assets, instance)
+
+    assert execution.asset_value(_key("product")) == 11  # noqa: PLR2004
+    assert not execution.asset_materializations_for_node("test_assets__left")
+
+    # Only nodes with a code version are kept, so the targets end up up to date.
+    assets = compose_assets(graph_def, targets=["total"])
+
+    assert stale_asset_keys(assets, instance) == []
+    assert materialize_stale(assets, instance) is None
+
+
+def test_input_versions(tmp_path: Path) -> None:
+    """Tests that code versions follow the definition of inputs and data versions their value."""
+
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("a")
+    reference = FileReference(path=str(file_path), format="bytes")
+    version = input_data_version(reference)
+
+    assert input_code_version(1) != input_code_version(2)
+    assert input_code_version(FileInputDefinition(from_file=str(file_path))) == input_code_version(
+        FileInputDefinition(from_file=str(file_path))
+    )
+    assert input_data_version(1) == input_data_version(1)
+    assert input_data_version(reference) == version
+
+    file_path.write_text("ab")
+    assert input_data_version(reference) != version
+
+
+def test_materialize_overridden_inputs() -> None:
+    """Tests that inputs overridden in the run configuration and their consumers are stale."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_assets.yaml")
+    instance = dagster.DagsterInstance.ephemeral()
+    assets = compose_assets(graph_def, targets=["total"])
+    materialize_stale(assets, instance)
+
+    execution = materialize_stale(
+        assets, instance, run_config={"ops": {"test_assets__inputs__c": {"config": 10}}}
+    )
+
+    assert execution.asset_value(_key("total")) == 23  # noqa: PLR2004
+    assert not execution.asset_materializations_for_node("test_assets__left")
+
+    # The input is stale again, since its value in the definition was not materialized last.
+    assert stale_asset_keys(assets, instance) == [_key("inputs", "c"), _key("right"), _key("total")]
+
+    execution = materialize_stale(assets, instance)
+
+    assert execution.asset_value(_key("total")) == 9  # noqa: PLR2004
+    assert stale_asset_keys(assets, instance) == []
+
+
+def test_stale_file_inputs(tmp_path: Path) -> None:
+    """Tests that assets of file inputs are stale once the file is modified."""
+
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("hello")
+    graph_def = load_graph_def_from_yaml(data_path / "test_file_input.yaml")
+    graph_def.spec.inputs["data"] = FileInputDefinition(from_file=str(file_path))
+    instance = dagster.DagsterInstance.ephemeral()
+    assets = compose_assets(graph_def, targets=["decode"])
+    input_key = dagster.AssetKey(["test_file_input", "inputs", "data"])
+
+    materialize_stale(assets, instance)
+
+    assert input_key not in stale_asset_keys(assets, instance)
+
+    file_path.write_text("hello, world")
+    execution = materialize_stale(assets, instance)
+
+    assert execution.asset_materializations_for_node("test_file_input__inputs__data")
+    assert execution.asset_value(dagster.AssetKey(["test_file_input", "decode"])) == "hello, world"
+    assert input_key not in stale_asset_keys(assets, instance)
+
+
+def test_compose_assets_with_dynamic_outputs() -> None:
+    """Tests that dynamic outputs cannot be composed into assets."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_assets.yaml")
+    graph_def.spec.operations.append(
+        OperationDef(name="emit", function="tests.package.graphs.emit_range")
+    )
+
+    with pytest.raises(GraphDefinitionError, match="Node `emit` has dynamic outputs"):
+        compose_assets(graph_def)
+
+
+def test_compose_assets_in_memory() -> None:
+    """Tests that graphs keeping outputs in memory cannot be composed into assets."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_assets.yaml")
+    graph_def.spec.reference_counting = ReferenceCountingDefinition()
+
+    with pytest.raises(GraphDefinitionError, match="Reference counting keeps outputs in memory"):
+        compose_assets(graph_def)
+
+    graph_def.spec.reference_counting = None
+    graph_def.spec.resources = [
+        ResourceDefinition(name="io_manager", import_field="dagster.mem_io_manager")
+    ]
+
+    with pytest.raises(GraphDefinitionError, match="IO manager `io_manager` keeps outputs"):
+        compose_assets(graph_def)
+
+
+def test_compose_assets_with_file_inputs() -> None:
+    """Tests that file inputs are materialized as references and read by their consumers."""
+
+    assets = compose_assets(load_graph_def_from_yaml(data_path / "test_file_input.yaml"))
+
+    execution = dagster.materialize(assets)
+
+    assert execution.asset_value(dagster.AssetKey(["test_file_input", "decode"])) == "hello"
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+
+from dagster_composable_graphs.cache import CacheInfo, CompositionCache, operation_code_versions
+from dagster_composable_graphs.compose import load_graph_def_from_yaml
+from tests.package import graphs
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_cache_hits_and_misses() -> None:
+    """Tests that composed jobs are reused while the graph definition is unchanged."""
+
+    cache = CompositionCache()
+
+    job = cache.load_job(data_path / "test_input.yaml")
+
+    assert cache.load_job(data_path / "test_input.yaml") is job
+    assert cache.info() == CacheInfo(hits=1, misses=1, evictions=0, maxsize=128, currsize=1)
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_input.yaml")
+    job = cache.compose_job(graph_def)
+
+    assert cache.compose_job(graph_def) is job
+    assert cache.compose_job(graph_def.model_copy(deep=True)) is job
+
+    graph_def.spec.inputs["x"] = 6
+    other_job = cache.compose_job(graph_def)
+
+    assert other_job is not job
+    assert other_job.execute_in_process().output_for_node("multiply") == 60  # noqa: PLR2004
+    assert cache.info().hits == 3  # noqa: PLR2004
+    assert cache.info().misses == 3  # noqa: PLR2004
+
+    cache.clear()
+
+    assert cache.info() == CacheInfo(hits=0, misses=0, evictions=0, maxsize=128, currsize=0)
+
+
+def test_cache_relative_paths(tmp_path: Path) -> None:
+    """Tests that identical definition files in different directories are composed apart."""
+
+    cache = CompositionCache()
+    results = []
+
+    for name in ["first", "second"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "test_file_input.txt").write_text(name)
+        (tmp_path / name / "graph.yaml").write_bytes(
+            (data_path / "test_file_input.yaml").read_bytes()
+        )
+
+        job = cache.load_job(tmp_path / name / "graph.yaml")
+        results.append(job.execute_in_process().output_for_node("decode"))
+
+    assert results == ["first", "second"]
+    assert cache.info().currsize == 2  # noqa: PLR2004
+
+
+def test_cache_eviction() -> None:
+    """Tests that the least recently used job is evicted when the cache is full."""
+
+    cache = CompositionCache(maxsize=2)
+
+    first = cache.load_job(data_path / "test_input.yaml")
+    cache.load_job(data_path / "test_single_input.yaml")
+    cache.load_job(data_path / "test_input.yaml")
+    cache.load_job(data_path / "test_graph.yaml")
+
+    assert cache.info().evictions == 1
+    assert cache.info().currsize == 2  # noqa: PLR2004
+    assert cache.load_job(data_path / "test_input.yaml") is first
+    assert cache.load_job(data_path / "test_single_input.yaml") is not None
+    assert cache.info().hits == 2  # noqa: PLR2004
+
+    with pytest.raises(ValueError, match="must be positive"):
+        CompositionCache(maxsize=0)
+
+
+def test_cache_code_versions(mocker) -> None:
+    """Tests that jobs are recompiled when the code version of an operation changes."""
+
+    assert operation_code_versions(
+        ("tests.package.graphs.multiply", "tests.package.graphs.return_multiple_graph")
+    ) == (
+        ("tests.package.graphs.multiply", (None,)),
+        ("tests.package.graphs.return_multiple_graph", (None,)),
+    )
+
+    cache = CompositionCache()
+    job = cache.load_job(data_path / "test_input.yaml")
+
+    mocker.patch.object(graphs.multiply, "_version", "2")
+
+    assert cache.load_job(data_path / "test_input.yaml") is not job
+    assert cache.info().misses == 2  # noqa: PLR2004
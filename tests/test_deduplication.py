@@ -0,0 +1,104 @@
+from pathlib import Path
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.deduplication import (
+    MERGED_NODES_TAG,
+    merge_duplicate_nodes,
+    output_for_node,
+)
+from dagster_composable_graphs.models import CacheDefinition, OperationDef
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_merge_duplicate_nodes() -> None:
+    """Tests that nodes with the same operation and inputs are merged transitively."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_deduplication.yaml")
+
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.merged == {"same_product": "product", "same_square": "square"}
+    assert graph.nodes == ["product", "swapped_product", "square", "total", "tagged_total"]
+    assert graph.dependencies["tagged_total"][0][0] == "square"
+    assert merge_duplicate_nodes(graph) is graph
+
+    graph_def.spec.deduplication = False
+    assert not create_graph_from_def(graph_def).merged
+
+
+def test_merge_nodes_with_cache_or_cost_hint() -> None:
+    """Tests that nodes are only merged if they are memoized and weighted alike."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_deduplication.yaml")
+    graph_def.spec.operations[1].cache = CacheDefinition()
+
+    assert create_graph_from_def(graph_def).merged == {}
+
+    graph_def.spec.operations[0].cache = CacheDefinition()
+
+    assert create_graph_from_def(graph_def).merged == {
+        "same_product": "product",
+        "same_square": "square",
+    }
+
+    graph_def.spec.operations[1].cost_hint = 2
+
+    assert create_graph_from_def(graph_def).merged == {}
+
+
+def test_deduplicated_job() -> None:
+    """Tests that outputs of merged nodes are available under their original names."""
+
+    job = compose_job(load_graph_def_from_yaml(data_path / "test_deduplication.yaml"))
+
+    result = job.execute_in_process()
+
+    assert job.metadata[MERGED_NODES_TAG].value == {
+        "same_product": "product",
+        "same_square": "square",
+    }
+    assert output_for_node(result, "same_square") == 36  # noqa: PLR2004
+    assert output_for_node(result, "tagged_total") == 42  # noqa: PLR2004
+    assert output_for_node(result, "total") == 42  # noqa: PLR2004
+
+    plain_job = compose_job(load_graph_def_from_yaml(data_path / "test_graph.yaml"))
+    plain_result = plain_job.execute_in_process()
+
+    assert MERGED_NODES_TAG not in plain_job.metadata
+    assert output_for_node(plain_result, "return_two") == 2  # noqa: PLR2004
+
+
+def test_merge_nodes_without_inputs() -> None:
+    """Tests that nodes without inputs are only merged if they are memoized."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_deduplication.yaml")
+    graph_def.spec.operations += [
+        OperationDef(name="two", function="tests.package.graphs.return_two"),
+        OperationDef(name="same_two", function="tests.package.graphs.return_two"),
+    ]
+
+    assert "same_two" not in create_graph_from_def(graph_def).merged
+
+    for op in graph_def.spec.operations[-2:]:
+        op.cache = CacheDefinition()
+
+    assert create_graph_from_def(graph_def).merged["same_two"] == "two"
+
+
+def test_merge_keeps_targets() -> None:
+    """Tests that targets are not merged, so that their outputs are read from dagster."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_deduplication.yaml")
+    graph_def.spec.targets = ["same_square", "total"]
+
+    job = compose_job(graph_def)
+    result = job.execute_in_process()
+
+    assert job.metadata[MERGED_NODES_TAG].value == {"same_product": "product"}
+    assert result.output_for_node("same_square") == 36  # noqa: PLR2004
+    assert result.output_for_node("total") == 42  # noqa: PLR2004
@@ -0,0 +1,90 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from dagster_composable_graphs.definitions import load_definitions_from_directory
+from dagster_composable_graphs.errors import GraphLoadError
+
+data_path = Path(__file__).parent / "data"
+
+
+@pytest.mark.parametrize("workers, pool", [(1, "process"), (2, "process"), (2, "thread")])
+def test_load_definitions_from_directory(tmp_path: Path, workers: int, pool: str) -> None:
+    """Tests loading every graph definition in a directory into a single `Definitions`."""
+
+    for name in (
+        "test_executor",
+        "test_graph",
+        "test_input",
+        "test_multiple_outputs",
+        "test_resource",
+        "test_single_input",
+    ):
+        shutil.copy(data_path / f"{name}.yaml", tmp_path)
+
+    defs = load_definitions_from_directory(tmp_path, workers=workers, pool=pool)
+
+    assert sorted(job.name for job in defs.jobs) == [
+        "example_composable_graph",
+        "test_executor",
+        "test_input_data",
+        "test_multiple_ouputs",
+        "test_resource",
+        "test_single_input",
+    ]
+    assert list(defs.resources) == ["test_resource"]
+
+    execution = defs.get_job_def("test_input_data").execute_in_process()
+
+    assert execution.output_for_node("multiply") == 50  # noqa: PLR2004
+
+
+def test_load_definitions_errors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that every failing file is reported together."""
+
+    modules_path = tmp_path / "modules"
+    modules_path.mkdir()
+    (modules_path / "definitions_syntax_error.py").write_text("def multiply(\n")
+    monkeypatch.syspath_prepend(str(modules_path))
+
+    shutil.copy(data_path / "test_resource.yaml", tmp_path / "0_valid.yaml")
+    (tmp_path / "1_invalid.yaml").write_text("metadata: {}\n")
+    (tmp_path / "2_missing_module.yaml").write_text(
+        (data_path / "test_input.yaml").read_text().replace("tests.package", "tests.missing")
+    )
+    (tmp_path / "3_conflict.yaml").write_text(
+        (data_path / "test_resource.yaml")
+        .read_text()
+        .replace("test-resource", "test-conflict")
+        .replace("import: tests.package.graphs.TestResource", "import: dagster.ResourceDefinition")
+    )
+    (tmp_path / "4_cycle.yaml").write_text(
+        (data_path / "test_input.yaml").read_text().replace("[x, y]", "[x, multiply]")
+    )
+    (tmp_path / "5_syntax_error.yaml").write_text(
+        (data_path / "test_input.yaml")
+        .read_text()
+        .replace("tests.package.graphs", "definitions_syntax_error")
+    )
+
+    with pytest.raises(GraphLoadError) as serial_exc:
+        load_definitions_from_directory(tmp_path, workers=1)
+
+    with pytest.raises(GraphLoadError) as exc:
+        load_definitions_from_directory(tmp_path, workers=2, pool="thread")
+
+    assert list(serial_exc.value.errors) == list(exc.value.errors)
+
+    assert [path.name for path in exc.value.errors] == [
+        "1_invalid.yaml",
+        "2_missing_module.yaml",
+        "3_conflict.yaml",
+        "4_cycle.yaml",
+        "5_syntax_error.yaml",
+    ]
+    assert "Failed to load 5 graph definition file(s)" in str(exc.value)
+    assert "Could not import module 'tests.missing.graphs'" in str(exc.value)
+    assert "Resources test_resource are declared with a different import" in str(exc.value)
+    assert "multiply -> multiply" in str(exc.value)
+    assert "Could not import module 'definitions_syntax_error'" in str(exc.value)
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.dynamic import dynamic_output_keys
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.io_managers import count_output_consumers
+from dagster_composable_graphs.models import InputDefinition, ReferenceCountingDefinition
+from tests.package import graphs
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_dynamic_output_keys() -> None:
+    """Tests detection of dynamic outputs."""
+
+    assert dynamic_output_keys(graphs.emit_range) == {"result"}
+    assert dynamic_output_keys(graphs.return_multiple) == set()
+
+
+@pytest.mark.parametrize("reference_counting", [False, True])
+@pytest.mark.parametrize("fusion", [False, True])
+def test_map_and_collect(fusion: bool, reference_counting: bool) -> None:
+    """Tests mapping nodes over dynamic outputs and collecting their results."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_dynamic.yaml")
+    graph_def.spec.fusion = fusion
+    if reference_counting:
+        graph_def.spec.reference_counting = ReferenceCountingDefinition()
+
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.input_modes == {"multiply": {0: "map"}, "add": {0: "map"}, "total": {0: "collect"}}
+    assert not graph.fused
+
+    execution = compose_job(graph_def).execute_in_process()
+
+    assert execution.output_for_node("multiply") == {"0": 0, "1": 10, "2": 20}
+    assert execution.output_for_node("total") == 60  # noqa: PLR2004
+
+
+def test_mapped_consumer_counts() -> None:
+    """Tests that values passed to mapped nodes are not reference counted."""
+
+    graph = create_graph_from_def(load_graph_def_from_yaml(data_path / "test_dynamic.yaml"))
+
+    assert count_output_consumers(graph) == {
+        ("inputs", "n"): 1,
+        ("emit_range", "result"): 1,
+        ("multiply", "result"): 1,
+        ("add", "result"): 1,
+        ("total", "result"): 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "node, position, input_def, match",
+    [
+        (
+            "total",
+            0,
+            InputDefinition(node="add"),
+            "from dynamic output `result` of `add` must be mapped or collected",
+        ),
+        ("emit_range", 0, InputDefinition(node="n", mode="map"), "uses mode `map`"),
+        ("add", 1, InputDefinition(node="multiply", mode="map"), "mapped over a single input"),
+        (
+            "multiply",
+            1,
+            InputDefinition(node="y", mode="collect"),
+            "from `y` uses mode `collect`, but it is not a dynamic output",
+        ),
+    ],
+)
+def test_invalid_input_modes(
+    node: str, position: int, input_def: InputDefinition, match: str
+) -> None:
+    """Tests that dynamic outputs must be mapped or collected, and nothing else."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_dynamic.yaml")
+    dependency = next(dep for dep in graph_def.spec.dependencies if dep.name == node)
+    dependency.inputs[position] = input_def
+
+    with pytest.raises(GraphDefinitionError, match=match):
+        create_graph_from_def(graph_def)
@@ -0,0 +1,173 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.file_inputs import (
+    FILE_INPUT_IO_MANAGER_KEY,
+    FileReference,
+    load_bytes,
+)
+from dagster_composable_graphs.models import (
+    CacheDefinition,
+    FileInputDefinition,
+    GraphSpec,
+    ResourceDefinition,
+)
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_file_input_definition() -> None:
+    """Tests that only mappings with a file path are file inputs and formats are inferred."""
+
+    inputs = GraphSpec.model_validate(
+        {"inputs": {"a": {"fromFile": "a.npy"}, "b": {"fromFile": "b", "x": 1}}}
+    ).inputs
+
+    assert inputs["a"] == FileInputDefinition(from_file="a.npy")
+    assert inputs["a"].file_format() == "npy"
+    assert inputs["b"] == {"fromFile": "b", "x": 1}
+    assert FileInputDefinition(from_file="table.parquet").file_format() == "parquet"
+    assert FileInputDefinition(from_file="data.bin").file_format() == "bytes"
+
+
+def test_file_input_job(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that file inputs are passed by reference and read memory-mapped."""
+
+    # Relative paths of input files are resolved from the directory of the definition.
+    monkeypatch.chdir(tmp_path)
+    job = compose_job(load_graph_def_from_yaml(data_path / "test_file_input.yaml"))
+
+    assert FILE_INPUT_IO_MANAGER_KEY in job.resource_defs
+
+    # The run configuration only holds the path of the file.
+    config = job.run_config_schema.config_type.fields["ops"].config_type.fields["inputs"]
+    assert {
+        name: field.default_value
+        for name, field in config.config_type.fields["config"].config_type.fields.items()
+    } == {
+        "data": str(data_path / "test_file_input.txt"),
+        "words": str(data_path / "test_file_input.txt"),
+    }
+
+    execution = job.execute_in_process(
+        run_config={
+            "resources": {FILE_INPUT_IO_MANAGER_KEY: {"config": {"base_dir": str(tmp_path)}}}
+        }
+    )
+
+    assert execution.output_for_node("decode") == "hello"
+    assert execution.output_for_node("decode_words") == "hello"
+    assert len(list(tmp_path.rglob("*.json"))) == 2  # noqa: PLR2004
+
+    other_path = tmp_path / "other.txt"
+    other_path.write_text("other")
+    execution = job.execute_in_process(
+        run_config={"ops": {"inputs": {"config": {"words": str(other_path)}}}}
+    )
+
+    assert execution.output_for_node("decode") == "hello"
+    assert execution.output_for_node("decode_words") == "other"
+
+    execution = job.execute_in_process(
+        run_config={"ops": {"inputs": {"config": {"data": str(tmp_path / "missing.txt")}}}},
+        raise_on_error=False,
+    )
+
+    assert not execution.success
+
+
+def test_file_input_io_manager_override() -> None:
+    """Tests that a graph may declare its own IO manager for file inputs."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_file_input.yaml")
+    graph_def.spec.resources = [
+        ResourceDefinition(
+            name=FILE_INPUT_IO_MANAGER_KEY, import_field="tests.package.graphs.value_io_manager"
+        )
+    ]
+
+    execution = compose_job(graph_def).execute_in_process(raise_on_error=False)
+
+    reference = FileReference(path=str(data_path / "test_file_input.txt"), format="bytes")
+
+    # Consumers receive the reference itself instead of the content of the file.
+    assert execution.output_for_node("inputs", "data") == reference
+    assert not execution.success
+
+
+def test_file_input_lineage(tmp_path: Path) -> None:
+    """Tests that memoized results are keyed by the modification time and size of input files."""
+
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("hello")
+    graph_def = load_graph_def_from_yaml(data_path / "test_file_input.yaml")
+    graph_def.spec.inputs["data"] = FileInputDefinition(from_file=str(file_path))
+    graph_def.spec.operations[0].cache = CacheDefinition(key="lineage", location=str(tmp_path))
+    job = compose_job(graph_def, targets=["decode"])
+
+    assert job.execute_in_process().output_for_node("decode") == "hello"
+
+    file_path.write_text("hello, world")
+
+    assert job.execute_in_process().output_for_node("decode") == "hello, world"
+
+
+def test_load_bytes(tmp_path: Path) -> None:
+    """Tests that files are memory-mapped, except empty files which cannot be."""
+
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(b"\x00\x01")
+
+    assert load_bytes(str(file_path)).tolist() == [0, 1]
+
+    file_path.write_bytes(b"")
+    assert load_bytes(str(file_path)).tobytes() == b""
+
+
+def test_load_npy(tmp_path: Path) -> None:
+    """Tests that NumPy arrays are memory-mapped from `.npy` files."""
+
+    numpy = pytest.importorskip("numpy")
+    file_path = tmp_path / "data.npy"
+    numpy.save(file_path, numpy.arange(3))
+
+    array = FileReference(path=str(file_path), format="npy").load()
+
+    assert isinstance(array, numpy.memmap)
+    assert array.tolist() == [0, 1, 2]
+    assert not array.flags.writeable
+
+
+def test_load_arrow(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that Arrow IPC and Parquet files are read from memory maps."""
+
+    pyarrow = pytest.importorskip("pyarrow")
+    pytest.importorskip("pyarrow.parquet")
+    table = pyarrow.table({"a": list(range(1000))})
+
+    arrow_path = tmp_path / "data.arrow"
+    with pyarrow.OSFile(str(arrow_path), "wb") as sink, pyarrow.ipc.new_file(
+        sink, table.schema
+    ) as writer:
+        writer.write(table)
+
+    memory_map = mocker.spy(pyarrow, "memory_map")
+    allocated = pyarrow.total_allocated_bytes()
+    loaded = FileReference(path=str(arrow_path), format="arrow").load()
+
+    memory_map.assert_called_once_with(str(arrow_path))
+    assert pyarrow.total_allocated_bytes() == allocated
+    assert loaded.equals(table)
+
+    parquet_path = tmp_path / "data.parquet"
+    pyarrow.parquet.write_table(table, parquet_path)
+    read_table = mocker.spy(pyarrow.parquet, "read_table")
+
+    assert FileReference(path=str(parquet_path), format="parquet").load().equals(table)
+    read_table.assert_called_once_with(str(parquet_path), memory_map=True)
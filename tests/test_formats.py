@@ -0,0 +1,141 @@
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from dagster_composable_graphs.compose import compose_job
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.formats import (
+    BINARY_MAGIC,
+    dump_graph_def,
+    load_graph_def,
+    load_graph_def_from_yaml,
+    schema_version,
+)
+from dagster_composable_graphs.models import GraphDefinition
+
+data_path = Path(__file__).parent / "data"
+
+
+@pytest.mark.parametrize("suffix", [".yaml", ".yml", ".json", ".cgraph"])
+def test_round_trip(tmp_path: Path, suffix: str) -> None:
+    """Tests that graph definitions are loaded unchanged from every format."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_multiple_outputs.yaml")
+    file_path = tmp_path / f"graph{suffix}"
+
+    dump_graph_def(graph_def, file_path)
+    loaded = load_graph_def(file_path)
+
+    assert loaded == graph_def
+    assert compose_job(loaded).execute_in_process().success
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+def test_text_formats_include_kind(tmp_path: Path) -> None:
+    """Tests that text formats are written like hand-written graph definitions."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_graph.yaml")
+
+    dump_graph_def(graph_def, tmp_path / "graph.yaml")
+
+    assert (
+        (tmp_path / "graph.yaml")
+        .read_text()
+        .startswith("apiVersion: truevoid.dev/v1alpha1\nkind: ComposableGraph\n")
+    )
+
+
+def test_binary_not_validated(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that binary files written for the current schema are loaded without validation."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_subgraph.yaml")
+    file_path = tmp_path / "graph.cgraph"
+    dump_graph_def(graph_def, file_path)
+
+    model_validate = mocker.spy(GraphDefinition, "model_validate")
+    loaded = load_graph_def(file_path)
+
+    model_validate.assert_not_called()
+    assert loaded == graph_def
+    assert loaded.model_fields_set == graph_def.model_fields_set
+    assert loaded.spec.operations[0].graph == str(data_path / "test_subgraph_inner.yaml")
+
+
+@pytest.mark.parametrize("suffix", [".yaml", ".cgraph"])
+def test_dump_relative_paths(tmp_path: Path, suffix: str) -> None:
+    """Tests that paths are written relative to the dumped file, which can be moved."""
+
+    source = tmp_path / "source"
+    source.mkdir()
+    for name in ["test_file_input.yaml", "test_file_input.txt"]:
+        shutil.copy(data_path / name, source / name)
+
+    graph_def = load_graph_def(source / "test_file_input.yaml")
+    dump_graph_def(graph_def, source / f"graph{suffix}")
+
+    # The loaded definition is left unchanged by dumping it.
+    assert graph_def.spec.inputs["data"].from_file == str(source / "test_file_input.txt")
+
+    target = source.rename(tmp_path / "target")
+    loaded = load_graph_def(target / f"graph{suffix}")
+
+    assert loaded.spec.inputs["data"].from_file == str(target / "test_file_input.txt")
+    assert compose_job(loaded).execute_in_process().output_for_node("decode") == "hello"
+
+
+def test_dump_other_drive(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that paths on another drive than the dumped file are written unchanged."""
+
+    graph_def = load_graph_def(data_path / "test_file_input.yaml")
+    mocker.patch("os.path.relpath", side_effect=ValueError("path is on mount 'D:'"))
+
+    dump_graph_def(graph_def, tmp_path / "graph.cgraph")
+    loaded = load_graph_def(tmp_path / "graph.cgraph")
+
+    assert loaded.spec.inputs["data"].from_file == str(data_path / "test_file_input.txt")
+
+
+def test_binary_errors(tmp_path: Path) -> None:
+    """Tests that binary files of another format or schema are rejected."""
+
+    file_path = tmp_path / "graph.cgraph"
+
+    file_path.write_bytes(b"apiVersion: truevoid.dev/v1alpha1")
+    with pytest.raises(GraphDefinitionError, match="not a binary graph definition"):
+        load_graph_def(file_path)
+
+    file_path.write_bytes(BINARY_MAGIC + b"0" * 16)
+    with pytest.raises(GraphDefinitionError, match="schema version `0000000000000000`"):
+        load_graph_def(file_path)
+
+    file_path.write_bytes(BINARY_MAGIC + schema_version().encode() + pickle.dumps({}))
+    with pytest.raises(GraphDefinitionError, match="does not contain a graph definition"):
+        load_graph_def(file_path)
+
+
+def test_unsupported_extension(tmp_path: Path) -> None:
+    """Tests that files with an unknown extension are neither loaded nor written."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_graph.yaml")
+
+    with pytest.raises(ValueError, match="unsupported extension `.txt`"):
+        load_graph_def(tmp_path / "graph.txt")
+
+    with pytest.raises(ValueError, match="unsupported extension `.txt`"):
+        dump_graph_def(graph_def, tmp_path / "graph.txt")
+
+
+def test_dump_failure(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that no partial file is left behind when writing fails."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_graph.yaml")
+    mocker.patch.object(os, "replace", side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError, match="disk full"):
+        dump_graph_def(graph_def, tmp_path / "graph.json")
+
+    assert list(tmp_path.iterdir()) == []
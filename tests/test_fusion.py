@@ -0,0 +1,88 @@
+from pathlib import Path
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.fusion import FUSED_NODES_TAG, find_linear_chains, is_plain_op
+from tests.package import graphs
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_is_plain_op() -> None:
+    """Tests detection of ops that can be called as plain functions."""
+
+    assert is_plain_op(graphs.multiply)
+    assert not is_plain_op(graphs.return_multiple)
+    assert not is_plain_op(graphs.return_multiple_graph)
+    assert not is_plain_op(graphs.op_that_uses_resource)
+    assert not is_plain_op(graphs.multiply_output)
+
+
+def test_find_linear_chains() -> None:
+    """Tests that only single-consumer chains of plain ops are found."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_fusion.yaml")
+    graph_def.spec.fusion = False
+    graph = create_graph_from_def(graph_def)
+
+    assert [[graph.nodes[node_id] for node_id in chain] for chain in find_linear_chains(graph)] == [
+        ["add", "multiply", "square"]
+    ]
+
+
+def test_fused_job() -> None:
+    """Tests that fused chains run as a single step with the same results."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_fusion.yaml")
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.nodes == ["return_two", "use_resource", "add_resource", "total", "square"]
+    assert graph.fused == {"square": ["add", "multiply", "square"]}
+
+    job = compose_job(graph_def)
+    execution = job.execute_in_process()
+
+    assert execution.output_for_node("square") == 400  # noqa: PLR2004
+    assert execution.output_for_node("total") == 405  # noqa: PLR2004
+    assert job.graph.node_named("square").definition.tags[FUSED_NODES_TAG] == "add,multiply,square"
+    assert job.metadata[FUSED_NODES_TAG].value == {"square": ["add", "multiply", "square"]}
+
+    graph_def.spec.fusion = False
+    execution = compose_job(graph_def).execute_in_process()
+
+    assert execution.output_for_node("square") == 400  # noqa: PLR2004
+    assert execution.output_for_node("total") == 405  # noqa: PLR2004
+
+
+def test_fused_job_targets() -> None:
+    """Tests that targets are not fused into the nodes consuming them."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_fusion.yaml")
+    graph_def.spec.targets = ["multiply", "total"]
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.fused == {"multiply": ["add", "multiply"]}
+
+    execution = compose_job(graph_def).execute_in_process()
+
+    assert execution.output_for_node("multiply") == 20  # noqa: PLR2004
+    assert execution.output_for_node("total") == 405  # noqa: PLR2004
+
+
+def test_fused_outputs() -> None:
+    """Tests that values returned wrapped in outputs are unwrapped between fused nodes."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_fusion.yaml")
+    graph_def.spec.operations[2].function = "tests.package.graphs.multiply_unannotated"
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.fused == {"square": ["add", "multiply", "square"]}
+    assert compose_job(graph_def).execute_in_process().output_for_node("square") == 400  # noqa: PLR2004
+
+    graph_def.spec.operations[2].function = "tests.package.graphs.multiply_output"
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.fused == {}
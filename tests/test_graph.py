@@ -1,6 +1,15 @@
+import sys
 from pathlib import Path
 
-from dagster_composable_graphs.compose import compose_job, load_graph_def_from_yaml
+import pytest
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.errors import CyclicDependencyError, GraphDefinitionError
+from dagster_composable_graphs.models import DependencyDefinition, GraphDefinition
 
 data_path = Path(__file__).parent / "data"
 
@@ -65,3 +74,119 @@ def test_job_with_executor() -> None:
 
     assert execution.output_for_node("multiply") == 9  # noqa: PLR2004
     assert job.executor_def.name == "multiprocess"
+
+
+def _chain_graph_def(length: int) -> GraphDefinition:
+    """Return the definition of a graph multiplying input `x` along a chain of nodes."""
+
+    return GraphDefinition.model_validate(
+        {
+            "metadata": {"name": f"chain-{length}"},
+            "spec": {
+                "inputs": {"x": 1},
+                "operations": [
+                    {"name": "node_0", "function": "tests.package.graphs.return_two"},
+                    *(
+                        {"name": f"node_{i}", "function": "tests.package.graphs.multiply"}
+                        for i in range(1, length)
+                    ),
+                ],
+                "dependencies": [
+                    {"name": f"node_{i}", "inputs": [f"node_{i - 1}", "x"]} for i in range(1, length)
+                ],
+            },
+        }
+    )
+
+
+def test_deep_dependency_chain() -> None:
+    """Tests that chains deeper than the recursion limit can be composed."""
+
+    length = sys.getrecursionlimit() + 500
+    graph = create_graph_from_def(_chain_graph_def(length))
+
+    assert graph.order == list(range(length))
+    assert graph.upstream[1] == [0]
+    assert graph.downstream[0] == [1]
+
+    job = compose_job(_chain_graph_def(length))
+
+    assert len(job.graph.nodes) == length + 1
+
+
+def test_cyclic_dependencies() -> None:
+    """Tests that cycles in the dependencies are reported by name."""
+
+    graph_def = _chain_graph_def(4)
+    graph_def.spec.dependencies.append(DependencyDefinition(name="node_1", inputs=["node_3"]))
+
+    with pytest.raises(CyclicDependencyError, match="node_1 -> node_2 -> node_3 -> node_1") as exc:
+        create_graph_from_def(graph_def)
+
+    assert exc.value.cycle == ["node_1", "node_2", "node_3", "node_1"]
+
+
+def test_unknown_dependencies() -> None:
+    """Tests that references to nodes not in the graph are rejected."""
+
+    graph_def = _chain_graph_def(2)
+    graph_def.spec.dependencies.append(DependencyDefinition(name="node_1", inputs=["missing"]))
+
+    with pytest.raises(GraphDefinitionError, match="`node_1` depends on `missing`"):
+        create_graph_from_def(graph_def)
+
+    graph_def = _chain_graph_def(2)
+    graph_def.spec.dependencies.append(DependencyDefinition(name="missing", inputs=["x"]))
+
+    with pytest.raises(GraphDefinitionError, match="defined for `missing`"):
+        create_graph_from_def(graph_def)
+
+    graph_def = _chain_graph_def(2)
+    graph_def.spec.inputs["node_1"] = 1
+
+    with pytest.raises(GraphDefinitionError, match="`node_1` has the same name as a graph input"):
+        create_graph_from_def(graph_def)
+
+
+def test_dependency_order() -> None:
+    """Tests that nodes are wired after their dependencies regardless of declaration order."""
+
+    graph_def = _chain_graph_def(3)
+    graph_def.spec.operations.reverse()
+    graph_def.spec.dependencies.append(
+        DependencyDefinition(name="node_2", inputs=["node_1", "node_0"])
+    )
+
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.nodes == ["node_2", "node_1", "node_0"]
+    assert [graph.nodes[node_id] for node_id in graph.order] == ["node_0", "node_1", "node_2"]
+
+    execution = compose_job(graph_def).execute_in_process()
+
+    assert execution.output_for_node("node_2") == 4  # noqa: PLR2004
+
+
+def test_job_with_concurrency_controls() -> None:
+    """Tests that the executor is configured and operations are tagged."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_concurrency.yaml")
+    job = compose_job(graph_def)
+
+    config = job.executor_def.apply_config_mapping({}).value["config"]
+    assert config["max_concurrent"] == 2  # noqa: PLR2004
+    assert config["tag_concurrency_limits"] == [{"key": "resource", "value": "heavy", "limit": 1}]
+
+    # Tagged nodes are not fused with their consumers.
+    assert set(job.graph.node_dict) == {"inputs", "heavy", "light"}
+    assert job.graph.node_named("heavy").tags == {
+        "resource": "heavy",
+        "dagster/priority": "10",
+        "dagster/concurrency_key": "database",
+    }
+    assert not job.graph.node_named("light").tags
+
+    assert job.execute_in_process().output_for_node("light") == 27  # noqa: PLR2004
+
+    pruned = create_graph_from_def(graph_def, targets=["heavy"])
+    assert pruned.tags == {"heavy": job.graph.node_named("heavy").tags}
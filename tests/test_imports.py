@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from dagster_composable_graphs.imports import ImportRegistry
+
+
+@pytest.fixture
+def modules_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Return a directory on the import path, removing modules imported from it afterwards."""
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+
+    for name in [name for name in sys.modules if name.startswith("registry_")]:
+        del sys.modules[name]
+
+
+def test_import_object(modules_path: Path) -> None:
+    """Tests that objects are imported once and failures are remembered."""
+
+    (modules_path / "registry_ok.py").write_text("VALUE = [1]\n")
+    registry = ImportRegistry()
+
+    value = registry.import_object("registry_ok.VALUE")
+
+    assert value == [1]
+    assert registry.import_object("registry_ok.VALUE") is value
+    assert list(registry.timings()) == ["registry_ok"]
+
+    with pytest.raises(AttributeError, match="'MISSING' not found in module 'registry_ok'"):
+        registry.import_object("registry_ok.MISSING")
+
+    with pytest.raises(ImportError, match="Could not import module 'registry_missing'"):
+        registry.import_object("registry_missing.VALUE")
+
+    # The module is not looked up again, even once it exists.
+    (modules_path / "registry_missing.py").write_text("VALUE = 2\n")
+    with pytest.raises(ImportError, match="Could not import module 'registry_missing'") as info:
+        registry.import_object("registry_missing.VALUE")
+
+    assert isinstance(info.value.__cause__, ModuleNotFoundError)
+
+    registry.invalidate(["registry_missing"])
+    assert registry.import_object("registry_missing.VALUE") == 2  # noqa: PLR2004
+    assert set(registry.timings()) == {"registry_ok", "registry_missing"}
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_prefetch(modules_path: Path, workers: int) -> None:
+    """Tests that the distinct modules of a batch are imported and errors collected."""
+
+    for name in ["registry_a", "registry_b"]:
+        (modules_path / f"{name}.py").write_text("VALUE = 1\n")
+    (modules_path / "registry_broken.py").write_text("import registry_nowhere\n")
+    (modules_path / "registry_syntax.py").write_text("VALUE = (\n")
+
+    registry = ImportRegistry()
+    errors = registry.prefetch(
+        [
+            "registry_a",
+            "registry_broken",
+            "registry_b",
+            "registry_a",
+            "registry_nowhere",
+            "registry_syntax",
+        ],
+        workers=workers,
+    )
+
+    assert set(errors) == {"registry_broken", "registry_nowhere", "registry_syntax"}
+    assert str(errors["registry_broken"]) == "Could not import module 'registry_broken'"
+    assert isinstance(errors["registry_syntax"].__cause__, SyntaxError)
+    assert registry.error("registry_a") is None
+    assert set(registry.timings()) == {
+        "registry_a",
+        "registry_b",
+        "registry_broken",
+        "registry_nowhere",
+        "registry_syntax",
+    }
+
+    # Modules imported already are not imported again.
+    assert registry.prefetch(["registry_a", "registry_broken"]) == {
+        "registry_broken": errors["registry_broken"]
+    }
+
+    registry.import_object("registry_a.VALUE")
+    registry.invalidate()
+
+    assert registry.timings() == {}
+    assert registry.error("registry_broken") is None
@@ -0,0 +1,309 @@
+import types
+from pathlib import Path
+from typing import Dict, Optional
+
+import dagster
+import pytest
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.io_managers import (
+    MMAP_IO_MANAGER_KEY,
+    MemoryMappedIOManager,
+    ReferenceCountingIOManager,
+    count_output_consumers,
+    estimate_size,
+    payload_format,
+)
+from dagster_composable_graphs.models import InputDefinition, ResourceDefinition
+
+data_path = Path(__file__).parent / "data"
+
+
+class _Table:
+    """Object reporting its memory usage like a pandas data frame."""
+
+    def __init__(self, usage: object) -> None:
+        self.usage = usage
+
+    def memory_usage(self, deep: bool) -> object:
+        """Return the memory usage."""
+
+        return self.usage
+
+
+class _Usage:
+    """Memory usage per column, like that reported by pandas data frames."""
+
+    def sum(self) -> int:
+        """Return the total memory usage."""
+
+        return 12
+
+
+class _Array:
+    """Object reporting its memory usage like a NumPy array."""
+
+    nbytes = 24
+
+
+def test_estimate_size() -> None:
+    """Tests estimation of the memory used by objects."""
+
+    assert estimate_size(_Table(10)) == 10  # noqa: PLR2004
+    assert estimate_size(_Table(_Usage())) == 12  # noqa: PLR2004
+    assert estimate_size(_Array()) == 24  # noqa: PLR2004
+    assert estimate_size(b"") > 0
+
+
+def test_count_output_consumers() -> None:
+    """Tests counting the consumers of every output of a graph."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_reference_counting.yaml")
+    graph = create_graph_from_def(graph_def)
+
+    assert count_output_consumers(graph) == {
+        ("inputs", "x"): 1,
+        ("return_multiple", "out0"): 1,
+        ("return_multiple", "out1"): 0,
+        ("add", "result"): 2,
+    }
+
+
+def _output_context(step_key: str, name: str = "result") -> dagster.OutputContext:
+    return dagster.build_output_context(step_key=step_key, name=name, run_id="run")
+
+
+def _input_context(step_key: str, name: str = "result") -> dagster.InputContext:
+    return dagster.build_input_context(upstream_output=_output_context(step_key, name))
+
+
+def test_reference_counting_io_manager(tmp_path: Path) -> None:
+    """Tests that outputs are released after their last consumer and spilled above a threshold."""
+
+    io_manager = ReferenceCountingIOManager(
+        {("a", "result"): 2, ("b", "result"): 0, ("c", "result"): 1},
+        spill_threshold=estimate_size(1),
+        spill_directory=str(tmp_path / "spill"),
+    )
+
+    io_manager.handle_output(_output_context("a"), 1)
+    io_manager.handle_output(_output_context("b"), 2)
+    io_manager.handle_output(_output_context("c"), 3)
+    io_manager.handle_output(_output_context("d"), 4)
+
+    assert io_manager.memory == estimate_size(1)
+    assert len(list((tmp_path / "spill").iterdir())) == 2  # noqa: PLR2004
+
+    assert io_manager.load_input(_input_context("a")) == 1
+    assert io_manager.load_input(_input_context("a")) == 1
+    assert io_manager.load_input(_input_context("c")) == 3  # noqa: PLR2004
+    assert io_manager.load_input(_input_context("d")) == 4  # noqa: PLR2004
+    assert io_manager.load_input(_input_context("d")) == 4  # noqa: PLR2004
+
+    assert io_manager.memory == 0
+    assert io_manager.peak_memory == estimate_size(1)
+    assert len(list((tmp_path / "spill").iterdir())) == 1
+
+    with pytest.raises(KeyError):
+        io_manager.load_input(_input_context("a"))
+
+    io_manager.clear()
+
+    assert not list((tmp_path / "spill").iterdir())
+
+
+@pytest.mark.parametrize("spill_threshold", [None, 0])
+def test_job_with_reference_counting(tmp_path: Path, spill_threshold: int | None) -> None:
+    """Tests execution of a job using the reference counting IO manager."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_reference_counting.yaml")
+    graph_def.spec.reference_counting.spill_threshold = spill_threshold
+    graph_def.spec.reference_counting.spill_directory = str(tmp_path)
+
+    job = compose_job(graph_def)
+    execution = job.execute_in_process()
+
+    assert execution.output_for_node("multiply_graph") == 245  # noqa: PLR2004
+    assert job.resource_defs["io_manager"].description == (
+        "Keeps outputs in memory until their last consumer."
+    )
+    assert not list(tmp_path.glob("*.pkl"))
+
+    graph_def.spec.resources.append(
+        ResourceDefinition(name="io_manager", import_field="tests.package.graphs.TestResource")
+    )
+
+    with pytest.raises(GraphDefinitionError, match="`io_manager` cannot be declared"):
+        create_graph_from_def(graph_def)
+
+
+def test_reference_counting_executor() -> None:
+    """Tests that reference counting runs steps in process."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_reference_counting.yaml")
+
+    assert create_graph_from_def(graph_def).executor is dagster.in_process_executor
+
+    graph_def.spec.executor = "dagster.in_process_executor"
+
+    assert create_graph_from_def(graph_def).executor.name == "in_process"
+
+    graph_def.spec.executor = "dagster.multiprocess_executor"
+
+    with pytest.raises(GraphDefinitionError, match="Executor `multiprocess` runs steps"):
+        create_graph_from_def(graph_def)
+
+
+class _NumpyArray:
+    """Object recognized as a NumPy array."""
+
+    __module__ = "numpy"
+
+    def __init__(self, hasobject: bool) -> None:
+        self.dtype = types.SimpleNamespace(hasobject=hasobject)
+
+
+_NumpyArray.__name__ = "ndarray"
+
+
+class _ArrowTable:
+    """Object recognized as an Arrow table."""
+
+    __module__ = "pyarrow.lib"
+
+
+_ArrowTable.__name__ = "Table"
+
+
+def test_payload_format() -> None:
+    """Tests that outputs are stored in a format that can be memory-mapped when possible."""
+
+    assert payload_format(_NumpyArray(hasobject=False)) == "npy"
+    assert payload_format(_NumpyArray(hasobject=True)) == "pickle"
+    assert payload_format(_ArrowTable()) == "arrow"
+    assert payload_format(memoryview(b"a")) == "bytes"
+    assert payload_format({"a": 1}) == "pickle"
+
+
+def test_memory_mapped_io_manager(tmp_path: Path) -> None:
+    """Tests that outputs are written to files loaded by consumers."""
+
+    io_manager = MemoryMappedIOManager(tmp_path)
+    output_context = dagster.build_output_context(step_key="a", name="result", run_id="run")
+
+    io_manager.handle_output(output_context, b"bytes")
+    loaded = io_manager.load_input(dagster.build_input_context(upstream_output=output_context))
+
+    assert isinstance(loaded, memoryview)
+    assert loaded.tobytes() == b"bytes"
+
+    missing_context = dagster.build_output_context(step_key="b", name="result", run_id="run")
+    with pytest.raises(FileNotFoundError, match="No stored output"):
+        io_manager.load_input(dagster.build_input_context(upstream_output=missing_context))
+
+
+def test_memory_mapped_arrays(tmp_path: Path) -> None:
+    """Tests that NumPy arrays and Arrow tables are stored in files loaded memory-mapped."""
+
+    numpy = pytest.importorskip("numpy")
+    pyarrow = pytest.importorskip("pyarrow")
+    io_manager = MemoryMappedIOManager(tmp_path)
+
+    def round_trip(step_key: str, obj: object) -> object:
+        output_context = dagster.build_output_context(step_key=step_key, name="result", run_id="run")
+        io_manager.handle_output(output_context, obj)
+        return io_manager.load_input(dagster.build_input_context(upstream_output=output_context))
+
+    array = round_trip("array", numpy.arange(6).reshape(2, 3))
+
+    assert isinstance(array, numpy.memmap)
+    assert array.tolist() == [[0, 1, 2], [3, 4, 5]]
+
+    batch = pyarrow.record_batch({"a": list(range(1000))})
+    allocated = pyarrow.total_allocated_bytes()
+    table = round_trip("table", batch)
+
+    # Columns are views of the memory-mapped file rather than copies.
+    assert pyarrow.total_allocated_bytes() == allocated
+    assert table.equals(pyarrow.Table.from_batches([batch]))
+
+    (tmp_path / "run" / "other").write_text("kept")
+
+    assert io_manager.clear("run") == 2  # noqa: PLR2004
+    assert [path.name for path in tmp_path.rglob("*")] == ["run", "other"]
+    assert io_manager.clear("missing") == 0
+
+
+def test_job_with_io_manager_selection(tmp_path: Path) -> None:
+    """Tests that operations and inputs select the IO manager passing outputs."""
+
+    job = compose_job(load_graph_def_from_yaml(data_path / "test_io_manager_selection.yaml"))
+
+    def io_manager_key(node: str, output: str = "result") -> str:
+        return job.graph.node_named(node).definition.output_def_named(output).io_manager_key
+
+    assert io_manager_key("product") == MMAP_IO_MANAGER_KEY
+    assert io_manager_key("inputs", "y") == "value_io_manager"
+    assert io_manager_key("inputs", "x") == "io_manager"
+    assert io_manager_key("total") == "io_manager"
+    # Nodes selecting the same IO managers for the same op share a copy of it.
+    assert job.graph.node_named("product").definition.name == "multiply_mmap_io_manager"
+    assert job.graph.node_named("twice").definition is job.graph.node_named("product").definition
+
+    execution = job.execute_in_process(
+        run_config={"resources": {MMAP_IO_MANAGER_KEY: {"config": {"base_dir": str(tmp_path)}}}}
+    )
+
+    assert execution.output_for_node("decoded") == "24"
+    assert sorted(path.name for path in tmp_path.rglob("result.*")) == [
+        "result.bin",
+        "result.pkl",
+        "result.pkl",
+    ]
+
+    # The memory-mapped IO manager is only provided to graphs selecting it.
+    graph_def = load_graph_def_from_yaml(data_path / "test_io_manager_selection.yaml")
+    for op in graph_def.spec.operations:
+        op.io_manager = None
+
+    assert MMAP_IO_MANAGER_KEY not in create_graph_from_def(graph_def).resources
+
+
+@pytest.mark.parametrize(
+    "operations, inputs, match",
+    [
+        ({}, {"total": "value_io_manager"}, "passed by IO managers"),
+        ({"product": "missing"}, {}, "`missing` of node `product` is not a resource"),
+        ({"twice": None}, {"encoded": "missing"}, "`missing` of node `twice` is not a resource"),
+    ],
+)
+def test_io_manager_selection_errors(
+    operations: Dict[str, Optional[str]], inputs: Dict[str, str], match: str
+) -> None:
+    """Tests that IO managers must be resources and selected once per output."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_io_manager_selection.yaml")
+    for op in graph_def.spec.operations:
+        op.io_manager = operations.get(op.name, op.io_manager)
+
+    for dep in graph_def.spec.dependencies:
+        if dep.name in inputs:
+            dep.inputs[0] = InputDefinition(node=dep.inputs[0], io_manager=inputs[dep.name])
+
+    with pytest.raises(GraphDefinitionError, match=match):
+        create_graph_from_def(graph_def)
+
+
+def test_io_manager_selection_of_graph() -> None:
+    """Tests that the outputs of dagster graphs cannot be passed by a selected IO manager."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_io_manager_selection.yaml")
+    graph_def.spec.operations[0].function = "tests.package.graphs.multiply_graph"
+
+    with pytest.raises(GraphDefinitionError, match="Node `product` is a graph"):
+        create_graph_from_def(graph_def)
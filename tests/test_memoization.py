@@ -0,0 +1,206 @@
+import os
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from pytest_mock import MockerFixture
+
+from dagster_composable_graphs import memoization
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.memoization import LocalResultStore, fingerprint
+from dagster_composable_graphs.models import CacheDefinition, GraphDefinition
+
+data_path = Path(__file__).parent / "data"
+
+
+def _load_graph_def(location: Path, **caches: CacheDefinition) -> GraphDefinition:
+    """Load the memoization test graph, storing results in `location`."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_memoization.yaml")
+    for op in graph_def.spec.operations:
+        op.cache = caches.get(op.name, op.cache)
+        if op.cache is not None:
+            op.cache.location = str(location)
+
+    return graph_def
+
+
+def _cache_hits(graph_def: GraphDefinition) -> Dict[str, bool]:
+    """Execute the job composed from `graph_def` and return whether memoized ops hit."""
+
+    execution = compose_job(graph_def).execute_in_process()
+    assert execution.output_for_node("total") == 18  # noqa: PLR2004
+
+    return {
+        event.node_name: event.event_specific_data.metadata["cache_hit"].value
+        for event in execution.all_node_events
+        if event.is_successful_output and "cache_hit" in event.event_specific_data.metadata
+    }
+
+
+def test_fingerprint() -> None:
+    """Tests that fingerprints depend on every value."""
+
+    assert fingerprint(1, "a") == fingerprint(1, "a")
+    assert fingerprint(1, "a") != fingerprint(1, "b")
+
+
+def test_memoize_by_inputs(tmp_path: Path) -> None:
+    """Tests that results are reused while input values are unchanged."""
+
+    graph_def = _load_graph_def(tmp_path)
+
+    assert _cache_hits(graph_def) == {"product": False}
+    assert _cache_hits(graph_def) == {"product": True}
+
+    graph_def.spec.inputs["z"] = 1
+    assert _cache_hits(graph_def) == {"product": True}
+
+    graph_def.spec.inputs["x"] = 3.0
+    assert _cache_hits(graph_def) == {"product": False}
+
+
+def test_memoize_default_location(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that results are stored in a directory per job and node by default."""
+
+    mocker.patch.object(memoization, "DEFAULT_CACHE_LOCATION", tmp_path)
+    graph_def = _load_graph_def(tmp_path)
+    graph_def.spec.operations[0].cache.location = None
+
+    assert _cache_hits(graph_def) == {"product": False}
+    assert [path.parent for path in tmp_path.rglob("*.pkl")] == [
+        tmp_path / "test_memoization" / "product"
+    ]
+
+
+def test_memoize_unpicklable(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that results are not cached when their inputs or value cannot be pickled."""
+
+    # File inputs are passed as memory-mapped views, which cannot be pickled.
+    graph_def = load_graph_def_from_yaml(data_path / "test_file_input.yaml")
+    graph_def.spec.operations[0].cache = CacheDefinition(location=str(tmp_path))
+
+    for _ in range(2):
+        execution = compose_job(graph_def).execute_in_process()
+
+        assert execution.output_for_node("decode") == "hello"
+        assert not list(tmp_path.iterdir())
+
+    graph_def = _load_graph_def(tmp_path)
+    mocker.patch.object(LocalResultStore, "put", side_effect=TypeError("cannot pickle"))
+
+    assert _cache_hits(graph_def) == {"product": False}
+    assert _cache_hits(graph_def) == {"product": False}
+
+
+def test_memoize_by_lineage(tmp_path: Path) -> None:
+    """Tests that results are reused while upstream graph inputs are unchanged."""
+
+    graph_def = _load_graph_def(tmp_path, total=CacheDefinition(key="lineage"))
+
+    assert _cache_hits(graph_def) == {"product": False, "total": False}
+    assert _cache_hits(graph_def) == {"product": True, "total": True}
+
+    graph = create_graph_from_def(graph_def)
+    assert not graph.fused
+
+    graph_def.spec.inputs["z"] = 1
+    assert _cache_hits(graph_def) == {"product": True, "total": True}
+
+    graph_def.spec.inputs["x"] = 3.0
+    assert _cache_hits(graph_def) == {"product": False, "total": False}
+
+
+def test_memoize_by_lineage_overridden_inputs(tmp_path: Path) -> None:
+    """Tests that graph inputs overridden in the run configuration key lineage results."""
+
+    job = compose_job(_load_graph_def(tmp_path, total=CacheDefinition(key="lineage")))
+
+    assert job.execute_in_process().output_for_node("total") == 18  # noqa: PLR2004
+
+    execution = job.execute_in_process(run_config={"ops": {"inputs": {"config": {"x": 100}}}})
+
+    assert execution.output_for_node("product") == 200  # noqa: PLR2004
+    assert execution.output_for_node("total") == 600  # noqa: PLR2004
+
+
+def test_memoize_invalid_operations(tmp_path: Path) -> None:
+    """Tests that only plain ops which are not mapped can be memoized by lineage."""
+
+    graph_def = _load_graph_def(tmp_path, scaled=CacheDefinition())
+    with pytest.raises(GraphDefinitionError, match="`scaled` cannot be memoized"):
+        create_graph_from_def(graph_def)
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_dynamic.yaml")
+    graph_def.spec.operations[1].cache = CacheDefinition(key="lineage")
+    with pytest.raises(GraphDefinitionError, match="`multiply` is mapped"):
+        create_graph_from_def(graph_def)
+
+
+def test_memoize_mapped_operation(tmp_path: Path) -> None:
+    """Tests that mapped ops are memoized by the values of every item."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_dynamic.yaml")
+    graph_def.spec.operations[1].cache = CacheDefinition(location=str(tmp_path))
+
+    for _ in range(2):
+        execution = compose_job(graph_def).execute_in_process()
+        assert execution.output_for_node("total") == 60  # noqa: PLR2004
+
+    assert len(list(tmp_path.glob("*.pkl"))) == 3  # noqa: PLR2004
+
+
+def test_store_expiry(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that stored results expire after their TTL."""
+
+    store = LocalResultStore(tmp_path, ttl=60)
+    time = mocker.patch("time.time", return_value=1000.0)
+
+    assert store.get("key") == (False, None)
+    store.put("key", [1, 2])
+    assert store.get("key") == (True, [1, 2])
+
+    time.return_value = 1061.0
+    assert store.get("key") == (False, None)
+    assert not list(tmp_path.iterdir())
+
+
+def test_store_eviction(tmp_path: Path) -> None:
+    """Tests that least recently used results are evicted above the maximum size."""
+
+    store = LocalResultStore(tmp_path)
+    (tmp_path / "partial.tmp").touch()
+    for key in ["a", "b", "c"]:
+        store.put(key, bytes(1000))
+
+    entry_size = (tmp_path / "a.pkl").stat().st_size
+    for last_use, key in enumerate(["b", "a", "c"]):
+        os.utime(tmp_path / f"{key}.pkl", (last_use, last_use))
+
+    store.max_size = 2 * entry_size
+    assert store.evict() == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.pkl", "c.pkl", "partial.tmp"]
+
+    store.max_size = 0
+    assert store.evict() == 2  # noqa: PLR2004
+
+    store.max_size = entry_size
+    store.put("d", None)
+    store.clear()
+    assert [path.name for path in tmp_path.iterdir()] == ["partial.tmp"]
+
+
+def test_store_failed_write(tmp_path: Path) -> None:
+    """Tests that results failing to be stored leave no files behind."""
+
+    store = LocalResultStore(tmp_path)
+
+    with pytest.raises(AttributeError):
+        store.put("key", lambda: None)
+
+    assert not list(tmp_path.iterdir())
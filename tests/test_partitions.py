@@ -0,0 +1,202 @@
+from pathlib import Path
+from typing import Any, Dict
+
+import dagster
+import pytest
+
+from dagster_composable_graphs.assets import compose_assets, materialize_stale, stale_asset_keys
+from dagster_composable_graphs.compose import compose_job, load_graph_def_from_yaml
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.models import (
+    CacheDefinition,
+    PartitionInputDefinition,
+    PartitionsDefinition,
+)
+from dagster_composable_graphs.partitions import (
+    PARTITION_RANGE_END_TAG,
+    PARTITION_RANGE_START_TAG,
+    backfill_run_requests,
+    build_partitions_def,
+    partition_batches,
+)
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_partitioned_job() -> None:
+    """Tests that partition inputs provide the partition key of the run to the nodes."""
+
+    job = compose_job(load_graph_def_from_yaml(data_path / "test_partitions.yaml"))
+
+    assert job.partitions_def.get_partition_keys() == ["a", "b", "c", "d", "e"]
+
+    # Partition inputs cannot be overridden in the run configuration.
+    config = job.run_config_schema.config_type.fields["ops"].config_type.fields["inputs"]
+    assert list(config.config_type.fields["config"].config_type.fields) == ["prefix"]
+
+    execution = job.execute_in_process(partition_key="b")
+
+    assert execution.output_for_node("label") == "chunk-b"
+
+
+def test_partition_batches() -> None:
+    """Tests that partitions are split into ranges of consecutive partitions."""
+
+    partitions_def = dagster.StaticPartitionsDefinition(["a", "b", "c", "d", "e"])
+
+    assert partition_batches(partitions_def, 2) == [
+        dagster.PartitionKeyRange("a", "b"),
+        dagster.PartitionKeyRange("c", "d"),
+        dagster.PartitionKeyRange("e", "e"),
+    ]
+    assert partition_batches(partitions_def, 3, ["e", "a", "c", "d"]) == [
+        dagster.PartitionKeyRange("a", "a"),
+        dagster.PartitionKeyRange("c", "e"),
+    ]
+
+
+def test_backfill_run_requests() -> None:
+    """Tests that backfills launch runs covering batches of partitions."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_partitions.yaml")
+    graph_def.spec.inputs["chunk"] = PartitionInputDefinition(from_partition="keys")
+    job = compose_job(graph_def)
+    requests = backfill_run_requests(job)
+
+    assert [(request.partition_key, request.tags) for request in requests] == [
+        (None, {PARTITION_RANGE_START_TAG: "a", PARTITION_RANGE_END_TAG: "b"}),
+        (None, {PARTITION_RANGE_START_TAG: "c", PARTITION_RANGE_END_TAG: "d"}),
+        ("e", {}),
+    ]
+    assert [request.partition_key for request in backfill_run_requests(job, ["b"])] == ["b"]
+
+    graph_def.spec.inputs["prefix"] = ["z"]
+    execution = compose_job(graph_def).execute_in_process(tags=requests[1].tags)
+
+    assert execution.output_for_node("label") == ["z", "c", "d"]
+
+    graph_def.spec.partitions = None
+    del graph_def.spec.inputs["chunk"]
+    graph_def.spec.dependencies[0].inputs = ["prefix", "prefix"]
+
+    with pytest.raises(GraphDefinitionError, match="Job `test_partitions` is not partitioned"):
+        backfill_run_requests(compose_job(graph_def))
+
+
+def test_multi_partitions() -> None:
+    """Tests that partition inputs may provide the keys of a single dimension."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_partitions.yaml")
+    graph_def.spec.partitions = PartitionsDefinition.model_validate(
+        {
+            "multi": {
+                "region": {"static": ["eu", "us"]},
+                "date": {"timeWindow": {"start": "2024-01-01", "end": "2024-01-03"}},
+            }
+        }
+    )
+    graph_def.spec.inputs = {
+        "region": PartitionInputDefinition(from_partition="key", dimension="region"),
+        "date": PartitionInputDefinition(from_partition="key", dimension="date"),
+    }
+    graph_def.spec.dependencies[0].inputs = ["region", "date"]
+    job = compose_job(graph_def)
+
+    assert len(job.partitions_def.get_partition_keys()) == 4  # noqa: PLR2004
+
+    execution = job.execute_in_process(
+        partition_key=dagster.MultiPartitionKey({"region": "us", "date": "2024-01-02"})
+    )
+
+    assert execution.output_for_node("label") == "us2024-01-02"
+
+    graph_def.spec.inputs["date"] = PartitionInputDefinition(from_partition="keys", dimension="date")
+    graph_def.spec.inputs["region"] = ["eu"]
+    execution = compose_job(graph_def).execute_in_process(
+        tags={PARTITION_RANGE_START_TAG: "2024-01-01|eu", PARTITION_RANGE_END_TAG: "2024-01-02|eu"}
+    )
+
+    assert execution.output_for_node("label") == ["eu", "2024-01-01", "2024-01-02"]
+
+
+def test_time_window_partitions() -> None:
+    """Tests that time-window partitions follow their cron schedule and format."""
+
+    partitions_def = build_partitions_def(
+        PartitionsDefinition.model_validate(
+            {
+                "timeWindow": {
+                    "start": "2024-01-01-00",
+                    "end": "2024-01-01-03",
+                    "cronSchedule": "0 * * * *",
+                    "fmt": "%Y-%m-%d-%H",
+                }
+            }
+        )
+    )
+
+    assert partitions_def.get_partition_keys() == [
+        "2024-01-01-00",
+        "2024-01-01-01",
+        "2024-01-01-02",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("partitions", "inputs", "message"),
+    [
+        (None, {}, "Input `chunk` reads the partition key, but the graph declares no partitions"),
+        ({"static": ["a"], "multi": {}}, {}, "got `static`, `multi`"),
+        ({}, {}, "got none"),
+        ({"multi": {"x": {"static": ["a"]}}}, {}, "must have two dimensions, got 1"),
+        (
+            {"static": ["a"]},
+            {"chunk": {"fromPartition": "key", "dimension": "x"}},
+            "dimension `x`, which is not a dimension",
+        ),
+    ],
+)
+def test_partitions_errors(
+    partitions: Dict[str, Any] | None, inputs: Dict[str, Any], message: str
+) -> None:
+    """Tests that invalid partitions and partition inputs are reported."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_partitions.yaml")
+    graph_def.spec.partitions = (
+        None if partitions is None else PartitionsDefinition.model_validate(partitions)
+    )
+    graph_def.spec.inputs.update(
+        (name, PartitionInputDefinition.model_validate(value)) for name, value in inputs.items()
+    )
+
+    with pytest.raises(GraphDefinitionError, match=message):
+        compose_job(graph_def)
+
+
+def test_partition_input_lineage(tmp_path: Path) -> None:
+    """Tests that results of nodes memoized by lineage are keyed by the partition of the run."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_partitions.yaml")
+    graph_def.spec.operations[0].cache = CacheDefinition(key="lineage", location=str(tmp_path))
+    job = compose_job(graph_def)
+
+    assert job.execute_in_process(partition_key="a").output_for_node("label") == "chunk-a"
+    assert job.execute_in_process(partition_key="b").output_for_node("label") == "chunk-b"
+    assert len(list(tmp_path.glob("*.pkl"))) == 2  # noqa: PLR2004
+
+
+def test_partitioned_assets() -> None:
+    """Tests that assets share the partitions of the graph and are stale per partition."""
+
+    instance = dagster.DagsterInstance.ephemeral()
+    assets = compose_assets(load_graph_def_from_yaml(data_path / "test_partitions.yaml"))
+
+    assert {assets_def.backfill_policy for assets_def in assets} == {
+        dagster.BackfillPolicy.multi_run(2)
+    }
+
+    execution = materialize_stale(assets, instance, partition_key="b")
+
+    assert execution.asset_value(dagster.AssetKey(["test_partitions", "label"])) == "chunk-b"
+    assert stale_asset_keys(assets, instance, "b") == []
+    assert len(stale_asset_keys(assets, instance, "c")) == 3  # noqa: PLR2004
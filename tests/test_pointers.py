@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+from dagster_composable_graphs.compose import create_graph_from_def, load_graph_def_from_yaml
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.models import CompiledPointer, InputDefinition
+from dagster_composable_graphs.pointers import compile_pointer, output_keys
+from tests.package import graphs
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_compile_pointer() -> None:
+    """Tests parsing of JSON pointers into output keys."""
+
+    assert compile_pointer("/result") == CompiledPointer(pointer="/result", key="result")
+    assert compile_pointer("/a~1b").resolve({"a/b": 1}) == 1
+    assert compile_pointer("/out0") is compile_pointer("/out0")
+
+    with pytest.raises(GraphDefinitionError, match="Pointer `out0` is not valid"):
+        compile_pointer("out0")
+
+    with pytest.raises(GraphDefinitionError, match="must reference a single output"):
+        compile_pointer("/out0/value")
+
+
+def test_output_keys() -> None:
+    """Tests the output keys of ops and graphs."""
+
+    assert output_keys(graphs.multiply) == ["result"]
+    assert output_keys(graphs.return_multiple) == ["out0", "out1"]
+    assert output_keys(graphs.return_multiple_graph) == ["out0", "out1"]
+    assert output_keys(graphs.return_nothing) == []
+
+
+def test_compiled_dependencies() -> None:
+    """Tests that dependencies hold compiled pointers to operations only."""
+
+    graph = create_graph_from_def(load_graph_def_from_yaml(data_path / "test_multiple_outputs.yaml"))
+
+    assert graph.dependencies["multiply"] == [
+        ("return_multiple", compile_pointer("/out0")),
+        ("return_multiple", compile_pointer("/out1")),
+    ]
+
+    graph = create_graph_from_def(load_graph_def_from_yaml(data_path / "test_input.yaml"))
+
+    assert graph.dependencies["multiply"] == [("x", None), ("y", None)]
+
+
+@pytest.mark.parametrize(
+    "pointer, match",
+    [
+        ("/multply", "references output `multply` of node `return_multiple` through pointer"),
+        ("/result", "but `return_multiple` declares outputs `out0`, `out1`"),
+        ("out0", "Input of node `multiply` from `return_multiple`: Pointer `out0` is not valid"),
+    ],
+)
+def test_invalid_pointers(pointer: str, match: str) -> None:
+    """Tests that pointers to undeclared outputs are rejected when creating the graph."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_multiple_outputs.yaml")
+    graph_def.spec.dependencies[0].inputs[1] = InputDefinition(
+        node="return_multiple", pointer=pointer
+    )
+
+    with pytest.raises(GraphDefinitionError, match=match):
+        create_graph_from_def(graph_def)
+
+
+def test_pointer_to_operation_without_outputs() -> None:
+    """Tests that operations without outputs cannot be referenced."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_multiple_outputs.yaml")
+    graph_def.spec.operations[0].function = "tests.package.graphs.return_nothing"
+
+    with pytest.raises(GraphDefinitionError, match="but `return_multiple` declares no outputs"):
+        create_graph_from_def(graph_def)
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+from dagster_composable_graphs.compose import compose_job, load_graph_def_from_yaml
+from dagster_composable_graphs.definitions import load_definitions_from_directory
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.fusion import FUSED_NODES_TAG
+from dagster_composable_graphs.imports import import_registry
+from dagster_composable_graphs.profiling import (
+    COMPILE_PROFILE_TAG,
+    PhaseRecord,
+    active_profiler,
+    profile_compilation,
+)
+from dagster_composable_graphs.resources import resource_registry
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_profile_compose_job() -> None:
+    """Tests that every phase of loading and composing a job is recorded."""
+
+    records: list[PhaseRecord] = []
+    import_registry.invalidate()
+    resource_registry.clear()
+
+    with profile_compilation(attach_metadata=True, callback=records.append) as profiler:
+        assert active_profiler() is profiler
+
+        graph_def = load_graph_def_from_yaml(data_path / "test_resource.yaml")
+        job = compose_job(graph_def)
+
+    assert active_profiler() is None
+    assert records == profiler.records
+    assert [record.phase for record in records] == [
+        "parse",
+        "validate",
+        "import",
+        "resources",
+        "index",
+        "wire",
+        "job",
+        "compose",
+    ]
+    assert {record.graph for record in records[2:]} == {"test-resource"}
+
+    summary = profiler.summary("test-resource")
+    assert set(summary) == {"import", "resources", "index", "wire", "job", "compose"}
+    assert summary["import"]["count"] == 1
+
+    # Metadata is attached once the job is built, before composition ends.
+    attached = job.metadata[COMPILE_PROFILE_TAG].data
+    phases = ["import", "resources", "index", "wire", "job"]
+    assert attached == {phase: summary[phase] for phase in phases}
+
+    report = profiler.report()
+    assert report["phases"]["parse"]["count"] == 1
+    assert list(report["names"]["import"]) == ["tests.package.graphs"]
+    assert list(report["names"]["compose"]) == ["test-resource"]
+
+    assert job.execute_in_process().output_for_node("use_resource") == 3  # noqa: PLR2004
+
+
+def test_profile_without_metadata() -> None:
+    """Tests that profiles are only attached to jobs on request."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_fusion.yaml")
+
+    with profile_compilation() as outer:
+        with profile_compilation() as inner:
+            job = compose_job(graph_def)
+
+        assert active_profiler() is outer
+
+    assert not outer.records
+    assert inner.summary()["compose"]["count"] == 1
+    assert set(job.metadata) == {FUSED_NODES_TAG}
+
+
+def test_profile_failed_compose() -> None:
+    """Tests that phases are recorded when composition fails."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_pruning.yaml")
+    graph_def.spec.targets = ["unknown"]
+
+    with profile_compilation() as profiler, pytest.raises(GraphDefinitionError):
+        compose_job(graph_def)
+
+    assert [record.phase for record in profiler.records][-2:] == ["index", "compose"]
+
+
+def test_profile_definitions(tmp_path: Path) -> None:
+    """Tests that modules imported while loading a directory are recorded."""
+
+    (tmp_path / "test_input.yaml").write_bytes((data_path / "test_input.yaml").read_bytes())
+    import_registry.invalidate()
+
+    with profile_compilation() as profiler:
+        load_definitions_from_directory(tmp_path, workers=1)
+
+    # The module is prefetched and then reused when composing the job.
+    assert profiler.report()["names"]["import"]["tests.package.graphs"]["count"] == 1
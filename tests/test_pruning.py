@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from dagster_composable_graphs.cache import CompositionCache
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.errors import GraphDefinitionError
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_prune_graph() -> None:
+    """Tests that only the targets, their upstream nodes and their inputs are kept."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_pruning.yaml")
+
+    graph = create_graph_from_def(graph_def, targets=["scaled"])
+
+    assert graph.nodes == ["left", "scaled"]
+    assert graph.initial_data == {"x": 2, "y": 3}
+    assert [graph.nodes[node_id] for node_id in graph.order] == ["left", "scaled"]
+
+    graph = create_graph_from_def(graph_def, targets=["total", "right"])
+
+    assert graph.nodes == ["left", "right", "total"]
+    assert graph.initial_data == {"x": 2, "y": 3, "z": 4}
+
+    assert len(create_graph_from_def(graph_def, targets=[]).nodes) == 4  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "targets, outputs",
+    [(["scaled"], {"left": 6, "scaled": 12}), (["right"], {"right": 8})],
+)
+def test_pruned_job(targets: list, outputs: dict) -> None:
+    """Tests that pruned jobs only execute the nodes needed for their targets."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_pruning.yaml")
+    graph_def.spec.targets = targets
+
+    job = compose_job(graph_def)
+    execution = job.execute_in_process()
+
+    assert {node.name for node in job.nodes} == {"inputs", *outputs}
+    assert {node: execution.output_for_node(node) for node in outputs} == outputs
+
+
+def test_pruned_job_cache() -> None:
+    """Tests that jobs composed for different targets are cached separately."""
+
+    cache = CompositionCache()
+    graph_def = load_graph_def_from_yaml(data_path / "test_pruning.yaml")
+
+    job = cache.compose_job(graph_def, targets=["right"])
+
+    assert cache.compose_job(graph_def, targets=["right"]) is job
+    assert cache.compose_job(graph_def, targets=["left"]) is not job
+    assert cache.compose_job(graph_def) is not job
+
+
+def test_unknown_target() -> None:
+    """Tests that targets must be operations of the graph."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_pruning.yaml")
+
+    with pytest.raises(GraphDefinitionError, match="Target `x` is not an operation"):
+        create_graph_from_def(graph_def, targets=["x"])
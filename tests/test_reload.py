@@ -0,0 +1,193 @@
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from dagster_composable_graphs.errors import GraphLoadError
+from dagster_composable_graphs.imports import import_registry
+from dagster_composable_graphs.reload import DefinitionsReloader, file_fingerprint
+
+OPS = """\
+import dagster
+
+
+@dagster.op
+def scale(value: int) -> int:
+    return value * {factor}
+"""
+
+GRAPH = """\
+apiVersion: truevoid.dev/v1alpha1
+kind: ComposableGraph
+metadata:
+  name: {name}
+spec:
+  inputs:
+    x: {x}
+  operations:
+    - name: scaled
+      {operation}
+  dependencies:
+    - name: scaled
+      inputs: [x]
+"""
+
+
+def _touch(file_path: Path, text: str) -> None:
+    """Write `text` to `file_path`, moving its modification time forward."""
+
+    stat = file_path.stat() if file_path.exists() else None
+    file_path.write_text(text)
+    if stat is not None:
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _graph(name: str, x: int = 1, operation: str = "function: reload_ops.scale") -> str:
+    return GRAPH.format(name=name, x=x, operation=operation)
+
+
+@pytest.fixture
+def graphs_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Return a directory of graph files, whose ops are in a module on the import path."""
+
+    modules_path = tmp_path / "modules"
+    modules_path.mkdir()
+    (modules_path / "reload_ops.py").write_text(OPS.format(factor=2))
+    monkeypatch.syspath_prepend(str(modules_path))
+
+    graphs_path = tmp_path / "graphs"
+    graphs_path.mkdir()
+    (graphs_path / "a.yaml").write_text(_graph("a"))
+    (graphs_path / "b.yaml").write_text(_graph("b", x=2))
+    yield graphs_path
+
+    sys.modules.pop("reload_ops", None)
+    import_registry.invalidate(["reload_ops"])
+
+
+def test_file_fingerprint(tmp_path: Path) -> None:
+    """Tests that files are only hashed when their modification time or size changed."""
+
+    file_path = tmp_path / "file.txt"
+    file_path.write_text("a")
+    fingerprint = file_fingerprint(file_path)
+
+    assert file_fingerprint(file_path, fingerprint) is fingerprint
+
+    _touch(file_path, "a")
+    touched = file_fingerprint(file_path, fingerprint)
+
+    assert touched.signature != fingerprint.signature
+    assert touched.digest == fingerprint.digest
+
+    file_path.unlink()
+    assert file_fingerprint(file_path, fingerprint) == (None, None)
+
+
+def test_reload_graph_files(graphs_path: Path) -> None:
+    """Tests that only the jobs of added or modified graph files are composed."""
+
+    reloader = DefinitionsReloader(graphs_path)
+
+    defs = reloader.reload()
+    jobs = {job.name: job for job in defs.jobs}
+
+    assert reloader.info().composed == [graphs_path / "a.yaml", graphs_path / "b.yaml"]
+    assert jobs["b"].execute_in_process().output_for_node("scaled") == 4  # noqa: PLR2004
+
+    # Touching a file without changing its content does not compose its job again.
+    _touch(graphs_path / "a.yaml", _graph("a"))
+    defs = reloader.reload()
+
+    assert reloader.info().composed == []
+    assert all(job is jobs[job.name] for job in defs.jobs)
+
+    _touch(graphs_path / "a.yaml", _graph("a", x=3))
+    (graphs_path / "b.yaml").unlink()
+    (graphs_path / "c.yaml").write_text(_graph("c"))
+    defs = reloader.reload()
+    info = reloader.info()
+
+    assert info.composed == [graphs_path / "a.yaml", graphs_path / "c.yaml"]
+    assert info.reused == []
+    assert info.removed == [graphs_path / "b.yaml"]
+    assert sorted(job.name for job in defs.jobs) == ["a", "c"]
+    assert defs.get_job_def("a").execute_in_process().output_for_node("scaled") == 6  # noqa: PLR2004
+
+
+def test_reload_modules(graphs_path: Path) -> None:
+    """Tests that modified modules are reloaded and the jobs referencing them composed."""
+
+    reloader = DefinitionsReloader(graphs_path)
+    reloader.reload()
+
+    modules_path = graphs_path.parent / "modules"
+    _touch(modules_path / "reload_ops.py", OPS.format(factor=10))
+    defs = reloader.reload()
+    info = reloader.info()
+
+    assert info.modules == ["reload_ops"]
+    assert info.composed == [graphs_path / "a.yaml", graphs_path / "b.yaml"]
+    assert defs.get_job_def("b").execute_in_process().output_for_node("scaled") == 20  # noqa: PLR2004
+
+    _touch(modules_path / "reload_ops.py", "def broken(:\n")
+    with pytest.raises(GraphLoadError) as info_error:
+        reloader.reload()
+
+    assert set(info_error.value.errors) == {graphs_path / "a.yaml", graphs_path / "b.yaml"}
+    assert isinstance(info_error.value.errors[graphs_path / "a.yaml"], SyntaxError)
+
+    # The module is reloaded again once fixed.
+    _touch(modules_path / "reload_ops.py", OPS.format(factor=3))
+    defs = reloader.reload()
+
+    assert reloader.info().modules == ["reload_ops"]
+    assert defs.get_job_def("a").execute_in_process().output_for_node("scaled") == 3  # noqa: PLR2004
+
+    # Modules no longer imported are not reloaded.
+    del sys.modules["reload_ops"]
+    reloader.reload()
+
+    assert reloader.info().modules == []
+
+
+def test_reload_subgraphs(graphs_path: Path) -> None:
+    """Tests that the jobs including a modified subgraph are composed."""
+
+    subgraph_path = graphs_path.parent / "subgraph.yml"
+    subgraph_path.write_text(_graph("inner", x=0))
+    _touch(graphs_path / "b.yaml", _graph("b", x=2, operation=f"graph: {subgraph_path}"))
+
+    reloader = DefinitionsReloader(graphs_path)
+    reloader.reload()
+    reloader.reload()
+
+    assert reloader.info().reused == [graphs_path / "a.yaml", graphs_path / "b.yaml"]
+
+    _touch(subgraph_path, _graph("inner", x=5))
+    reloader.reload()
+
+    assert reloader.info().composed == [graphs_path / "b.yaml"]
+
+
+def test_reload_errors(graphs_path: Path) -> None:
+    """Tests that files failing to load are reported and loaded again on the next reload."""
+
+    reloader = DefinitionsReloader(graphs_path)
+    reloader.reload()
+
+    _touch(graphs_path / "a.yaml", "metadata: {}\n")
+    (graphs_path / "c.yaml").write_text(_graph("c", operation="function: reload_missing.scale"))
+    with pytest.raises(GraphLoadError) as info:
+        reloader.reload()
+
+    assert set(info.value.errors) == {graphs_path / "a.yaml", graphs_path / "c.yaml"}
+    assert reloader.info().reused == [graphs_path / "b.yaml"]
+
+    _touch(graphs_path / "a.yaml", _graph("a"))
+    (graphs_path / "c.yaml").unlink()
+    reloader.reload()
+
+    assert reloader.info().composed == [graphs_path / "a.yaml"]
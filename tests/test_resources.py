@@ -0,0 +1,102 @@
+import shutil
+from pathlib import Path
+
+import dagster
+import pytest
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+    load_resource,
+)
+from dagster_composable_graphs.definitions import load_definitions_from_directory
+from dagster_composable_graphs.errors import GraphLoadError
+from dagster_composable_graphs.resources import ResourceRegistry, resource_registry
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_shared_resources() -> None:
+    """Tests that jobs declaring the same resource and configuration share an instance."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_resource.yaml")
+    other_def = graph_def.model_copy(deep=True)
+    other_def.metadata.name = "other"
+    configured_def = load_graph_def_from_yaml(data_path / "test_resource_config.yaml")
+
+    resource = create_graph_from_def(graph_def).resources["test_resource"]
+
+    assert create_graph_from_def(other_def).resources["test_resource"] is resource
+    assert create_graph_from_def(configured_def).resources["test_resource"] is not resource
+
+    resource_registry.clear()
+    assert create_graph_from_def(graph_def).resources["test_resource"] is not resource
+
+
+def test_resource_config() -> None:
+    """Tests that resources are configured from the graph definition."""
+
+    job = compose_job(load_graph_def_from_yaml(data_path / "test_resource_config.yaml"))
+
+    execution = job.execute_in_process()
+
+    assert execution.output_for_node("use_resource") == 5  # noqa: PLR2004
+    assert execution.output_for_node("use_configured_value") == 11  # noqa: PLR2004
+
+
+def test_load_resource() -> None:
+    """Tests that resources and IO managers are loaded from their import path."""
+
+    assert isinstance(
+        load_resource("tests.package.graphs.configured_value"), dagster.ResourceDefinition
+    )
+    assert load_resource("tests.package.graphs.TestResource").__name__ == "TestResource"
+
+    with pytest.raises(AssertionError, match="must be of type `ResourceDefinition`"):
+        load_resource("tests.package.graphs.add")
+
+
+def test_resource_registry() -> None:
+    """Tests that resources are identified by import path and configuration."""
+
+    registry = ResourceRegistry()
+
+    resource = registry.get("tests.package.graphs.TestResource", {"attr": 1})
+
+    assert registry.get("tests.package.graphs.TestResource", {"attr": 1}) is resource
+    assert registry.get("tests.package.graphs.TestResource").attr == 3  # noqa: PLR2004
+    assert isinstance(
+        registry.get("tests.package.graphs.configured_value", {"value": 1}),
+        dagster.ResourceDefinition,
+    )
+    assert len(registry) == 3  # noqa: PLR2004
+    assert ResourceRegistry.key("x", {"a": 1, "b": 2}) == ResourceRegistry.key("x", {"b": 2, "a": 1})
+
+    registry.invalidate(["tests.package.other"])
+    assert len(registry) == 3  # noqa: PLR2004
+
+    registry.invalidate(["tests.package.graphs"])
+    assert len(registry) == 0
+
+
+def test_definitions_share_resources(tmp_path: Path) -> None:
+    """Tests that definitions only merge resources with the same configuration."""
+
+    shutil.copy(data_path / "test_resource_config.yaml", tmp_path)
+    (tmp_path / "test_other_config.yaml").write_text(
+        (data_path / "test_resource_config.yaml")
+        .read_text()
+        .replace("test-resource-config", "test-other-config")
+    )
+
+    defs = load_definitions_from_directory(tmp_path, workers=1)
+
+    assert set(defs.resources) == {"test_resource", "value"}
+
+    (tmp_path / "test_other_config.yaml").write_text(
+        (tmp_path / "test_other_config.yaml").read_text().replace("attr: 5", "attr: 6")
+    )
+
+    with pytest.raises(GraphLoadError, match="different import or configuration"):
+        load_definitions_from_directory(tmp_path, workers=1)
@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.fusion import fuse_linear_chains
+from dagster_composable_graphs.scheduling import critical_path, load_durations
+
+data_path = Path(__file__).parent / "data"
+
+
+def _write_records(file_path: Path, records: list) -> None:
+    file_path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+
+def test_critical_path() -> None:
+    """Tests that the longest path is weighted by cost hints."""
+
+    graph = create_graph_from_def(load_graph_def_from_yaml(data_path / "test_scheduling.yaml"))
+
+    result = critical_path(graph)
+
+    assert result.costs == {"slow": 10, "fast": 1, "total": 2, "side": 1}
+    assert result.remaining == {"slow": 12, "fast": 3, "total": 2, "side": 1}
+    assert result.path == ["slow", "total"]
+    assert result.makespan == 12  # noqa: PLR2004
+    assert result.total_cost == 14  # noqa: PLR2004
+
+    # Historical durations take precedence over cost hints.
+    result = critical_path(graph, {"fast": 20.0})
+
+    assert result.path == ["fast", "total"]
+    assert result.makespan == 22  # noqa: PLR2004
+
+
+def test_critical_path_of_fused_nodes() -> None:
+    """Tests that fused nodes cost as much as the nodes they execute."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_fusion.yaml")
+    graph = fuse_linear_chains(create_graph_from_def(graph_def))
+
+    result = critical_path(graph)
+
+    assert result.total_cost == len(graph_def.spec.operations)
+    assert result.costs["square"] == len(graph.fused["square"])
+    assert result.path == ["return_two", "square", "add_resource", "total"]
+    assert result.makespan == 6  # noqa: PLR2004
+
+
+def test_load_durations(tmp_path: Path) -> None:
+    """Tests that the median duration of successful steps is read from a telemetry sink."""
+
+    sink = tmp_path / "telemetry.jsonl"
+    assert load_durations(sink) == {}
+
+    _write_records(
+        sink,
+        [
+            {"job": "a", "node": "x", "status": "success", "duration": 1.0},
+            {"job": "a", "node": "x", "status": "success", "duration": 3.0},
+            {"job": "a", "node": "x", "status": "success", "duration": 5.0},
+            {"job": "a", "node": "x", "status": "failure", "duration": 100.0},
+            {"job": "a", "node": "y", "status": "success", "duration": None},
+            {"job": "b", "node": "z", "status": "success", "duration": 2.0},
+        ],
+    )
+
+    assert load_durations(sink) == {"x": 3.0, "z": 2.0}
+    assert load_durations(sink, job="a") == {"x": 3.0}
+
+
+def test_prioritized_job(tmp_path: Path) -> None:
+    """Tests that steps are tagged with priorities along the critical path."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_scheduling.yaml")
+
+    job = compose_job(graph_def)
+
+    priorities = {
+        node: job.graph.node_named(node).tags["dagster/priority"]
+        for node in ["slow", "fast", "total", "side"]
+    }
+    assert priorities == {"slow": "3", "fast": "2", "total": "1", "side": "100"}
+    assert job.execute_in_process().output_for_node("total") == 10  # noqa: PLR2004
+
+    sink = tmp_path / "telemetry.jsonl"
+    _write_records(
+        sink, [{"job": "test_scheduling", "node": "fast", "status": "success", "duration": 50}]
+    )
+    graph_def.spec.prioritization.stats = str(sink)
+
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.tags["fast"]["dagster/priority"] == "3"
+    assert graph.tags["slow"]["dagster/priority"] == "2"
@@ -0,0 +1,223 @@
+import itertools
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    load_graph_def_from_yaml,
+)
+from dagster_composable_graphs.errors import GraphDefinitionError
+from dagster_composable_graphs.models import (
+    CacheDefinition,
+    InputDefinition,
+    OperationDef,
+    ResourceDefinition,
+)
+from dagster_composable_graphs.streaming import prefetch
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_streaming_job() -> None:
+    """Tests that streaming segments run as a single step passing chunks through generators."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_streaming.yaml")
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.fused == {"total": ["numbers", "scaled", "total"]}
+    assert graph.tags == {"total": {"team": "data"}}
+    assert graph.cost_hints == {"total": 3}
+    assert graph.input_modes == {}
+
+    graph_def.spec.fusion = True
+    graph_def.spec.deduplication = True
+    execution = compose_job(graph_def).execute_in_process()
+
+    assert [event.step_key for event in execution.get_step_success_events()] == [
+        "inputs",
+        "total",
+        "doubled",
+    ]
+    assert execution.output_for_node("total") == 30  # noqa: PLR2004
+    assert execution.output_for_node("doubled") == 60  # noqa: PLR2004
+
+
+def test_streaming_is_lazy() -> None:
+    """Tests that chunks are pulled by the consumer instead of produced all at once."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_streaming.yaml")
+    graph_def.spec.inputs["n"] = 10**12
+    graph_def.spec.operations[2].function = "tests.package.graphs.take_first"
+
+    execution = compose_job(graph_def, targets=["total"]).execute_in_process()
+
+    assert execution.output_for_node("total") == 0
+
+
+def test_find_streaming_segments() -> None:
+    """Tests that every node returning a value ends its own streaming segment."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_streaming.yaml")
+    graph_def.spec.operations.append(
+        OperationDef(name="more", function="tests.package.graphs.count_up")
+    )
+    graph_def.spec.dependencies.append(
+        graph_def.spec.dependencies[0].model_copy(update={"name": "more"})
+    )
+    graph_def.spec.operations[3].function = "tests.package.graphs.sum_values"
+    graph_def.spec.dependencies[3].inputs = [InputDefinition(node="more", mode="stream")]
+
+    graph = create_graph_from_def(graph_def)
+
+    assert graph.fused == {
+        "total": ["numbers", "scaled", "total"],
+        "doubled": ["more", "doubled"],
+    }
+
+
+def test_streaming_with_dynamic_inputs() -> None:
+    """Tests that nodes of streaming segments cannot map over or collect dynamic outputs."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_streaming.yaml")
+    graph_def.spec.operations.append(
+        OperationDef(name="emitted", function="tests.package.graphs.emit_range")
+    )
+    graph_def.spec.dependencies.append(
+        graph_def.spec.dependencies[0].model_copy(update={"name": "emitted"})
+    )
+    graph_def.spec.dependencies[1].inputs[1] = InputDefinition(node="emitted", mode="collect")
+
+    with pytest.raises(GraphDefinitionError, match="Node `scaled` cannot be part of a streaming"):
+        create_graph_from_def(graph_def)
+
+
+def test_streaming_with_cache() -> None:
+    """Tests that nodes of streaming segments cannot be memoized."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_streaming.yaml")
+    graph_def.spec.operations[1].cache = CacheDefinition()
+
+    with pytest.raises(GraphDefinitionError, match="`scaled` is part of a streaming segment"):
+        create_graph_from_def(graph_def)
+
+
+def _stream(node: str, **fields: Any) -> InputDefinition:
+    return InputDefinition(node=node, mode="stream", **fields)
+
+
+@pytest.mark.parametrize(
+    ("operations", "inputs", "message"),
+    [
+        ({}, {"numbers": [_stream("n")]}, "only outputs of operations can be streamed"),
+        (
+            {},
+            {"doubled": [_stream("total"), "total"]},
+            "Output of node `total` is streamed to `doubled` and cannot have other consumers",
+        ),
+        (
+            {},
+            {"total": [_stream("scaled", io_manager="value_io_manager")]},
+            "cannot be passed by an IO manager",
+        ),
+        (
+            {"numbers": "tests.package.graphs.return_multiple"},
+            {"numbers": [], "scaled": [_stream("numbers", pointer="/out0"), "factor"]},
+            "Node `numbers` cannot be part of a streaming segment",
+        ),
+        (
+            {"total": "tests.package.graphs.count_up"},
+            {},
+            "Node `total` ends a streaming segment and must return a value",
+        ),
+        (
+            {"numbers": "tests.package.graphs.emit_range"},
+            {},
+            "from dynamic output `result` of `numbers` must be mapped or collected",
+        ),
+    ],
+)
+def test_streaming_errors(
+    operations: Dict[str, str], inputs: Dict[str, List[Any]], message: str
+) -> None:
+    """Tests that invalid streaming segments are reported."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_streaming.yaml")
+    graph_def.spec.resources = [
+        ResourceDefinition(
+            name="value_io_manager", import_field="tests.package.graphs.value_io_manager"
+        )
+    ]
+    for operation in graph_def.spec.operations:
+        operation.function = operations.get(operation.name, operation.function)
+
+    for dependency in graph_def.spec.dependencies:
+        dependency.inputs = inputs.get(dependency.name, dependency.inputs)
+
+    with pytest.raises(GraphDefinitionError, match=message):
+        create_graph_from_def(graph_def)
+
+
+def test_prefetch() -> None:
+    """Tests that items are produced ahead of a slow consumer, up to the buffer size."""
+
+    produced = []
+
+    def produce() -> Iterator[int]:
+        for item in range(4):
+            produced.append(item)
+            yield item
+
+    consumed = []
+    for item in prefetch(produce(), 1):
+        time.sleep(0.15)
+        # One item is buffered and the producer waits to buffer another.
+        assert len(produced) <= item + 3  # noqa: PLR2004
+        consumed.append(item)
+
+    assert consumed == produced == [0, 1, 2, 3]
+
+
+def test_prefetch_stop() -> None:
+    """Tests that producing stops when the consumer stops early, closing generators."""
+
+    stream = prefetch(itertools.count(), 1)
+
+    assert next(stream) == 0
+
+    stream.close()
+
+    closed = []
+
+    def produce() -> Iterator[int]:
+        try:
+            yield from itertools.count()
+        finally:
+            closed.append(threading.current_thread())
+
+    stream = prefetch(produce(), 1)
+
+    assert next(stream) == 0
+
+    stream.close()
+
+    assert len(closed) == 1
+    assert closed[0] is not threading.current_thread()
+
+
+def test_prefetch_error() -> None:
+    """Tests that errors of the producer are raised to the consumer."""
+
+    def produce() -> Iterator[int]:
+        yield 1
+        raise ValueError("broken stream")
+
+    stream = prefetch(produce(), 2)
+
+    assert next(stream) == 1
+    with pytest.raises(ValueError, match="broken stream"):
+        next(stream)
@@ -0,0 +1,137 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from dagster_composable_graphs.cache import CompositionCache
+from dagster_composable_graphs.compose import (
+    compose_job,
+    create_graph_from_def,
+    file_signature,
+    load_graph_def_from_yaml,
+    load_subgraph,
+)
+from dagster_composable_graphs.errors import GraphDefinitionError
+
+data_path = Path(__file__).parent / "data"
+
+
+def _touch(file_path: Path, text: str) -> None:
+    """Write `text` to `file_path`, moving its modification time forward."""
+
+    stat = file_path.stat() if file_path.exists() else None
+    file_path.write_text(text)
+    if stat is not None:
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_subgraph_job(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that graph definition files are used as operations."""
+
+    # Relative paths of subgraphs are resolved from the directory of the definition.
+    monkeypatch.chdir(tmp_path)
+    job = compose_job(load_graph_def_from_yaml(data_path / "test_subgraph.yaml"))
+
+    result = job.execute_in_process()
+
+    # first: 2 * 3 + 2 = 8, second: 8 * 3 + 8 = 32, nested twice: 2 * 2 + 2 = 6.
+    assert result.output_for_node("first") == 8  # noqa: PLR2004
+    assert result.output_for_node("second") == 32  # noqa: PLR2004
+    assert result.output_for_node("nested", "twice") == 6  # noqa: PLR2004
+    assert result.output_for_node("nested", "multiple_out1") == 7  # noqa: PLR2004
+    assert result.output_for_node("nested", "use_resource") == 3  # noqa: PLR2004
+    assert result.output_for_node("total") == 38  # noqa: PLR2004
+    assert "test_resource" in job.resource_defs
+
+
+def test_subgraph_cache() -> None:
+    """Tests that subgraphs are compiled once and shared by every graph including them."""
+
+    graph = create_graph_from_def(load_graph_def_from_yaml(data_path / "test_subgraph.yaml"))
+    subgraph = load_subgraph(data_path / "test_subgraph_inner.yaml")
+
+    assert graph.operations["first"] is subgraph.graph
+    assert graph.operations["second"] is subgraph.graph
+    assert load_subgraph(data_path / "test_subgraph_inner.yaml") is subgraph
+    assert set(load_subgraph(data_path / "test_subgraph_outputs.yaml").files) == {
+        str(data_path / "test_subgraph_outputs.yaml"),
+        str(data_path / "test_subgraph_inner.yaml"),
+    }
+
+
+def test_modified_subgraph(tmp_path: Path) -> None:
+    """Tests that subgraphs are compiled again when the files they include change."""
+
+    inner = tmp_path / "inner.yaml"
+    outer = tmp_path / "outer.yaml"
+    parent = tmp_path / "parent.yaml"
+
+    _touch(inner, (data_path / "test_subgraph_inner.yaml").read_text())
+    _touch(
+        outer,
+        (data_path / "test_subgraph_outputs.yaml")
+        .read_text()
+        .replace("test_subgraph_inner.yaml", str(inner)),
+    )
+    _touch(
+        parent,
+        (data_path / "test_subgraph.yaml")
+        .read_text()
+        .replace("test_subgraph_inner.yaml", str(inner))
+        .replace("test_subgraph_outputs.yaml", str(outer)),
+    )
+
+    cache = CompositionCache()
+    job = cache.load_job(parent)
+    subgraph = load_subgraph(outer)
+
+    assert cache.load_job(parent) is job
+
+    _touch(inner, inner.read_text().replace("[product, a]", "[product, product]"))
+
+    assert load_subgraph(outer) is not subgraph
+    other_job = cache.load_job(parent)
+
+    assert other_job is not job
+    assert other_job.execute_in_process().output_for_node("nested", "twice") == 8  # noqa: PLR2004
+
+    subgraph = load_subgraph(outer)
+    inner.unlink()
+
+    assert file_signature(inner) is None
+    assert not subgraph.is_current()
+
+
+def test_subgraph_errors(tmp_path: Path) -> None:
+    """Tests that invalid subgraph operations are reported."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_subgraph.yaml")
+
+    graph_def.spec.operations[0].function = "tests.package.graphs.add"
+    with pytest.raises(GraphDefinitionError, match="either a `function` or a `graph`"):
+        create_graph_from_def(graph_def)
+
+    cycle = tmp_path / "cycle.yaml"
+    _touch(
+        cycle,
+        (data_path / "test_subgraph_outputs.yaml")
+        .read_text()
+        .replace("test_subgraph_inner.yaml", str(cycle)),
+    )
+    with pytest.raises(GraphDefinitionError, match="Subgraph includes itself"):
+        load_subgraph(cycle)
+
+    conflict = tmp_path / "conflict.yaml"
+    _touch(
+        conflict,
+        (data_path / "test_subgraph_outputs.yaml")
+        .read_text()
+        .replace("test_subgraph_inner.yaml", str(data_path / "test_subgraph_inner.yaml"))
+        .replace("test-subgraph-outputs", "test-conflict")
+        .replace("TestResource", "TestResource\n      config:\n        attr: 4"),
+    )
+    graph_def = load_graph_def_from_yaml(data_path / "test_subgraph.yaml")
+    graph_def.spec.operations[1].graph = str(conflict)
+    graph_def.spec.operations[1].name = "second"
+    with pytest.raises(GraphDefinitionError, match="requires resource `test_resource`"):
+        create_graph_from_def(graph_def)
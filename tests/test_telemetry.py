@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import dagster
+from pytest_mock import MockerFixture
+
+from dagster_composable_graphs import telemetry
+from dagster_composable_graphs.compose import compose_job, load_graph_def_from_yaml
+from dagster_composable_graphs.models import OperationDef, TelemetryDefinition
+from dagster_composable_graphs.telemetry import peak_rss, step_start_time
+
+data_path = Path(__file__).parent / "data"
+
+
+def test_peak_rss() -> None:
+    """Tests that the peak resident set size of the process is reported."""
+
+    assert peak_rss() > 0
+
+
+def test_telemetry_sink(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Tests that a telemetry record of every node is appended to the sink."""
+
+    observe = mocker.spy(dagster.DagsterInstance, "report_runless_asset_event")
+    sink = tmp_path / "telemetry" / "records.jsonl"
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_multiple_outputs.yaml")
+    graph_def.spec.telemetry = TelemetryDefinition(sink=str(sink), observations=True)
+
+    for _ in range(2):
+        assert compose_job(graph_def).execute_in_process().success
+
+    records = [json.loads(line) for line in sink.read_text().splitlines()]
+    nodes = graph_def.spec.operations
+
+    assert len(records) == 2 * len(nodes)
+    assert {record["node"] for record in records} == {node.name for node in nodes}
+
+    for record in records:
+        assert record["job"] == "test_multiple_ouputs"
+        assert record["status"] == "success"
+        assert record["duration"] >= 0
+        assert record["process_peak_rss"] > 0
+        assert record["output_size"] > 0
+
+    observation = observe.call_args.args[1]
+    assert observation.asset_key.path[0] == "test_multiple_ouputs"
+    assert "duration" in observation.metadata
+    assert observe.call_count == len(records)
+
+
+def test_step_start_time(mocker: MockerFixture) -> None:
+    """Tests that the start of a step is found without reading the step statistics of the run."""
+
+    step_stats = mocker.spy(dagster.DagsterInstance, "get_run_step_stats")
+    instance = dagster.DagsterInstance.ephemeral()
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_multiple_outputs.yaml")
+    graph_def.spec.telemetry = TelemetryDefinition()
+    execution = compose_job(graph_def).execute_in_process(instance=instance)
+
+    step_stats.assert_not_called()
+
+    # The first step is found on the last page of start events.
+    mocker.patch.object(telemetry, "STEP_START_PAGE_SIZE", 1)
+    (first,) = instance.get_records_for_run(
+        execution.run_id, of_type=dagster.DagsterEventType.STEP_START, limit=1
+    ).records
+
+    def context(step_key: str) -> SimpleNamespace:
+        return SimpleNamespace(instance=instance, run_id=execution.run_id, step_key=step_key)
+
+    assert step_start_time(context(first.event_log_entry.step_key)) == first.timestamp
+    assert step_start_time(context("missing")) is None
+
+
+def test_telemetry_failure(tmp_path: Path) -> None:
+    """Tests that failed nodes are recorded."""
+
+    sink = tmp_path / "records.jsonl"
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_input.yaml")
+    graph_def.spec.operations = [OperationDef(name="multiply", function="tests.package.graphs.fail")]
+    graph_def.spec.dependencies[0].inputs = ["x"]
+    graph_def.spec.telemetry = TelemetryDefinition(sink=str(sink))
+
+    execution = compose_job(graph_def).execute_in_process(raise_on_error=False)
+
+    assert not execution.success
+
+    (record,) = (json.loads(line) for line in sink.read_text().splitlines())
+    assert record["node"] == "multiply"
+    assert record["status"] == "failure"
+    assert record["output_size"] == 0
+
+
+def test_telemetry_logs() -> None:
+    """Tests that telemetry is logged without a sink."""
+
+    graph_def = load_graph_def_from_yaml(data_path / "test_input.yaml")
+    graph_def.spec.telemetry = TelemetryDefinition()
+
+    instance = dagster.DagsterInstance.ephemeral()
+    execution = compose_job(graph_def).execute_in_process(instance=instance)
+
+    assert any(
+        entry.user_message.startswith("Telemetry of node `multiply`")
+        for entry in instance.all_logs(execution.run_id)
+    )
@@ -1,8 +1,9 @@
 import re
+import sys
 
 import pytest
 
-from dagster_composable_graphs.util import import_object, to_snake_case
+from dagster_composable_graphs.util import import_object, recursion_limit, to_snake_case
 
 
 def _is_valid_snake_case(string: str):
@@ -78,3 +79,23 @@ def test_import_object() -> None:
     loaded_func = import_object("os.path.join")
     assert callable(loaded_func)
     assert loaded_func.__name__ == "join"
+
+
+def test_recursion_limit() -> None:
+    """Tests that the recursion limit is restored once the last overlapping context exits."""
+
+    initial = sys.getrecursionlimit()
+
+    first = recursion_limit(initial + 1000)
+    second = recursion_limit(initial + 500)
+
+    # Contexts overlap like those of concurrent threads, exiting in any order.
+    first.__enter__()
+    second.__enter__()
+    assert sys.getrecursionlimit() == initial + 1000
+
+    first.__exit__(None, None, None)
+    assert sys.getrecursionlimit() == initial + 1000
+
+    second.__exit__(None, None, None)
+    assert sys.getrecursionlimit() == initial